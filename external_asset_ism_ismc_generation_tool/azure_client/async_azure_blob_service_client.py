@@ -0,0 +1,80 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+
+
+class AsyncAzureBlobServiceClient:
+    """
+    asyncio counterpart of AzureBlobServiceClient built on azure.storage.blob.aio.
+    Every request waits on one bounded semaphore, so hundreds of range reads can be in flight on a single thread
+    without exceeding 'max_concurrent_requests'. Must be created and used inside a running event loop.
+    """
+    _DEFAULT_MAX_CONCURRENT_REQUESTS = 64
+    __logger: ILogger = Logger("AsyncAzureBlobServiceClient")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, settings: dict):
+        try:
+            import aiohttp
+            from azure.core.pipeline.transport import AioHttpTransport
+            from azure.storage.blob.aio import BlobServiceClient
+        except ImportError as exc:
+            self.__logger.error(f"Async mode requires the 'aiohttp' package: {exc}")
+            raise ImportError("Async mode requires the 'aiohttp' package, install it with 'pip install aiohttp'") from exc
+
+        try:
+            self.container_name = settings["container_name"]
+        except KeyError as exc:
+            missing_key = exc.args[0] if exc.args else "unknown"
+            self.__logger.error(f"Required setting '{missing_key}' is missing.")
+            raise ValueError(f"Missing required setting: {missing_key}") from exc
+
+        self.connection_string = AzureBlobServiceClient.get_connection_string(settings)
+        self.max_concurrent_requests = Common.get_positive_int_setting(settings, 'max_concurrent_requests', self._DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self.max_connections_per_host = Common.get_positive_int_setting(settings, 'max_connections_per_host', self.max_concurrent_requests)
+
+        self.__session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_concurrent_requests, limit_per_host=self.max_connections_per_host))
+        self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string, transport=AioHttpTransport(session=self.__session, session_owner=False))
+        self.container_client = self.blob_service_client.get_container_client(self.container_name)
+        self.__semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        self.__blob_clients: Dict[str, any] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self.blob_service_client.close()
+        await self.__session.close()
+
+    async def get_list_of_blobs(self) -> List:
+        async with self.__semaphore:
+            return [blob async for blob in self.container_client.list_blobs()]
+
+    def get_blob_client(self, blob_name: str):
+        blob_client = self.__blob_clients.get(blob_name)
+        if blob_client is None:
+            blob_client = self.container_client.get_blob_client(blob_name)
+            self.__blob_clients[blob_name] = blob_client
+        return blob_client
+
+    async def download_part_of_blob(self, blob_name: str, offset=None, length=None) -> bytes:
+        data, _ = await self.download_part_of_blob_with_size(blob_name, offset, length)
+        return data
+
+    async def download_part_of_blob_with_size(self, blob_name: str, offset=None, length=None) -> Tuple[bytes, Optional[int]]:
+        async with self.__semaphore:
+            downloader = await self.get_blob_client(blob_name).download_blob(offset=offset, length=length)
+            data = await downloader.readall()
+        content_range = downloader.properties.content_range
+        blob_size = int(content_range.split('/')[-1]) if content_range and not content_range.endswith('*') else None
+        return data, blob_size
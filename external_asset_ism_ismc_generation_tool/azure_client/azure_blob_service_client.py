@@ -1,11 +1,19 @@
 import io
+import threading
+from typing import Dict, Optional, Tuple
 
+import requests
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobServiceClient, BlobClient
+from requests.adapters import HTTPAdapter
+from external_asset_ism_ismc_generation_tool.common.common import Common
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
 
 
 class AzureBlobServiceClient:
+    _DEFAULT_CONNECTION_POOL_SIZE = 10
+    _DEFAULT_MAX_CONNECTIONS_PER_HOST = 32
     __logger: ILogger = Logger("AzureBlobServiceClient")
 
     @classmethod
@@ -21,31 +29,69 @@ class AzureBlobServiceClient:
             self.__logger.error(f"Required setting '{missing_key}' is missing.")
             raise ValueError(f"Missing required setting: {missing_key}") from exc
 
-        self.connection_string = self.__get_connection_string(settings)
+        self.connection_string = self.get_connection_string(settings)
 
-        self.blob_service_client: BlobServiceClient = BlobServiceClient.from_connection_string(self.connection_string)
+        self.connection_pool_size = Common.get_positive_int_setting(settings, 'connection_pool_size', self._DEFAULT_CONNECTION_POOL_SIZE)
+        self.max_connections_per_host = Common.get_positive_int_setting(settings, 'max_connections_per_host', self._DEFAULT_MAX_CONNECTIONS_PER_HOST)
+        self.transport = self.__build_transport()
+
+        self.blob_service_client: BlobServiceClient = BlobServiceClient.from_connection_string(self.connection_string, transport=self.transport)
         self.container_client = self.blob_service_client.get_container_client(self.container_name)
         self.is_multithreading = settings['is_multithreading']
+        self.__blob_clients: Dict[str, BlobClient] = {}
+        self.__blob_clients_lock = threading.Lock()
 
     def get_list_of_blobs(self):
         return self.container_client.list_blobs()
 
+    def get_blob_client(self, blob_name: str) -> BlobClient:
+        """
+        Return the cached client of the blob. All blob clients are derived from the shared container client,
+        so they reuse its pipeline and the pooled keep-alive connections of the shared transport.
+        """
+        blob_client = self.__blob_clients.get(blob_name)
+        if blob_client is None:
+            with self.__blob_clients_lock:
+                blob_client = self.__blob_clients.get(blob_name)
+                if blob_client is None:
+                    blob_client = self.container_client.get_blob_client(blob_name)
+                    self.__blob_clients[blob_name] = blob_client
+        return blob_client
+
     def download_part_of_blob(self, blob_name: str, offset=None, length=None):
-        blob_client = BlobClient.from_connection_string(conn_str=self.connection_string,
-                                                        container_name=self.container_name,
-                                                        blob_name=blob_name)
+        blob_client = self.get_blob_client(blob_name)
         return blob_client.download_blob(offset=offset, length=length).readall()
 
+    def download_part_of_blob_with_size(self, blob_name: str, offset=None, length=None) -> Tuple[bytes, Optional[int]]:
+        """
+        Download a range of the blob together with the total blob size taken from the Content-Range of the same response,
+        so callers can plan further range reads without a separate properties request.
+        """
+        blob_client = self.get_blob_client(blob_name)
+        downloader = blob_client.download_blob(offset=offset, length=length)
+        data = downloader.readall()
+        content_range = downloader.properties.content_range
+        blob_size = int(content_range.split('/')[-1]) if content_range and not content_range.endswith('*') else None
+        return data, blob_size
+
     def upload_blob_to_container(self, blob_name: str, content: str, overwrite: bool = False):
         stream = io.BytesIO(content.encode())
-        blob_client = self.container_client.get_blob_client(blob_name)
+        blob_client = self.get_blob_client(blob_name)
         blob_client.upload_blob(stream, overwrite=overwrite)
 
     def blob_exists(self, blob_name: str):
-        blob_client = self.container_client.get_blob_client(blob_name)
+        blob_client = self.get_blob_client(blob_name)
         return blob_client.exists()
 
-    def __get_connection_string(self, settings: dict):
+    def __build_transport(self) -> RequestsTransport:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.connection_pool_size, pool_maxsize=self.max_connections_per_host)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return RequestsTransport(session=session, session_owner=False)
+
+    @classmethod
+    def get_connection_string(cls, settings: dict):
         if 'connection_string' in settings:
             return settings['connection_string']
         elif 'account_name' in settings and 'account_key' in settings:
@@ -54,5 +100,5 @@ class AzureBlobServiceClient:
                    f"AccountKey={settings['account_key']};" \
                    f"EndpointSuffix=core.windows.net"
         else:
-            self.__logger.error(f'Azure Connection string is not defined in settings: {settings}')
+            cls.__logger.error(f'Azure Connection string is not defined in settings: {settings}')
             raise ValueError("Azure connection string is not defined")
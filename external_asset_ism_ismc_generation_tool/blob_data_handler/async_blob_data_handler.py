@@ -0,0 +1,131 @@
+import asyncio
+from contextlib import nullcontext
+from typing import Dict, Union, Tuple, Optional
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.azure_client.async_azure_blob_service_client import AsyncAzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.file_processor.async_file_processor import AsyncFileProcessor
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_format import MediaFormat
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.blob_data_handler.model.blob_media_data import BlobMediaData
+from external_asset_ism_ismc_generation_tool.text_data_parser.model.text_data_info import TextDataInfo
+
+
+class AsyncBlobDataHandler:
+    """
+    asyncio variant of BlobDataHandler: listing, atom discovery and moof downloads of all blobs run concurrently
+    on one event loop, bounded by the 'max_concurrent_requests' setting of AsyncAzureBlobServiceClient.
+    """
+    __logger: ILogger = Logger("AsyncBlobDataHandler")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def get_data_from_blobs(settings: dict, media_cache: Optional[ParsedMediaCache] = None) -> BlobMediaData:
+        return asyncio.run(AsyncBlobDataHandler.get_data_from_blobs_async(settings, media_cache))
+
+    @staticmethod
+    async def get_data_from_blobs_async(settings: dict, media_cache: Optional[ParsedMediaCache] = None) -> BlobMediaData:
+        async with AsyncAzureBlobServiceClient(settings) as az_blob_service_client:
+            AsyncBlobDataHandler.__logger.info(msg="Get blobs list from Azure container")
+            blobs = await az_blob_service_client.get_list_of_blobs()
+            if blobs is None:
+                AsyncBlobDataHandler.__logger.error(msg=f"Cannot find blobs inside the container {az_blob_service_client.container_name}")
+                raise ValueError(f"Cannot find blobs inside the container {az_blob_service_client.container_name}")
+
+            return await AsyncBlobDataHandler.__process_blobs(blobs, az_blob_service_client, settings, media_cache)
+
+    @staticmethod
+    async def __process_blobs(blobs, az_blob_service_client: AsyncAzureBlobServiceClient, settings: Optional[dict] = None,
+                              media_cache: Optional[ParsedMediaCache] = None) -> BlobMediaData:
+        manifest_name = ""
+        media_datas = None
+        media_index_datas = None
+        text_datas_info = []
+
+        # Check if VTT files should be converted to CMFT (default: False)
+        convert_webvtt = settings.get('convert_webvtt', False) if settings else False
+        # Policy of the renditions parsed right after their download in bounded memory mode
+        segmentation_policy = SegmentationPolicy.from_settings(settings) if settings and settings.get('is_bounded_memory', False) else None
+        # In bounded memory mode at most max_concurrent_requests blobs are downloaded or wait for their parse at a time
+        blob_slots = asyncio.Semaphore(az_blob_service_client.max_concurrent_requests) if segmentation_policy else None
+
+        # If an ISM manifest already exists in the container, use its name (without extension) for the new manifests
+        for blob in blobs:
+            if blob.name.lower().endswith('.ism'):
+                manifest_name = blob.name.rsplit('.', 1)[0]
+                AsyncBlobDataHandler.__logger.info(f"Found existing manifest: {blob.name}, will use name: {manifest_name}")
+                break
+
+        results = await asyncio.gather(*[AsyncBlobDataHandler.__process_blob(blob, az_blob_service_client, convert_webvtt, media_cache, segmentation_policy, blob_slots)
+                                         for blob in blobs],
+                                       return_exceptions=True)
+
+        # Results are handled in listing order, which gives the same manifest name as the single-threaded BlobDataHandler
+        for blob, task_result in zip(blobs, results):
+            blob_name = blob.name
+            if isinstance(task_result, Exception):
+                AsyncBlobDataHandler.__logger.error(f"Error processing blob {blob_name}: {task_result}")
+                continue
+            key, result = task_result
+
+            # Skip VTT, TTML and CMFT files when determining manifest name
+            if not manifest_name and key:
+                is_text_file = blob_name.lower().endswith(('.vtt', '.ttml', '.cmft'))
+                if not is_text_file:
+                    manifest_name = key
+                    AsyncBlobDataHandler.__logger.info(f"Using manifest name from media file: {manifest_name}")
+
+            if MediaFormat.is_media_format(blob_name):
+                if not MediaFormat.is_mpi_format(blob_name):
+                    media_datas = Common.update_dict(media_datas, result)
+                else:
+                    media_index_datas = Common.update_dict(media_index_datas, result)
+            elif MediaFormat.is_text_format(blob_name):
+                if result is not None:
+                    text_datas_info.append(result)
+
+        return BlobMediaData(manifest_name, media_datas, media_index_datas, text_datas_info)
+
+    @staticmethod
+    async def __process_blob(blob, az_blob_service_client: AsyncAzureBlobServiceClient, convert_webvtt: bool = True, media_cache: Optional[ParsedMediaCache] = None,
+                             segmentation_policy: Optional[SegmentationPolicy] = None, blob_slots: Optional[asyncio.Semaphore] = None) -> Tuple[Optional[str], Optional[Union[Dict[str, Union[dict, MediaData]], TextDataInfo]]]:
+        AsyncBlobDataHandler.__logger.info(msg=f"Handle blob {blob.name}")
+        key, format = Common.get_key_and_format(blob.name)
+        format = format.lower() if format else format
+
+        # Skip VTT files early if they will be converted to CMFT
+        if blob.name.lower().endswith('.vtt') and convert_webvtt:
+            AsyncBlobDataHandler.__logger.info(f"Skipping VTT file {blob.name} - will be converted to CMFT")
+            return key, None
+
+        async with blob_slots or nullcontext():
+            return await AsyncBlobDataHandler.__download_blob(blob, key, format, az_blob_service_client, media_cache, segmentation_policy)
+
+    @staticmethod
+    async def __download_blob(blob, key: Optional[str], format: Optional[str], az_blob_service_client: AsyncAzureBlobServiceClient,
+                              media_cache: Optional[ParsedMediaCache] = None, segmentation_policy: Optional[SegmentationPolicy] = None
+                              ) -> Tuple[Optional[str], Optional[Union[Dict[str, Union[dict, MediaData]], TextDataInfo]]]:
+        cache_key = None
+        if media_cache and MediaFormat.is_media_format(blob.name):
+            # Same location as AzureStorageBackend, so the threaded and the async modes share the cached renditions
+            cache_key = media_cache.get_cache_key(f"container {az_blob_service_client.container_name}", blob.name, blob.etag, blob.size)
+            # SQLite may wait for the cache lock or the database lock, it is read off the event loop like renditions are stored by the folds
+            cached_media_data = await asyncio.to_thread(media_cache.get, cache_key)
+            if cached_media_data:
+                return key, {blob.name: cached_media_data}
+
+        result = await AsyncFileProcessor.process_file(format, blob.name, az_blob_service_client)
+        if cache_key and result:
+            result[blob.name][ParsedMediaCache.CACHE_KEY] = cache_key
+        if segmentation_policy and result and MediaFormat.is_media_format(blob.name):
+            # Parsed off the event loop, the atoms are dropped as soon as the tracks of the rendition are known
+            return key, {blob.name: await asyncio.to_thread(MediaDataParser.fold_media_data, blob.name, result[blob.name], media_cache, segmentation_policy)}
+        return key, result
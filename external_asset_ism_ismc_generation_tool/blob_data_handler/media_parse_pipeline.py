@@ -0,0 +1,95 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from os import cpu_count
+from threading import BoundedSemaphore
+from typing import Dict, Optional
+
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_cache_key import MediaCacheKey
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data_record import MediaDataRecord
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.media_data_parser.shared_media_buffer import SharedMediaBuffer
+
+
+class MediaParsePipeline:
+    """
+    Parses renditions in worker processes as soon as their atoms are downloaded, so that downloads and parsing overlap.
+    A download waits for a free slot before it starts and the slot is freed when the parse of the rendition is done, so that
+    at most max_pending_parses renditions are held in memory between the download threads and the worker processes.
+    """
+    __logger: ILogger = Logger("MediaParsePipeline")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, segmentation_policy: SegmentationPolicy, max_pending_parses: int):
+        self.segmentation_policy = segmentation_policy
+        self.max_pending_parses = max_pending_parses
+        self.executor = ProcessPoolExecutor(max_workers=cpu_count())
+        self.parse_slots = BoundedSemaphore(max_pending_parses)
+        # Cache keys of the renditions submitted for parsing, their MediaData is stored to the cache once parsed
+        self.cache_keys: Dict[str, Optional[MediaCacheKey]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional['MediaParsePipeline']:
+        if not settings or not settings.get('is_pipelined', False):
+            return None
+        return cls(SegmentationPolicy.from_settings(settings), Common.get_positive_int_setting(settings, 'max_pending_parses', 2 * cpu_count()))
+
+    def submit(self, blob_name: str, media_data: dict) -> Future:
+        """
+        Parses the atoms of a rendition downloaded in a slot taken by acquire, the slot is freed once the parse is done.
+        The atoms are copied to shared memory and the worker returns a MediaDataRecord, see get_media_data.
+        """
+        shared_media_buffer = None
+        try:
+            atoms = {'moov': media_data['moov'], 'moofs': media_data.get('moofs')}
+            shared_media_buffer = MediaParsePipeline.__share_media_data(blob_name, atoms)
+            if shared_media_buffer:
+                task = self.executor.submit(MediaDataParser.parse_shared_media_data, blob_name, shared_media_buffer.name,
+                                            shared_media_buffer.layouts[blob_name], self.segmentation_policy)
+            else:
+                task = self.executor.submit(MediaDataParser.parse_media_data, blob_name, atoms, self.segmentation_policy)
+        except Exception:
+            if shared_media_buffer:
+                shared_media_buffer.close()
+            self.parse_slots.release()
+            raise
+        task.add_done_callback(lambda _: self.__finish_parse(shared_media_buffer))
+        self.cache_keys[blob_name] = media_data.get(ParsedMediaCache.CACHE_KEY)
+        return task
+
+    @staticmethod
+    def get_media_data(task: Future) -> MediaData:
+        """ Returns the MediaData of a rendition parsed by a task of submit """
+        task_result = task.result()
+        return task_result.to_media_data() if isinstance(task_result, MediaDataRecord) else task_result
+
+    def acquire(self) -> None:
+        self.parse_slots.acquire()
+
+    def release(self) -> None:
+        self.parse_slots.release()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+    def __finish_parse(self, shared_media_buffer: Optional[SharedMediaBuffer]) -> None:
+        # The worker has detached from the shared memory once its parse is done
+        if shared_media_buffer:
+            shared_media_buffer.close()
+        self.parse_slots.release()
+
+    @staticmethod
+    def __share_media_data(blob_name: str, media_data: dict) -> Optional[SharedMediaBuffer]:
+        """ Copies the atoms of the rendition into shared memory, the atoms are pickled to the worker when it is not available """
+        try:
+            return SharedMediaBuffer({blob_name: media_data})
+        except OSError as e:
+            MediaParsePipeline.__logger.warning(f"Shared memory is not available, the atoms of {blob_name} are sent to the worker process: {e}")
+            return None
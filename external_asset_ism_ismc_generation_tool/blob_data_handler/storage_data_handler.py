@@ -0,0 +1,192 @@
+from typing import Dict, Union, Tuple, Optional
+from os import cpu_count
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.file_processor.storage_file_processor import StorageFileProcessor
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_format import MediaFormat
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.blob_data_handler.media_parse_pipeline import MediaParsePipeline
+from external_asset_ism_ismc_generation_tool.blob_data_handler.model.blob_media_data import BlobMediaData
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+from external_asset_ism_ismc_generation_tool.text_data_parser.model.text_data_info import TextDataInfo
+
+
+class StorageDataHandler:
+    __logger: ILogger = Logger("StorageDataHandler")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def get_data_from_storage(storage_backend: IStorageBackend, settings: Optional[dict] = None, media_cache: Optional[ParsedMediaCache] = None) -> BlobMediaData:
+        """
+        In pipelined mode (is_pipelined setting) renditions are parsed while the others are downloaded, media_datas of the result then
+        hold the MediaData of the renditions instead of their atoms.
+        In bounded memory mode (is_bounded_memory setting) renditions are parsed by the download threads and only their MediaData is kept,
+        so that memory is bounded by the renditions downloaded concurrently instead of the size of the storage.
+        """
+        StorageDataHandler.__logger.info(msg=f"Get files list from the {storage_backend.location}")
+        items = storage_backend.list()
+        if not items:
+            StorageDataHandler.__logger.error(msg=f"Cannot find files inside the {storage_backend.location}")
+            raise ValueError(f"Cannot find files inside the {storage_backend.location}")
+
+        executor = None
+        media_parse_pipeline = MediaParsePipeline.from_settings(settings)
+        try:
+            if storage_backend.is_multithreading or media_parse_pipeline:
+                threads_num = cpu_count()
+                executor = ThreadPoolExecutor(max_workers=threads_num)
+            blob_media_data: BlobMediaData = StorageDataHandler.__process_items(items, storage_backend, executor, settings, media_cache, media_parse_pipeline)
+
+        finally:
+            if executor:
+                executor.shutdown()
+            if media_parse_pipeline:
+                media_parse_pipeline.shutdown()
+
+        return blob_media_data
+
+    @staticmethod
+    def __process_items(items, storage_backend: IStorageBackend, executor: ThreadPoolExecutor, settings: Optional[dict] = None,
+                        media_cache: Optional[ParsedMediaCache] = None, media_parse_pipeline: Optional[MediaParsePipeline] = None) -> BlobMediaData:
+        manifest_name = ""
+        media_datas = None
+        media_index_datas = None
+        text_datas_info = []
+
+        # Check if VTT files should be converted to CMFT (default: False)
+        convert_webvtt = settings.get('convert_webvtt', False) if settings else False
+        # Policy of the renditions parsed right after their download in bounded memory mode
+        segmentation_policy = SegmentationPolicy.from_settings(settings) if settings and settings.get('is_bounded_memory', False) else None
+
+        # First, check if an ISM manifest already exists in the storage
+        # If it does, use its name (without extension) for the new manifests
+        for item in items:
+            if item.name.lower().endswith('.ism'):
+                manifest_name = item.name.rsplit('.', 1)[0]
+                StorageDataHandler.__logger.info(f"Found existing manifest: {item.name}, will use name: {manifest_name}")
+                break
+
+        task_mapping = StorageDataHandler.__map_item_tasks(items, storage_backend, executor, convert_webvtt, media_cache, media_parse_pipeline, segmentation_policy)
+
+        for task in Common.get_completed_tasks(task_mapping, executor):
+            name = task_mapping[task] if executor else task
+            try:
+                key, result = task.result() if executor else task_mapping[task]
+
+                # Set manifest name from first non-text file if not already set
+                # Skip VTT, TTML and CMFT files when determining manifest name
+                if not manifest_name and key:
+                    is_text_file = name.lower().endswith(('.vtt', '.ttml', '.cmft'))
+                    if not is_text_file:
+                        manifest_name = key
+                        StorageDataHandler.__logger.info(f"Using manifest name from media file: {manifest_name}")
+
+                if MediaFormat.is_media_format(name):
+                    if not MediaFormat.is_mpi_format(name):
+                        media_datas = Common.update_dict(media_datas, result)
+                    else:
+                        media_index_datas = Common.update_dict(media_index_datas, result)
+                elif MediaFormat.is_text_format(name):
+                    # VTT files are already filtered in __process_item when convert_webvtt is true
+                    if result is not None:
+                        text_datas_info.append(result)
+            except Exception as e:
+                StorageDataHandler.__logger.error(f"Error processing file {name}: {e}")
+
+        if media_parse_pipeline:
+            media_datas = StorageDataHandler.__get_parsed_media_datas(media_datas, media_parse_pipeline, media_cache)
+            media_index_datas = StorageDataHandler.__get_parsed_media_datas(media_index_datas, media_parse_pipeline, media_cache)
+
+        return BlobMediaData(manifest_name, media_datas, media_index_datas, text_datas_info)
+
+    @staticmethod
+    def __process_item(item: StorageItem, storage_backend: IStorageBackend, convert_webvtt: bool = True, media_cache: Optional[ParsedMediaCache] = None,
+                       segmentation_policy: Optional[SegmentationPolicy] = None) -> Tuple[Optional[str], Optional[Union[Dict[str, Union[dict, MediaData]], TextDataInfo]]]:
+        """ Atoms of a rendition are parsed right away with the segmentation_policy when it is set, the atoms are not returned then """
+        StorageDataHandler.__logger.info(msg=f"Handle file {item.name}")
+        key, format = Common.get_key_and_format(item.name)
+        # Normalize format to lowercase for consistent processing
+        format = format.lower() if format else format
+
+        # Skip VTT files early if they will be converted to CMFT
+        is_vtt = item.name.lower().endswith('.vtt')
+        if is_vtt and convert_webvtt:
+            StorageDataHandler.__logger.info(f"Skipping VTT file {item.name} - will be converted to CMFT")
+            return key, None
+
+        cache_key = None
+        if media_cache and MediaFormat.is_media_format(item.name):
+            # Unchanged renditions are neither downloaded nor parsed again
+            cache_key = media_cache.get_cache_key(storage_backend.location, item.name, item.version, item.size)
+            cached_media_data = media_cache.get(cache_key)
+            if cached_media_data:
+                return key, {item.name: cached_media_data}
+
+        result = StorageFileProcessor.process_file(format, item.name, storage_backend)
+        if cache_key and result:
+            result[item.name][ParsedMediaCache.CACHE_KEY] = cache_key
+        if segmentation_policy and result and MediaFormat.is_media_format(item.name):
+            return key, {item.name: MediaDataParser.fold_media_data(item.name, result[item.name], media_cache, segmentation_policy)}
+        return key, result
+
+    @staticmethod
+    def __process_pipelined_item(item: StorageItem, storage_backend: IStorageBackend, convert_webvtt: bool, media_cache: Optional[ParsedMediaCache],
+                                 media_parse_pipeline: MediaParsePipeline) -> Tuple[Optional[str], Optional[Union[Dict[str, Union[dict, MediaData, Future]], TextDataInfo]]]:
+        """ Downloads the item and submits the parse of its atoms right away, the future of the parse replaces the atoms in the result """
+        if not MediaFormat.is_media_format(item.name):
+            return StorageDataHandler.__process_item(item, storage_backend, convert_webvtt, media_cache)
+
+        media_parse_pipeline.acquire()
+        try:
+            key, result = StorageDataHandler.__process_item(item, storage_backend, convert_webvtt, media_cache)
+        except Exception:
+            media_parse_pipeline.release()
+            raise
+        media_data = result.get(item.name) if result else None
+        if not isinstance(media_data, dict):
+            # Cached renditions are not parsed again
+            media_parse_pipeline.release()
+            return key, result
+        return key, {item.name: media_parse_pipeline.submit(item.name, media_data)}
+
+    @staticmethod
+    def __get_parsed_media_datas(media_datas: Optional[Dict[str, Union[MediaData, Future]]], media_parse_pipeline: MediaParsePipeline,
+                                 media_cache: Optional[ParsedMediaCache] = None) -> Optional[Dict[str, MediaData]]:
+        if media_datas is None:
+            return None
+        parsed_media_datas = {}
+        for blob_name, media_data in media_datas.items():
+            if not isinstance(media_data, Future):
+                parsed_media_datas[blob_name] = media_data
+                continue
+            try:
+                parsed_media_datas[blob_name] = media_parse_pipeline.get_media_data(media_data)
+            except Exception as e:
+                StorageDataHandler.__logger.error(f"Error processing blob {blob_name}: {e}")
+                continue
+            if media_cache:
+                media_cache.put(media_parse_pipeline.cache_keys.get(blob_name), parsed_media_datas[blob_name])
+        return parsed_media_datas
+
+    @staticmethod
+    def __map_item_tasks(items, storage_backend: IStorageBackend, executor: ThreadPoolExecutor, convert_webvtt: bool = True,
+                         media_cache: Optional[ParsedMediaCache] = None, media_parse_pipeline: Optional[MediaParsePipeline] = None,
+                         segmentation_policy: Optional[SegmentationPolicy] = None) -> any:
+        if media_parse_pipeline:
+            return {executor.submit(StorageDataHandler.__process_pipelined_item, item, storage_backend, convert_webvtt, media_cache, media_parse_pipeline): item.name
+                    for item in items}
+        if executor:
+            return {executor.submit(StorageDataHandler.__process_item, item, storage_backend, convert_webvtt, media_cache, segmentation_policy): item.name
+                    for item in items}
+        else:
+            return {item.name: StorageDataHandler.__process_item(item, storage_backend, convert_webvtt, media_cache, segmentation_policy) for item in items}
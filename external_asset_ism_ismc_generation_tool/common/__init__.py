@@ -3,3 +3,4 @@ from external_asset_ism_ismc_generation_tool.common.bit_reader import BitReader
 from external_asset_ism_ismc_generation_tool.common.common import Common
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
@@ -50,6 +50,35 @@ class Common:
         else:
             return {}
 
+    @staticmethod
+    def update_dict(merged_dict: Optional[dict], dictionary: Optional[dict]) -> dict:
+        """ In-place variant of merge_dicts for accumulating results one at a time, the items of the dictionary are added to merged_dict """
+        if merged_dict is None:
+            merged_dict = {}
+        if dictionary:
+            merged_dict.update((key, value) for key, value in dictionary.items() if value is not None)
+        return merged_dict
+
+    @staticmethod
+    def get_positive_int_setting(settings: dict, key: str, default: int) -> int:
+        """ Integer setting above zero, e.g. a number of workers, connections or days """
+        value = settings.get(key, default)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            Common.__logger.error(f"Setting '{key}' must be a positive integer: {value}")
+            raise ValueError(f"Invalid setting {key}: {value}")
+        return value
+
+    @staticmethod
+    def get_number_setting(settings: dict, key: str, default: Optional[float], is_positive: bool = False) -> Optional[float]:
+        """ Setting of an integer or float number, e.g. a number of seconds, None when it is neither set nor defaulted """
+        value = settings.get(key, default)
+        if value is None:
+            return None
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or (is_positive and value <= 0):
+            Common.__logger.error(f"Setting '{key}' must be a {'positive ' if is_positive else ''}number: {value}")
+            raise ValueError(f"Invalid setting {key}: {value}")
+        return float(value)
+
     @staticmethod
     def get_key_and_format(blob_name) -> Tuple[Optional[str], str]:
         key = None
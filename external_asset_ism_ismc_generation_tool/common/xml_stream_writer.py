@@ -0,0 +1,62 @@
+import xml.etree.ElementTree as ET
+from typing import Iterable, List, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+
+class XmlStreamWriter:
+    """
+    Writes an XML document to a text sink element by element. The output is the same as ET.tostring with an XML declaration
+    of the whole tree indented by ET.indent, without building the tree: containers are opened and closed around their children
+    and leaf elements are written as soon as they are known.
+    """
+    _DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+    # Same escaping as ElementTree applies to attribute values
+    _ATTRIBUTE_ENTITIES = {'"': '&quot;', '\r': '&#13;', '\n': '&#10;', '\t': '&#09;'}
+
+    def __init__(self, sink: TextIO, space: str = "  "):
+        self.sink = sink
+        self.space = space
+        # Tags of the open elements and whether a child was written into them
+        self.__open_elements: List[List] = []
+
+    def write_declaration(self) -> None:
+        self.sink.write(XmlStreamWriter._DECLARATION)
+
+    def start_element(self, element: ET.Element) -> None:
+        """ Opens the element with its attributes, its children are written until end_element """
+        if len(element) or element.text:
+            raise ValueError(f"Element {element.tag} to start has children or text")
+        self.__start_child()
+        self.sink.write(f"<{element.tag}{XmlStreamWriter.__format_attributes(element.attrib.items())}")
+        self.__open_elements.append([element.tag, False])
+
+    def end_element(self) -> None:
+        tag, has_children = self.__open_elements.pop()
+        if has_children:
+            self.sink.write(f"\n{self.space * len(self.__open_elements)}</{tag}>")
+        else:
+            self.sink.write(" />")
+
+    def write_element(self, element: ET.Element) -> None:
+        """ Writes a complete element with its subtree """
+        self.__start_child()
+        ET.indent(element, self.space, len(self.__open_elements))
+        self.sink.write(ET.tostring(element, encoding="unicode"))
+
+    def write_empty_element(self, tag: str, attributes: Iterable[Tuple[str, str]]) -> None:
+        """ Writes an element without children from its attributes, no Element is built """
+        self.__start_child()
+        self.sink.write(f"<{tag}{XmlStreamWriter.__format_attributes(attributes)} />")
+
+    def __start_child(self) -> None:
+        if not self.__open_elements:
+            return
+        parent = self.__open_elements[-1]
+        if not parent[1]:
+            self.sink.write(">")
+            parent[1] = True
+        self.sink.write(f"\n{self.space * len(self.__open_elements)}")
+
+    @staticmethod
+    def __format_attributes(attributes: Iterable[Tuple[str, str]]) -> str:
+        return "".join(f' {name}="{escape(value, XmlStreamWriter._ATTRIBUTE_ENTITIES)}"' for name, value in attributes)
@@ -0,0 +1,50 @@
+from typing import Optional, Dict, Union
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.azure_client.async_azure_blob_service_client import AsyncAzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.media_data_parser.async_azure_media_data_parser import AsyncAzureMediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_format import MediaFormat
+from external_asset_ism_ismc_generation_tool.text_data_parser.text_data_parser import TextDataParser
+from external_asset_ism_ismc_generation_tool.text_data_parser.model.text_data_info import TextDataInfo
+
+
+class AsyncFileProcessor:
+    __logger: ILogger = Logger("AsyncFileProcessor")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    async def process_file(format: str, blob_name: str, az_blob_service_client: AsyncAzureBlobServiceClient) -> Optional[Union[Dict[str, Dict], TextDataInfo]]:
+        func = AsyncFileProcessor.__function_map.get(format)
+        if func:
+            return await func(blob_name, az_blob_service_client)
+        AsyncFileProcessor.__logger.info(f'Cannot parse file {blob_name} with format: {format}')
+        return None
+
+    @staticmethod
+    async def __process_media_file(blob_name: str, az_blob_service_client: AsyncAzureBlobServiceClient) -> Dict[str, Dict]:
+        media_data = {blob_name: await AsyncAzureMediaDataParser.get_media_data(az_blob_service_client, blob_name)}
+        return media_data
+
+    @staticmethod
+    async def __process_ttml_vtt(blob_name: str, az_blob_service_client: AsyncAzureBlobServiceClient) -> Optional[TextDataInfo]:
+        AsyncFileProcessor.__logger.info(f"Found a subtitle file {blob_name}")
+        try:
+            blob_contents = await az_blob_service_client.download_part_of_blob(blob_name=blob_name)
+        except Exception as e:
+            AsyncFileProcessor.__logger.error(f"Failed to process subtitle file {blob_name}: {e}")
+            AsyncFileProcessor.__logger.warning(f"Skipping {blob_name} and continuing with other files")
+            return None
+        return TextDataParser.get_text_data_info_from_contents(blob_name, blob_contents)
+
+    __function_map = {
+        MediaFormat.MP4.value: __process_media_file,
+        MediaFormat.MPI.value: __process_media_file,
+        MediaFormat.ISMV.value: __process_media_file,
+        MediaFormat.ISMA.value: __process_media_file,
+        MediaFormat.TTML.value: __process_ttml_vtt,
+        MediaFormat.VTT.value: __process_ttml_vtt,
+        MediaFormat.CMFT.value: __process_media_file
+    }
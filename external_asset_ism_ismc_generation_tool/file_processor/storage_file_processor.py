@@ -0,0 +1,44 @@
+from typing import Optional, Dict, Union
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.storage_media_data_parser import StorageMediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_format import MediaFormat
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.text_data_parser.text_data_parser import TextDataParser
+from external_asset_ism_ismc_generation_tool.text_data_parser.model.text_data_info import TextDataInfo
+
+
+class StorageFileProcessor:
+    __logger: ILogger = Logger("StorageFileProcessor")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def process_file(format: str, name: str, storage_backend: IStorageBackend) -> Optional[Union[Dict[str, Dict], TextDataInfo]]:
+        func = StorageFileProcessor.__function_map.get(format)
+        if func:
+            return func(name, storage_backend)
+        StorageFileProcessor.__logger.info(f'Cannot parse file {name} with format: {format}')
+        return None
+
+    @staticmethod
+    def __process_media_file(name: str, storage_backend: IStorageBackend) -> Dict[str, Dict]:
+        media_data = {name: StorageMediaDataParser.get_media_data(storage_backend, name)}
+        return media_data
+
+    @staticmethod
+    def __process_ttml_vtt(name: str, storage_backend: IStorageBackend) -> Optional[TextDataInfo]:
+        text_data_info = TextDataParser.get_text_data_info_from_storage(name, storage_backend)
+        return text_data_info
+
+    __function_map = {
+        MediaFormat.MP4.value: __process_media_file,
+        MediaFormat.MPI.value: __process_media_file,
+        MediaFormat.ISMV.value: __process_media_file,
+        MediaFormat.ISMA.value: __process_media_file,
+        MediaFormat.TTML.value: __process_ttml_vtt,
+        MediaFormat.VTT.value: __process_ttml_vtt,
+        MediaFormat.CMFT.value: __process_media_file
+    }
@@ -0,0 +1,52 @@
+import mmap
+from typing import Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+
+
+class LocalFileReader:
+    """
+    Read-only memory mapping of a local file: the file is opened once and every range read is a zero-copy
+    memoryview slice of the mapping. Slices must not outlive the reader, copy them with bytes() to keep them.
+    """
+    __logger: ILogger = Logger("LocalFileReader")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.__file = open(file_path, 'rb')
+        self.__mmap: Optional[mmap.mmap] = None
+        try:
+            # Empty files cannot be mapped
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = memoryview(self.__mmap)
+        except ValueError:
+            self.buffer = memoryview(b'')
+        self.size = len(self.buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read(self, offset: Optional[int] = None, length: Optional[int] = None) -> memoryview:
+        offset = offset or 0
+        return self.buffer[offset:None if length is None else offset + length]
+
+    def read_with_size(self, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[memoryview, int]:
+        return self.read(offset, length), self.size
+
+    def close(self):
+        self.buffer.release()
+        if self.__mmap is not None:
+            try:
+                self.__mmap.close()
+            except BufferError:
+                # Slices of the mapping are still referenced, the mapping is closed when they are garbage collected
+                self.__logger.warning(f"Memory mapping of {self.file_path} is still in use and will be closed later")
+        self.__file.close()
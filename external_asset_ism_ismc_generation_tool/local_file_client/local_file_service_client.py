@@ -1,8 +1,9 @@
 import os
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.local_file_client.local_file_reader import LocalFileReader
 
 
 class LocalFileItem:
@@ -62,11 +63,37 @@ class LocalFileServiceClient:
             else:
                 return f.read()
 
-    def write_file(self, file_name: str, content: str):
-        """Write content to a local file"""
+    def open_file(self, file_name: str) -> LocalFileReader:
+        """Open a memory-mapped reader of a local file, to be used as a context manager"""
+        file_path = os.path.join(self.local_directory, file_name)
+
+        if not os.path.exists(file_path):
+            self.__logger.error(f'File does not exist: {file_path}')
+            raise FileNotFoundError(f"File does not exist: {file_path}")
+
+        return LocalFileReader(file_path)
+
+    def get_file_size(self, file_name: str) -> int:
+        """Return the size of a local file in bytes"""
+        file_path = os.path.join(self.local_directory, file_name)
+
+        if not os.path.exists(file_path):
+            self.__logger.error(f'File does not exist: {file_path}')
+            raise FileNotFoundError(f"File does not exist: {file_path}")
+
+        return os.path.getsize(file_path)
+
+    def get_file_stat(self, file_name: str) -> os.stat_result:
+        """Return the stat of a local file (size, modification time, inode)"""
+        return os.stat(os.path.join(self.local_directory, file_name))
+
+    def write_file(self, file_name: str, content: Union[str, bytes]):
+        """Write text or binary content to a local file"""
         file_path = os.path.join(self.local_directory, file_name)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        with open(file_path, 'wb') as f:
             f.write(content)
         
         self.__logger.info(f'Written file: {file_path}')
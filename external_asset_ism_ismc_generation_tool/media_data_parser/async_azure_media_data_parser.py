@@ -0,0 +1,28 @@
+from typing import Dict
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.azure_client.async_azure_blob_service_client import AsyncAzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_atom_locator import MediaAtomLocator
+from external_asset_ism_ismc_generation_tool.media_data_parser.range_read_planner import RangeReadPlanner
+
+
+class AsyncAzureMediaDataParser:
+    __logger: ILogger = Logger("AsyncAzureMediaDataParser")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    async def get_media_data(az_blob_service_client: AsyncAzureBlobServiceClient, blob_name: str) -> Dict[str, any]:
+        read_planner = RangeReadPlanner()
+
+        try:
+            media_data = await RangeReadPlanner.run_async(
+                MediaAtomLocator.locate_media_atoms(read_planner, blob_name),
+                lambda offset, length: az_blob_service_client.download_part_of_blob_with_size(blob_name=blob_name, offset=offset, length=length))
+        except Exception as e:
+            raise Exception(f"An unexpected error occurred: {str(e)}")
+
+        AsyncAzureMediaDataParser.__logger.info(f"Read atoms of {blob_name} with {read_planner.request_count} range request(s)")
+        return media_data
@@ -0,0 +1,43 @@
+from typing import Optional
+
+import numpy as np
+from tools.pymp4.src.pymp4.parser import Box
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box import LazyBox
+
+
+class SampleTableDecoder:
+    """
+    Reads fields and tables of sample table boxes (stsz, stts, stss) directly from the big-endian payload of a lazily indexed box,
+    so the per-sample entries are never decoded into pymp4 containers.
+    """
+    _UINT32 = np.dtype('>u4')
+    _UINT32_SIZE = 4
+    __logger: ILogger = Logger("SampleTableDecoder")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def get_payload(box: Box) -> Optional[memoryview]:
+        """ Returns the payload of a lazily indexed box, or None for a box already decoded by pymp4 """
+        if isinstance(box, LazyBox):
+            return box.get_payload()
+        return None
+
+    @staticmethod
+    def read_uint32(payload: memoryview, offset: int) -> int:
+        return int.from_bytes(payload[offset:offset + SampleTableDecoder._UINT32_SIZE], 'big')
+
+    @staticmethod
+    def read_uint32_table(payload: memoryview, offset: int, entry_count: int, columns: int = 1) -> np.ndarray:
+        """ Returns `entry_count` rows of `columns` uint32 values as an int64 array, flat for a single column """
+        available_count = (len(payload) - offset) // (SampleTableDecoder._UINT32_SIZE * columns)
+        if available_count < entry_count:
+            SampleTableDecoder.__logger.warning(f'Sample table declares {entry_count} entries, only {available_count} are present')
+            entry_count = max(available_count, 0)
+        table = np.frombuffer(payload, dtype=SampleTableDecoder._UINT32, count=entry_count * columns, offset=offset).astype(np.int64)
+        return table if columns == 1 else table.reshape(entry_count, columns)
@@ -1,12 +1,16 @@
 from typing import Optional
 
+import numpy as np
 from tools.pymp4.src.pymp4.parser import Box
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.sample_table_decoder import SampleTableDecoder
 
 
 class STSSParser:
+    # version and flags, entry_count
+    _ENTRIES_OFFSET = 8
     __logger: ILogger = Logger("STSSParser")
 
     @classmethod
@@ -16,6 +20,12 @@ class STSSParser:
     def __init__(self, stss_atom: Box):
         self.stss_atom = stss_atom
 
-    def get_key_frames_numbers_from_stss(self) -> Optional[list]:
-        if self.stss_atom:
-            return [str(entry.sample_number) for entry in self.stss_atom['entries']]
+    def get_key_frames_numbers_from_stss(self) -> Optional[np.ndarray]:
+        """ 1-based numbers of the sync samples, None when the track has no stss atom """
+        if not self.stss_atom:
+            return None
+        payload = SampleTableDecoder.get_payload(self.stss_atom)
+        if payload is None:
+            return np.fromiter((entry.sample_number for entry in self.stss_atom['entries']), dtype=np.int64)
+        entry_count = SampleTableDecoder.read_uint32(payload, 4)
+        return SampleTableDecoder.read_uint32_table(payload, STSSParser._ENTRIES_OFFSET, entry_count)
@@ -1,12 +1,16 @@
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
 from tools.pymp4.src.pymp4.parser import Box
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.sample_table_decoder import SampleTableDecoder
 
 
 class STSZParser:
+    # version and flags, sample_size, sample_count
+    _ENTRY_SIZES_OFFSET = 12
     __logger: ILogger = Logger("STSZParser")
 
     @classmethod
@@ -30,8 +34,25 @@ class STSZParser:
                 "STSZ atom is None. Returning 0 (size will be calculated from moof fragments for fragmented MP4)."
             )
             return 0
+        sample_size, sample_count = self.get_sample_size_and_count()
         # If sample_size is non-zero, all samples have the same size
-        if self.stsz_atom.sample_size != 0:
-            return self.stsz_atom.sample_size * self.stsz_atom.sample_count
+        if sample_size != 0:
+            return sample_size * sample_count
         # Otherwise, entry_sizes contains individual sample sizes
-        return sum(entry_size for entry_size in self.stsz_atom.entry_sizes)
+        return int(self.get_entry_sizes().sum())
+
+    def get_sample_size_and_count(self) -> Tuple[int, int]:
+        payload = SampleTableDecoder.get_payload(self.stsz_atom)
+        if payload is None:
+            return self.stsz_atom.sample_size, self.stsz_atom.sample_count
+        return SampleTableDecoder.read_uint32(payload, 4), SampleTableDecoder.read_uint32(payload, 8)
+
+    def get_entry_sizes(self) -> np.ndarray:
+        """ Sizes of the samples, empty when all samples have the same size """
+        payload = SampleTableDecoder.get_payload(self.stsz_atom)
+        if payload is None:
+            return np.fromiter(self.stsz_atom.entry_sizes, dtype=np.int64)
+        sample_size, sample_count = self.get_sample_size_and_count()
+        if sample_size != 0:
+            return np.empty(0, dtype=np.int64)
+        return SampleTableDecoder.read_uint32_table(payload, STSZParser._ENTRY_SIZES_OFFSET, sample_count)
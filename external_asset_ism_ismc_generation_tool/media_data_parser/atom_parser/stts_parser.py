@@ -1,13 +1,19 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
+import numpy as np
 from tools.pymp4.src.pymp4.parser import Box
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.sample_table_decoder import SampleTableDecoder
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
 
 
 class STTSParser:
+    # version and flags, entry_count
+    _ENTRIES_OFFSET = 8
     __logger: ILogger = Logger("STTSParser")
 
     @classmethod
@@ -16,37 +22,79 @@ class STTSParser:
 
     def __init__(self, stts_atom: Box):
         self.stts_atom = stts_atom
-        self.stts_atom_entries = stts_atom['entries']
+        self.sample_counts, self.sample_deltas = self.__decode_entries(stts_atom)
 
     def get_sample_count(self) -> int:
-        return sum(entry.sample_count for entry in self.stts_atom_entries)
+        return int(self.sample_counts.sum())
 
     def aggregate_sample_info(self) -> List:
-        sample_info = []
-        cumulative = 0
-        for entry in self.stts_atom_entries:
-            cumulative += entry.sample_count
-            sample_info.append((cumulative, entry.sample_delta))
-        return sample_info
-
-    def get_chunk_durations_from_stts(self, track_type: TrackType, timescale: int, key_frames_numbers: Optional[list] = None) -> list:
-        _SEGMENT_DURATION = 2  # 2 sec TODO: move to general settings
-        chunk_durations: list = []
-
-        sample_info_list = self.aggregate_sample_info()
-        sample_number = 1
-        chunk_duration = 0
-        for sample_count, sample_duration in sample_info_list:
-            while sample_number <= sample_count:
-                if track_type == TrackType.VIDEO and chunk_duration >= _SEGMENT_DURATION * timescale and str(sample_number) in key_frames_numbers:
-                    chunk_durations.append(chunk_duration / timescale)
-                    chunk_duration = 0
-                elif chunk_duration > _SEGMENT_DURATION * timescale:
-                    chunk_durations.append(chunk_duration / timescale)
-                    chunk_duration = 0
-                chunk_duration += sample_duration
-                sample_number += 1
-
-        chunk_durations.append(chunk_duration / timescale)
-
-        return chunk_durations
+        return list(zip(np.cumsum(self.sample_counts).tolist(), self.sample_deltas.tolist()))
+
+    def get_sample_durations(self) -> np.ndarray:
+        return np.repeat(self.sample_deltas, self.sample_counts)
+
+    def get_sample_decode_times(self) -> np.ndarray:
+        """ Decode time of every sample and the end time of the last one, len(result) == sample count + 1 """
+        decode_times = np.zeros(self.get_sample_count() + 1, dtype=np.int64)
+        np.cumsum(self.get_sample_durations(), out=decode_times[1:])
+        return decode_times
+
+    @staticmethod
+    def __decode_entries(stts_atom: Box) -> Tuple[np.ndarray, np.ndarray]:
+        payload = SampleTableDecoder.get_payload(stts_atom)
+        if payload is None:
+            entries = stts_atom['entries']
+            return (np.fromiter((entry.sample_count for entry in entries), dtype=np.int64, count=len(entries)),
+                    np.fromiter((entry.sample_delta for entry in entries), dtype=np.int64, count=len(entries)))
+        entry_count = SampleTableDecoder.read_uint32(payload, 4)
+        entries = SampleTableDecoder.read_uint32_table(payload, STTSParser._ENTRIES_OFFSET, entry_count, columns=2)
+        return entries[:, 0], entries[:, 1]
+
+    def get_chunk_durations_from_stts(self, track_type: TrackType, timescale: int, key_frames_numbers: Optional[np.ndarray] = None,
+                                      segmentation_policy: Optional[SegmentationPolicy] = None) -> ChunkTimeline:
+        """
+        A chunk is closed before the first sample at which it already lasts longer than the maximum chunk duration of the policy,
+        or, for video aligned to key frames, before the first key frame at which it lasts at least the target duration.
+        Every cut is found with a binary search over the cumulative decode times, so the cost depends on the number of chunks, not samples.
+        """
+        segmentation_policy = segmentation_policy or SegmentationPolicy()
+        is_key_frame_aligned = track_type == TrackType.VIDEO and segmentation_policy.align_to_key_frames
+        chunk_durations: List[int] = []
+        target_length = segmentation_policy.target_duration * timescale
+        max_length = segmentation_policy.get_max_chunk_duration(is_key_frame_aligned) * timescale
+        decode_times = self.get_sample_decode_times()
+        sample_start_times = decode_times[:-1]
+        sample_count = len(sample_start_times)
+        if is_key_frame_aligned and key_frames_numbers is not None:
+            key_frames = np.unique(key_frames_numbers)
+            key_frames = key_frames[(key_frames >= 1) & (key_frames <= sample_count)]
+        else:
+            key_frames = np.empty(0, dtype=np.int64)
+        key_frame_times = sample_start_times[key_frames - 1]
+
+        chunk_start_time = 0
+        previous_chunk_start_time = 0
+        # 1-based number of the first sample a cut can be made before
+        first_sample_number = 1
+        while True:
+            cut_sample_number = max(int(np.searchsorted(sample_start_times, chunk_start_time + max_length, side='right')) + 1, first_sample_number)
+            key_frame_index = max(int(np.searchsorted(key_frame_times, chunk_start_time + target_length, side='left')),
+                                  int(np.searchsorted(key_frames, first_sample_number, side='left')))
+            if key_frame_index < len(key_frames):
+                cut_sample_number = min(cut_sample_number, int(key_frames[key_frame_index]))
+            if cut_sample_number > sample_count:
+                break
+            cut_time = int(sample_start_times[cut_sample_number - 1])
+            chunk_durations.append(cut_time - chunk_start_time)
+            previous_chunk_start_time = chunk_start_time
+            chunk_start_time = cut_time
+            first_sample_number = cut_sample_number + 1
+
+        end_time = int(decode_times[-1])
+        if chunk_durations and end_time - chunk_start_time < segmentation_policy.min_chunk_duration * timescale:
+            # A too short last chunk is merged into the previous one
+            chunk_durations[-1] = end_time - previous_chunk_start_time
+        else:
+            chunk_durations.append(end_time - chunk_start_time)
+
+        return ChunkTimeline(timescale, chunk_durations)
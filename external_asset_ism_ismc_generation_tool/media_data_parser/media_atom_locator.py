@@ -0,0 +1,162 @@
+from typing import Tuple, Dict, Generator, List, Optional
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.atom.atom_type import AtomType
+from external_asset_ism_ismc_generation_tool.media_data_parser.mfra_index_reader import MfraIndexReader
+from external_asset_ism_ismc_generation_tool.media_data_parser.range_read_planner import RangeReadPlanner, RangeRequest, RangeResponse
+
+
+class MediaAtomLocator:
+    """
+    Locates the moov and moof atoms of a media file through a RangeReadPlanner.
+    All methods are generators yielding range requests, see RangeReadPlanner.run() and RangeReadPlanner.run_async().
+    """
+    _MEDIA_HEADER_LENGTH = 8  # 8 bytes
+    _MEDIA_LARGE_SIZE_LENGTH = 8  # 8 bytes of 64-bit size following the header when size == 1
+    _MOOF_PREFETCH_BATCH_SIZE = 32
+    _MOOFS = 'moofs'
+    __logger: ILogger = Logger("MediaAtomLocator")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def locate_media_atoms(read_planner: RangeReadPlanner, media_name: str) -> Generator[RangeRequest, RangeResponse, Dict[str, any]]:
+        media_data: Dict[str, any] = {}
+
+        moov_size, moov_data, start_byte = yield from MediaAtomLocator.__find_atom(read_planner, media_name, AtomType.MOOV_ATOM_TYPE.value)
+        media_data[AtomType.MOOV_ATOM_TYPE.value] = moov_data
+        if AtomType.MVEX_ATOM_TYPE.value.encode() in moov_data:
+            start_byte += moov_size
+            try:
+                moofs = yield from MediaAtomLocator.__read_indexed_moofs(read_planner, media_name, start_byte)
+                if moofs is None:
+                    moofs = yield from MediaAtomLocator.__scan_moofs(read_planner, media_name, start_byte)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise Exception(f"Error downloading moof boxes after offset {start_byte}: {str(e)}")
+            if not moofs:
+                raise ValueError(f"Atom '{AtomType.MOOF_ATOM_TYPE.value}' not found in {media_name}")
+            media_data[MediaAtomLocator._MOOFS] = moofs
+        else:
+            media_data[MediaAtomLocator._MOOFS] = []
+
+        return media_data
+
+    @staticmethod
+    def __scan_moofs(read_planner: RangeReadPlanner, media_name: str, offset: int) -> Generator[RangeRequest, RangeResponse, List[bytes]]:
+        """
+        Walk the top-level atoms from 'offset', reading each moof header and body and skipping any other atom,
+        most notably mdat, by its size, so no media payload is downloaded. The walk stops at mfra or at the end of the file.
+        """
+        moofs: List[bytes] = []
+        start_byte = offset
+        while read_planner.size is None or start_byte < read_planner.size:
+            atom_header_data, atom_size, atom_type = yield from MediaAtomLocator.__read_atom_header(read_planner, media_name, start_byte)
+            if not atom_header_data:
+                break
+            if atom_type == AtomType.MOOF_ATOM_TYPE.value:
+                moofs.append((yield from read_planner.read(start_byte, atom_size)))
+            elif atom_type == AtomType.MFRA_ATOM_TYPE.value:
+                break
+            start_byte += atom_size
+            read_planner.discard_before(start_byte)
+        return moofs
+
+    @staticmethod
+    def __read_indexed_moofs(read_planner: RangeReadPlanner, media_name: str, offset: int) -> Generator[RangeRequest, RangeResponse, Optional[List[bytes]]]:
+        """
+        Fast path for files ending with an mfra box: the moof offsets listed in its tfra boxes are prefetched in batches
+        instead of being discovered one after another. The index is only trusted when the moofs and their mdat boxes
+        tile the file from the first moof up to the mfra; otherwise None is returned and the file is scanned linearly.
+        """
+        fragment_index = yield from MfraIndexReader.read_index(read_planner, media_name)
+        moof_offsets = fragment_index.moof_offsets if fragment_index else []
+        if not moof_offsets:
+            return None
+        MediaAtomLocator.__logger.info(f"Read mfra index of {media_name}: {len(moof_offsets)} fragments of tracks {sorted(fragment_index.track_entries)}")
+
+        moofs: List[bytes] = []
+        start_byte = offset
+        for batch_start in range(0, len(moof_offsets), MediaAtomLocator._MOOF_PREFETCH_BATCH_SIZE):
+            batch = moof_offsets[batch_start:batch_start + MediaAtomLocator._MOOF_PREFETCH_BATCH_SIZE]
+            yield from read_planner.prefetch([(moof_offset, MediaAtomLocator._MEDIA_HEADER_LENGTH) for moof_offset in batch])
+            for moof_offset in batch:
+                # Atoms other than moof/mdat (e.g. free, sidx) may only precede the first moof
+                while not moofs and start_byte < moof_offset:
+                    atom_header_data, atom_size, atom_type = yield from MediaAtomLocator.__read_atom_header(read_planner, media_name, start_byte)
+                    if not atom_header_data or atom_type in (AtomType.MOOF_ATOM_TYPE.value, AtomType.MDAT_ATOM_TYPE.value):
+                        break
+                    start_byte += atom_size
+                if start_byte != moof_offset:
+                    MediaAtomLocator.__logger.warning(f"mfra index of {media_name} does not match atom layout at offset {start_byte}, scanning moofs linearly")
+                    return None
+                moof_header_data, moof_size, moof_type = yield from MediaAtomLocator.__read_atom_header(read_planner, media_name, moof_offset)
+                if moof_type != AtomType.MOOF_ATOM_TYPE.value:
+                    MediaAtomLocator.__logger.warning(f"mfra index of {media_name} points to '{moof_type}' at offset {moof_offset}, scanning moofs linearly")
+                    return None
+                moofs.append((yield from read_planner.read(moof_offset, moof_size)))
+                start_byte = moof_offset + moof_size
+                mdat_header_data, mdat_size, mdat_type = yield from MediaAtomLocator.__read_atom_header(read_planner, media_name, start_byte)
+                if mdat_type == AtomType.MDAT_ATOM_TYPE.value:
+                    start_byte += mdat_size
+            read_planner.discard_before(start_byte)
+
+        if start_byte != fragment_index.mfra_offset:
+            MediaAtomLocator.__logger.warning(f"mfra index of {media_name} does not cover all fragments, scanning moofs linearly")
+            return None
+        return moofs
+
+    @staticmethod
+    def __read_atom_header(read_planner: RangeReadPlanner, media_name: str, offset: int) -> Generator[RangeRequest, RangeResponse, Tuple[bytes, int, Optional[str]]]:
+        atom_header_data = yield from read_planner.read(offset, MediaAtomLocator._MEDIA_HEADER_LENGTH)
+        if not atom_header_data:
+            return b'', 0, None
+        atom_size, atom_type = MediaAtomLocator.__parse_atom_header(atom_header_data)
+        if atom_size == 1:
+            atom_header_data += yield from read_planner.read(offset + MediaAtomLocator._MEDIA_HEADER_LENGTH, MediaAtomLocator._MEDIA_LARGE_SIZE_LENGTH)
+            atom_size = int.from_bytes(atom_header_data[MediaAtomLocator._MEDIA_HEADER_LENGTH:], byteorder='big')
+        elif atom_size == 0 and read_planner.size is not None:
+            atom_size = read_planner.size - offset
+        if atom_size < len(atom_header_data):
+            raise ValueError(f"Invalid size {atom_size} of atom '{atom_type}' at offset {offset} in {media_name}")
+        return atom_header_data, atom_size, atom_type
+
+    @staticmethod
+    def __find_atom(read_planner: RangeReadPlanner, media_name: str, atom_type_to_find: str, offset: int = 0) -> Generator[RangeRequest, RangeResponse, Tuple[int, bytes, int]]:
+        start_byte = offset
+
+        while True:
+            if read_planner.size is not None and start_byte >= read_planner.size:
+                raise ValueError(f"Atom '{atom_type_to_find}' not found in {media_name}")
+            try:
+                atom_header_data, atom_size, atom_type = yield from MediaAtomLocator.__read_atom_header(read_planner, media_name, start_byte)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise Exception(f"Error downloading data at offset {start_byte}: {str(e)}")
+            if not atom_header_data:
+                raise ValueError(f"Atom '{atom_type_to_find}' not found in {media_name}")
+
+            try:
+                if atom_type == atom_type_to_find:
+                    atom_data = yield from read_planner.read(start_byte, atom_size)
+                    return atom_size, atom_data, start_byte
+            except Exception as e:
+                raise Exception(f"Error downloading data at offset {start_byte} for atom {atom_type_to_find}: {str(e)}")
+
+            start_byte += atom_size
+
+    @staticmethod
+    def __parse_atom_header(data: bytes) -> Tuple[int, str]:
+        if len(data) != MediaAtomLocator._MEDIA_HEADER_LENGTH:
+            MediaAtomLocator.__logger.error(f'Cannot parse media file: Invalid atom header length: {data}')
+            raise ValueError("Invalid atom header length")
+
+        size = int.from_bytes(data[:4], byteorder='big')
+        atom_type = data[4:8].decode('utf-8')
+
+        return size, atom_type
@@ -0,0 +1,50 @@
+from typing import Optional, List
+
+from tools.pymp4.src.pymp4.parser import Box, Container
+
+
+class LazyBox:
+    """
+    Box header indexed by the LazyBoxNavigator. Container boxes expose their `children` like a parsed pymp4 box,
+    any other field is read from the box decoded with pymp4 on first access.
+    """
+    __slots__ = ('type', 'offset', 'size', 'header_size', '_children', '_buffer', '_decoded')
+
+    def __init__(self, box_type: bytes, offset: int, size: int, header_size: int, buffer: memoryview, children: Optional[List['LazyBox']] = None):
+        self.type = box_type
+        self.offset = offset
+        self.size = size
+        self.header_size = header_size
+        self._children = children
+        self._buffer = buffer
+        self._decoded = None
+
+    def is_container(self) -> bool:
+        return self._children is not None
+
+    def get_payload(self) -> memoryview:
+        return self._buffer[self.offset + self.header_size:self.offset + self.size]
+
+    def decode(self) -> Container:
+        if self._decoded is None:
+            self._decoded = Box.parse(bytes(self._buffer[self.offset:self.offset + self.size]))
+        return self._decoded
+
+    def __getattr__(self, item: str):
+        if item == 'children' and self._children is not None:
+            return self._children
+        if item.startswith('_') or self._children is not None:
+            raise AttributeError(item)
+        try:
+            return getattr(self.decode(), item)
+        except KeyError:
+            raise AttributeError(item)
+
+    def __getitem__(self, item: str):
+        return self.decode()[item]
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.decode()
+
+    def __repr__(self) -> str:
+        return f"LazyBox(type={self.type!r}, offset={self.offset}, size={self.size})"
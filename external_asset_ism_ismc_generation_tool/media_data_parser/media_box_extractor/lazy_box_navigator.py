@@ -0,0 +1,87 @@
+from typing import Optional, List, Union
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box import LazyBox
+
+
+class LazyBoxNavigator:
+    """
+    Indexes box headers of mp4 data in one pass over a memoryview without decoding box payloads.
+    Boxes are looked up by path (e.g. `moov/trak/mdia/minf/stbl/stsd`) and only the returned boxes are decoded, on access.
+    """
+    _HEADER_SIZE = 8
+    _LARGE_HEADER_SIZE = 16
+    # Boxes pymp4 parses as containers
+    _CONTAINER_TYPES = frozenset((b'moov', b'moof', b'traf', b'mvex', b'trak', b'mdia', b'minf', b'dinf', b'stbl', b'schi', b'vttc', b'vttx'))
+    # Sample entries pymp4 parses without their child boxes, which then show up as siblings of `stsd` in `stbl`
+    _AUDIO_SAMPLE_ENTRY_FORMATS = frozenset((b'ec-3', b'mp4a', b'enca'))
+    _AUDIO_SAMPLE_ENTRY_SIZE = 36
+    _STSD_ENTRIES_OFFSET = 8
+    __logger: ILogger = Logger("LazyBoxNavigator")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self.__buffer = data if isinstance(data, memoryview) else memoryview(data)
+        self.boxes: List[LazyBox] = self.__index_boxes(0, len(self.__buffer))
+
+    def find(self, path: str, root: Optional[LazyBox] = None) -> Optional[LazyBox]:
+        boxes = self.find_all(path, root)
+        return boxes[0] if boxes else None
+
+    def find_all(self, path: str, root: Optional[LazyBox] = None) -> List[LazyBox]:
+        if root is None:
+            boxes = self.boxes
+        elif root.is_container():
+            boxes = root.children
+        else:
+            return []
+        box_types = path.strip('/').split('/')
+        for depth, box_type in enumerate(box_types):
+            box_type = box_type.encode()
+            matched = [box for box in boxes if box.type == box_type]
+            if depth == len(box_types) - 1:
+                return matched
+            boxes = [child for box in matched if box.is_container() for child in box.children]
+        return []
+
+    def __index_boxes(self, start: int, end: int) -> List[LazyBox]:
+        boxes = []
+        buffer = self.__buffer
+        offset = start
+        while offset + LazyBoxNavigator._HEADER_SIZE <= end:
+            size = int.from_bytes(buffer[offset:offset + 4], 'big')
+            box_type = bytes(buffer[offset + 4:offset + 8])
+            header_size = LazyBoxNavigator._HEADER_SIZE
+            if size == 1:
+                if offset + LazyBoxNavigator._LARGE_HEADER_SIZE > end:
+                    break
+                size = int.from_bytes(buffer[offset + 8:offset + 16], 'big')
+                header_size = LazyBoxNavigator._LARGE_HEADER_SIZE
+            elif size == 0:
+                size = end - offset
+            if size < header_size or offset + size > end:
+                LazyBoxNavigator.__logger.warning(f"Stop indexing at '{box_type}' box with invalid size {size} at offset {offset}")
+                break
+
+            children = None
+            if box_type in LazyBoxNavigator._CONTAINER_TYPES:
+                children = self.__index_boxes(offset + header_size, offset + size)
+            boxes.append(LazyBox(box_type, offset, size, header_size, buffer, children))
+            if box_type == b'stsd':
+                boxes.extend(self.__index_audio_sample_entry_boxes(offset + header_size, offset + size))
+            offset += size
+        return boxes
+
+    def __index_audio_sample_entry_boxes(self, start: int, end: int) -> List[LazyBox]:
+        entry_offset = start + LazyBoxNavigator._STSD_ENTRIES_OFFSET
+        if entry_offset + LazyBoxNavigator._HEADER_SIZE > end:
+            return []
+        entry_size = int.from_bytes(self.__buffer[entry_offset:entry_offset + 4], 'big')
+        entry_format = bytes(self.__buffer[entry_offset + 4:entry_offset + 8])
+        if entry_format not in LazyBoxNavigator._AUDIO_SAMPLE_ENTRY_FORMATS:
+            return []
+        return self.__index_boxes(entry_offset + LazyBoxNavigator._AUDIO_SAMPLE_ENTRY_SIZE, min(entry_offset + entry_size, end))
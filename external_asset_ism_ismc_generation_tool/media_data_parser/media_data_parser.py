@@ -1,17 +1,24 @@
-from typing import Tuple, Dict, List, Union
-from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Dict, List, Union, Optional
+from concurrent.futures import Future, ProcessPoolExecutor
 from os import cpu_count
 from tools.pymp4.src.pymp4.parser import Box
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
 from external_asset_ism_ismc_generation_tool.common.common import Common
-from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.media_box_extractor import MediaBoxExtractor
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box_navigator import LazyBoxNavigator
 from external_asset_ism_ismc_generation_tool.media_data_parser.media_track_info_extractor import MediaTrackInfoExtractor
+from external_asset_ism_ismc_generation_tool.media_data_parser.moof_fragment_decoder import MoofFragmentDecoder
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.atom.track_fragment import TrackFragment
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_track_info import MediaTrackInfo
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data_record import MediaDataRecord
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_format import MediaFormat
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.media_data_parser.shared_media_buffer import SharedMediaBuffer, MediaAtomLayout
 
 
 class MediaDataParser:
@@ -24,13 +31,20 @@ class MediaDataParser:
         cls.__logger = logger
 
     @staticmethod
-    def get_media_data(media_datas: Dict[str, dict], media_index_datas: Dict[str, dict] = None, is_multithreading: bool = False) -> MediaData:
+    def get_media_data(media_datas: Dict[str, Union[dict, MediaData]], media_index_datas: Dict[str, Union[dict, MediaData]] = None, is_multithreading: bool = False,
+                       media_cache: Optional[ParsedMediaCache] = None, segmentation_policy: Optional[SegmentationPolicy] = None) -> MediaData:
+        """
+        Values of media_datas are the atoms of a rendition, or its MediaData already taken from the media_cache.
+        Renditions parsed here are stored to the media_cache when their atoms carry a cache key.
+        Chunks of non-fragmented renditions are grouped according to the segmentation_policy, the default policy when it is not set.
+        With is_multithreading, the atoms of a rendition are copied to shared memory for its worker and dropped from its dict.
+        """
         executor = None
         try:
             if is_multithreading:
                 threads_num = cpu_count()
                 executor = ProcessPoolExecutor(max_workers=threads_num)
-            media_data: MediaData = MediaDataParser.__aggregate_media_data(media_datas, media_index_datas, executor)
+            media_data: MediaData = MediaDataParser.__aggregate_media_data(media_datas, media_index_datas, executor, media_cache, segmentation_policy)
             MediaDataParser.__update_media_track_info_list(media_data)
 
         finally:
@@ -40,32 +54,34 @@ class MediaDataParser:
         return media_data
 
     @staticmethod
-    def parse_media_data(blob_name: str, media_data: Dict[str, Union[bytes, List[bytes]]]) -> Tuple[int, List[MediaTrackInfo]]:
-        moof_fragments = {}
+    def parse_media_data(blob_name: str, media_data: Dict[str, Union[bytes, List[bytes]]], segmentation_policy: Optional[SegmentationPolicy] = None) -> Tuple[int, List[MediaTrackInfo]]:
         media_track_info_list = []
         media_duration = 0
 
-        parsed_moov_box = MediaBoxExtractor.extract_media_boxes(media_data["moov"])
-        if not parsed_moov_box:
+        # Only the boxes requested below are decoded, sample tables of the moov are not parsed upfront
+        moov_navigator = LazyBoxNavigator(media_data["moov"])
+        if not moov_navigator.boxes:
             MediaDataParser.__logger.error(f'Cannot parse moov box: {media_data["moov"]} for {blob_name}')
             raise ValueError("Cannot parse moov box")
 
-        moov_atom = MediaBoxExtractor.get_mp4_box(parsed_moov_box, 'moov')
+        moov_atom = moov_navigator.find('moov')
         if moov_atom:
-            mvhd_atom = MediaBoxExtractor.get_mp4_sub_box(moov_atom, 'mvhd')
+            mvhd_atom = moov_navigator.find('mvhd', moov_atom)
             media_duration = mvhd_atom['duration'] / mvhd_atom['timescale']
-            trak_atoms = MediaBoxExtractor.get_all_mp4_sub_boxes(moov_atom, 'trak')
-            mvex_atom = MediaBoxExtractor.get_mp4_sub_box(moov_atom, 'mvex')
-            mehd_atom = MediaBoxExtractor.get_mp4_sub_box(mvex_atom, 'mehd')
+            trak_atoms = moov_navigator.find_all('trak', moov_atom)
+            mvex_atom = moov_navigator.find('mvex', moov_atom)
+            mehd_atom = moov_navigator.find('mehd', mvex_atom) if mvex_atom else None
             if mehd_atom:
                 MediaDataParser.__logger.info(f'Moof boxes are detected in {blob_name}')
                 media_duration = mehd_atom["fragment_duration"] / mvhd_atom['timescale']
-            trex_atom = MediaBoxExtractor.get_mp4_sub_box(mvex_atom, 'trex')
+            trex_atoms = {trex_atom.track_ID: trex_atom for trex_atom in moov_navigator.find_all('trex', mvex_atom)} if mvex_atom else {}
 
-            for trak_atom in trak_atoms:
-                media_track_info_creator = MediaTrackInfoExtractor(trak_atom, mvhd_atom['duration'], mvhd_atom['timescale'], blob_name, mvex_atom)
-                timescale = media_track_info_creator.timescale
-                MediaDataParser.__fill_moof_fragments_from_boxes(media_data.get(MediaDataParser._MOOFS), moof_fragments, trex_atom, timescale)
+            media_track_info_creators = [MediaTrackInfoExtractor(trak_atom, mvhd_atom['duration'], mvhd_atom['timescale'], blob_name, mvex_atom, segmentation_policy)
+                                         for trak_atom in trak_atoms]
+            # All moofs are decoded once, the fragments of every track are converted with the timescale of its own track
+            timescales = {media_track_info_creator.track_id: media_track_info_creator.timescale for media_track_info_creator in media_track_info_creators}
+            moof_fragments = MediaDataParser.__get_moof_fragments_from_boxes(media_data.get(MediaDataParser._MOOFS), trex_atoms, timescales)
+            for media_track_info_creator in media_track_info_creators:
                 track_info = media_track_info_creator.get_track_info(moof_fragments)
                 media_track_info_list.append(track_info)
         else:
@@ -74,13 +90,36 @@ class MediaDataParser:
         return MediaData(media_duration, media_track_info_list)
 
     @staticmethod
-    def __process_media_tasks_and_update_media_data(media_datas: Dict[str, dict], executor: ProcessPoolExecutor, media_data: MediaData):
-        task_mapping = MediaDataParser.__map_media_tasks(media_datas, executor)
+    def fold_media_data(blob_name: str, media_data: Union[dict, MediaData], media_cache: Optional[ParsedMediaCache] = None,
+                        segmentation_policy: Optional[SegmentationPolicy] = None) -> MediaData:
+        """ Parses the atoms of a rendition as soon as they are downloaded and stores the result to the media_cache, the atoms can be dropped afterwards """
+        if isinstance(media_data, MediaData):
+            return media_data
+        parsed_media_data = MediaDataParser.parse_media_data(blob_name, media_data, segmentation_policy)
+        if media_cache:
+            media_cache.put(media_data.get(ParsedMediaCache.CACHE_KEY), parsed_media_data)
+        return parsed_media_data
+
+    @staticmethod
+    def parse_shared_media_data(blob_name: str, shared_memory_name: str, layout: MediaAtomLayout, segmentation_policy: Optional[SegmentationPolicy] = None) -> MediaDataRecord:
+        """ Parses the atoms of a rendition read from a SharedMediaBuffer and returns the compact record of the result, used by worker processes """
+        shared_memory, media_data = SharedMediaBuffer.attach(shared_memory_name, layout)
+        try:
+            return MediaDataRecord.from_media_data(MediaDataParser.parse_media_data(blob_name, media_data, segmentation_policy))
+        finally:
+            SharedMediaBuffer.detach(shared_memory, media_data)
+
+    @staticmethod
+    def __process_media_tasks_and_update_media_data(media_datas: Dict[str, Union[dict, MediaData]], executor: ProcessPoolExecutor, media_data: MediaData,
+                                                    media_cache: Optional[ParsedMediaCache] = None, segmentation_policy: Optional[SegmentationPolicy] = None):
+        task_mapping = MediaDataParser.__map_media_tasks(media_datas, executor, segmentation_policy)
 
         for task in Common.get_completed_tasks(task_mapping, executor):
             blob_name = task_mapping[task] if executor else task
             try:
-                task_media_data : MediaData = task.result() if executor else task_mapping[task]
+                task_media_data : MediaData = MediaDataParser.__get_task_media_data(task) if executor else task_mapping[task]
+                if media_cache and isinstance(media_datas[blob_name], dict):
+                    media_cache.put(media_datas[blob_name].get(ParsedMediaCache.CACHE_KEY), task_media_data)
                 if task_media_data.media_duration > media_data.media_duration:
                     media_data.media_duration = task_media_data.media_duration
                 if not MediaFormat.is_mpi_format(blob_name):
@@ -94,21 +133,60 @@ class MediaDataParser:
         media_data.media_track_info_list.sort(key=lambda track: (track.track_id, int(track.bit_rate)))
 
     @staticmethod
-    def __aggregate_media_data(media_datas: Dict[str, dict], media_index_datas: Dict[str, dict], executor: ProcessPoolExecutor) -> MediaData:
+    def __share_media_data(blob_name: str, media_data: dict) -> Optional[SharedMediaBuffer]:
+        """ Copies the atoms of the rendition into shared memory, the atoms are pickled to the worker when it is not available """
+        try:
+            return SharedMediaBuffer({blob_name: media_data})
+        except OSError as e:
+            MediaDataParser.__logger.warning(f"Shared memory is not available, the atoms of {blob_name} are sent to the worker process: {e}")
+            return None
+
+    @staticmethod
+    def __get_task_media_data(task: Future) -> MediaData:
+        task_result = task.result()
+        return task_result.to_media_data() if isinstance(task_result, MediaDataRecord) else task_result
+
+    @staticmethod
+    def __aggregate_media_data(media_datas: Dict[str, Union[dict, MediaData]], media_index_datas: Dict[str, Union[dict, MediaData]], executor: ProcessPoolExecutor,
+                               media_cache: Optional[ParsedMediaCache] = None, segmentation_policy: Optional[SegmentationPolicy] = None) -> MediaData:
         media_data = MediaData(0, [])
 
-        MediaDataParser.__process_media_tasks_and_update_media_data(media_datas, executor, media_data)
+        MediaDataParser.__process_media_tasks_and_update_media_data(media_datas, executor, media_data, media_cache, segmentation_policy)
         if media_index_datas:
-            MediaDataParser.__process_media_tasks_and_update_media_data(media_index_datas, executor, media_data)
+            MediaDataParser.__process_media_tasks_and_update_media_data(media_index_datas, executor, media_data, media_cache, segmentation_policy)
 
         return media_data
 
     @staticmethod
-    def __map_media_tasks(media_datas: Dict[str, dict], executor: ProcessPoolExecutor) -> any:
+    def __map_media_tasks(media_datas: Dict[str, Union[dict, MediaData]], executor: ProcessPoolExecutor, segmentation_policy: Optional[SegmentationPolicy] = None) -> any:
         if executor:
-            return {executor.submit(MediaDataParser.parse_media_data, blob_name, media_data): blob_name for blob_name, media_data in media_datas.items()}
+            return {MediaDataParser.__submit_media_task(executor, blob_name, media_data, segmentation_policy): blob_name
+                    for blob_name, media_data in media_datas.items()}
         else:
-            return {blob_name: MediaDataParser.parse_media_data(blob_name, media_data) for blob_name, media_data in media_datas.items()}
+            return {blob_name: media_data if isinstance(media_data, MediaData) else MediaDataParser.parse_media_data(blob_name, media_data, segmentation_policy)
+                    for blob_name, media_data in media_datas.items()}
+
+    @staticmethod
+    def __submit_media_task(executor: ProcessPoolExecutor, blob_name: str, media_data: Union[dict, MediaData], segmentation_policy: Optional[SegmentationPolicy] = None) -> Future:
+        if isinstance(media_data, MediaData):
+            # Cached renditions are not parsed again
+            future = Future()
+            future.set_result(media_data)
+            return future
+        shared_media_buffer = MediaDataParser.__share_media_data(blob_name, media_data)
+        if not shared_media_buffer:
+            return executor.submit(MediaDataParser.parse_media_data, blob_name, media_data, segmentation_policy)
+        try:
+            task = executor.submit(MediaDataParser.parse_shared_media_data, blob_name, shared_media_buffer.name, shared_media_buffer.layouts[blob_name], segmentation_policy)
+        except Exception:
+            shared_media_buffer.close()
+            raise
+        # The worker reads the copy, so that the atoms are not held twice while the renditions are parsed
+        media_data.pop('moov', None)
+        media_data.pop(MediaDataParser._MOOFS, None)
+        # The worker has detached from the shared memory once its parse is done
+        task.add_done_callback(lambda _: shared_media_buffer.close())
+        return task
 
     @staticmethod
     def __update_media_track_info(track_info_lists: List[List[MediaTrackInfo]]) -> List[MediaTrackInfo]:
@@ -121,32 +199,37 @@ class MediaDataParser:
         return media_track_info_list
 
     @staticmethod
-    def __get_moof_fragment_duration(trun_atom: Box) -> int:
-        return sum(sample.sample_duration for sample in trun_atom.sample_info)
+    def __get_moof_fragment_duration(track_fragment: TrackFragment) -> int:
+        if track_fragment.sample_duration_sum is None:
+            raise ValueError(f"No sample durations in the trun box of track {track_fragment.track_id}")
+        return track_fragment.sample_duration_sum
 
     @staticmethod
-    def __get_moof_fragment_size(trun_atom: Box) -> int:
-        return sum(sample.sample_size for sample in trun_atom.sample_info)
+    def __get_moof_fragment_size(track_fragment: TrackFragment) -> int:
+        if track_fragment.sample_size_sum is not None:
+            return track_fragment.sample_size_sum
+        if track_fragment.default_sample_size is not None:
+            return track_fragment.default_sample_size * track_fragment.sample_count
+        raise ValueError(f"No sample sizes in the trun box of track {track_fragment.track_id}")
 
     @staticmethod
-    def __is_default_sample_duration_set(track_id: int, atom: Box) -> bool:
-        return atom and atom.track_ID == track_id and atom.default_sample_duration
+    def __is_default_sample_duration_set(track_id: int, trex_atom: Box) -> bool:
+        return trex_atom and trex_atom.track_ID == track_id and trex_atom.default_sample_duration
 
     @staticmethod
     def __is_default_sample_size_set(track_id: int, trex_atom: Box) -> bool:
         return trex_atom and trex_atom.track_ID == track_id and trex_atom.default_sample_size
 
     @staticmethod
-    def __fill_moof_fragment(moof_fragments: Dict[int, List], tfhd_atom: Box, trun_atom: Box, trex_atom: Box, timescale: int) -> None:
-        track_id = tfhd_atom.track_ID
-        sample_count = trun_atom.sample_count
-        fragment = moof_fragments.setdefault(track_id, [[], []])
+    def __fill_moof_fragment(moof_fragments: Dict[int, List], track_fragment: TrackFragment, trex_atom: Box, timescale: int) -> None:
+        track_id = track_fragment.track_id
+        sample_count = track_fragment.sample_count
+        fragment = moof_fragments.setdefault(track_id, [ChunkTimeline(timescale), []])
         duration = (trex_atom.default_sample_duration * sample_count if MediaDataParser.__is_default_sample_duration_set(track_id, trex_atom)
-                    else tfhd_atom.default_sample_duration * sample_count if MediaDataParser.__is_default_sample_duration_set(track_id, tfhd_atom)
-                    else MediaDataParser.__get_moof_fragment_duration(trun_atom))
-        duration /= timescale
+                    else track_fragment.default_sample_duration * sample_count if track_fragment.default_sample_duration
+                    else MediaDataParser.__get_moof_fragment_duration(track_fragment))
         fragment[0].append(duration)
-        size = trex_atom.default_sample_size * sample_count if MediaDataParser.__is_default_sample_size_set(track_id, trex_atom) else MediaDataParser.__get_moof_fragment_size(trun_atom)
+        size = trex_atom.default_sample_size * sample_count if MediaDataParser.__is_default_sample_size_set(track_id, trex_atom) else MediaDataParser.__get_moof_fragment_size(track_fragment)
         fragment[1].append(size)
 
     @staticmethod
@@ -164,23 +247,18 @@ class MediaDataParser:
         MediaDataParser.__logger.info(f'Changed chunks, bitrate, added index_blob_name {track.index_blob_name} for {track.blob_name} with track_id {track.track_id}')
 
     @staticmethod
-    def __fill_moof_fragments_from_boxes(moof_boxes: List[bytes], moof_fragments: Dict[int, List], trex_atom: Box, timescale: int) -> None:
+    def __get_moof_fragments_from_boxes(moof_boxes: List[bytes], trex_atoms: Dict[int, Box], timescales: Dict[int, int]) -> Dict[int, List]:
+        moof_fragments = {}
         if not moof_boxes:
-            return
+            return moof_fragments
         for moof_box in moof_boxes:
-            parsed_moof_box = MediaBoxExtractor.extract_media_boxes(moof_box)
-            if not parsed_moof_box:
-                MediaDataParser.__logger.error(f'Cannot parse moof box: {moof_box}')
-                raise ValueError("Cannot parse moof box")
-            moof_atom = MediaBoxExtractor.get_mp4_box(parsed_moof_box, 'moof')
-            if not moof_atom:
-                MediaDataParser.__logger.error(f'Cannot get moof box from {parsed_moof_box}')
-                raise ValueError("There is no 'moof' atom in mp4 data")
-            traf_atoms = MediaBoxExtractor.get_all_mp4_sub_boxes(moof_atom, 'traf')
-            for traf_atom in traf_atoms:
-                tfhd_atom = MediaBoxExtractor.get_mp4_sub_box(traf_atom, 'tfhd')
-                trun_atom = MediaBoxExtractor.get_mp4_sub_box(traf_atom, 'trun')
-                MediaDataParser.__fill_moof_fragment(moof_fragments, tfhd_atom, trun_atom, trex_atom, timescale)
+            for track_fragment in MoofFragmentDecoder.decode(moof_box):
+                timescale = timescales.get(track_fragment.track_id)
+                if timescale is None:
+                    MediaDataParser.__logger.warning(f'Skip fragment of track {track_fragment.track_id} which has no trak atom')
+                    continue
+                MediaDataParser.__fill_moof_fragment(moof_fragments, track_fragment, trex_atoms.get(track_fragment.track_id), timescale)
+        return moof_fragments
 
     @staticmethod
     def __update_media_track_info_list(media_data: MediaData) -> None:
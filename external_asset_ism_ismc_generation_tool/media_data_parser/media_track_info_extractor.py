@@ -1,5 +1,5 @@
 from collections import namedtuple
-from typing import Tuple
+from typing import Tuple, Optional
 
 from tools.pymp4.src.pymp4.parser import Box
 
@@ -14,9 +14,11 @@ from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.stss_
 from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.stsz_parser import STSZParser
 from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.stts_parser import STTSParser
 from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.trak_parser import TRAKParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_track_info import MediaTrackInfo
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_format import TrackFormat
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
 from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.media_box_extractor import MediaBoxExtractor
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.audio_track_data import AudioTrackData
 from external_asset_ism_ismc_generation_tool.common.common import Common
@@ -32,12 +34,12 @@ class MediaTrackInfoExtractor:
     def redefine_logger(cls, logger: ILogger):
         cls.__logger = logger
 
-    def __init__(self, trak_atom: Box, mvhd_duration: int, mvhd_timescale: int, blob_name: str, mvex_atom: Box):
+    def __init__(self, trak_atom: Box, mvhd_duration: int, mvhd_timescale: int, blob_name: str, mvex_atom: Box, segmentation_policy: Optional[SegmentationPolicy] = None):
         self.trak_parser = TRAKParser(trak_atom)
         mdia_atom = MediaBoxExtractor.get_mp4_sub_box(trak_atom, 'mdia')
         minf_atom = MediaBoxExtractor.get_mp4_sub_box(mdia_atom, 'minf')
         stbl_atom = MediaBoxExtractor.get_mp4_sub_box(minf_atom, 'stbl')
-        trex_atom = MediaBoxExtractor.get_mp4_sub_box(mvex_atom, 'trex')
+        trex_atom = self.__get_trex_atom(mvex_atom)
         self.stss_parser = STSSParser(MediaBoxExtractor.get_mp4_sub_box(stbl_atom, 'stss'))
         self.stts_parser = STTSParser(MediaBoxExtractor.get_mp4_sub_box(stbl_atom, 'stts'))
         self.stsz_parser = STSZParser(MediaBoxExtractor.get_mp4_sub_box(stbl_atom, 'stsz'))
@@ -62,6 +64,15 @@ class MediaTrackInfoExtractor:
             self.duration = 0
         self.blob_name = blob_name
         self.mvex_atom = mvex_atom
+        self.segmentation_policy = segmentation_policy
+
+    def __get_trex_atom(self, mvex_atom: Box) -> Optional[Box]:
+        trex_atoms = MediaBoxExtractor.get_all_mp4_sub_boxes(mvex_atom, 'trex') if mvex_atom else []
+        if len(trex_atoms) == 1:
+            return trex_atoms[0]
+        # Several fragmented tracks: every track has its own trex atom
+        track_id = self.trak_parser.get_track_id()
+        return next((trex_atom for trex_atom in trex_atoms if trex_atom.track_ID == track_id), None)
 
     def get_track_info(self, moof_fragments: dict) -> MediaTrackInfo:
         MediaTrackInfoExtractor.__logger.info(f'Get {self.track_type.value} track info from {self.blob_name}')
@@ -103,8 +114,8 @@ class MediaTrackInfoExtractor:
     def __extract_video_track_info(self, moof_fragments: dict) -> MediaTrackInfo:
         key_frames_numbers = self.stss_parser.get_key_frames_numbers_from_stss()
 
-        if key_frames_numbers:
-            chunks = self.stts_parser.get_chunk_durations_from_stts(TrackType.VIDEO, self.timescale, key_frames_numbers)
+        if key_frames_numbers is not None and len(key_frames_numbers) > 0:
+            chunks = self.stts_parser.get_chunk_durations_from_stts(TrackType.VIDEO, self.timescale, key_frames_numbers, self.segmentation_policy)
             bitrate = self.__calculate_bit_rate(self.track_size)
         elif not self.mvex_atom:
             MediaTrackInfoExtractor.__logger.error('stss atom is not defined. Cannot get key frames numbers from stss atom')
@@ -129,7 +140,7 @@ class MediaTrackInfoExtractor:
         if moof_fragments:
             chunks, calculated_bit_rate = self.__extract_chunks_and_bitrate_from_moof(moof_fragments)
         else:
-            chunks = self.stts_parser.get_chunk_durations_from_stts(TrackType.AUDIO, self.timescale)
+            chunks = self.stts_parser.get_chunk_durations_from_stts(TrackType.AUDIO, self.timescale, segmentation_policy=self.segmentation_policy)
             calculated_bit_rate = self.__calculate_bit_rate(self.track_size)
 
         audio_track_data: AudioTrackData = self.audio_parser.get_audio_track_data(calculated_bit_rate)
@@ -187,7 +198,7 @@ class MediaTrackInfoExtractor:
         size_in_bits = size * 8
         return int(size_in_bits / duration)
 
-    def __extract_chunks_and_bitrate_from_moof(self, moof_fragments: dict) -> Tuple[list, int]:
+    def __extract_chunks_and_bitrate_from_moof(self, moof_fragments: dict) -> Tuple[ChunkTimeline, int]:
         track_id_info = moof_fragments.get(self.track_id)
         chunks, chunk_sizes = track_id_info
         
@@ -198,7 +209,7 @@ class MediaTrackInfoExtractor:
             bitrate = self.__calculate_bit_rate(sum(chunk_sizes))
         else:
             # For files with invalid mvhd duration (timescale=0), calculate from fragments
-            total_duration = sum(chunks)
+            total_duration = chunks.get_total_duration_in_seconds()
             bitrate = self.__calculate_bit_rate(sum(chunk_sizes), total_duration)
         return chunks, bitrate
 
@@ -0,0 +1,89 @@
+import struct
+from typing import Dict, Generator, List, Optional
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.atom.atom_type import AtomType
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.atom.fragment_random_access_index import FragmentRandomAccessIndex, FragmentRandomAccessEntry
+from external_asset_ism_ismc_generation_tool.media_data_parser.range_read_planner import RangeReadPlanner, RangeRequest, RangeResponse
+
+
+class MfraIndexReader:
+    """
+    Reads the movie fragment random access box (mfra) at the end of a fragmented file: the trailing 16-byte mfro
+    gives the mfra size, the mfra is read in one more request (both usually come from the planner's tail window),
+    and its tfra boxes give per-track fragment times and moof offsets.
+    """
+    _HEADER_LENGTH = 8  # 8 bytes
+    _MFRO_SIZE = 16  # 16 bytes: header, version/flags and the size of the enclosing mfra
+    _TFRA_FIXED_SIZE = 24  # 24 bytes: header, version/flags, track_ID, field lengths and number_of_entry
+    __logger: ILogger = Logger("MfraIndexReader")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def read_index(read_planner: RangeReadPlanner, media_name: str) -> Generator[RangeRequest, RangeResponse, Optional[FragmentRandomAccessIndex]]:
+        """ Return the parsed mfra of the file, or None if the file does not end with a valid mfra box. """
+        if read_planner.size is None:
+            # The size of the file is known after the first read
+            yield from read_planner.read(0, MfraIndexReader._HEADER_LENGTH)
+        if read_planner.size is None or read_planner.size < MfraIndexReader._MFRO_SIZE:
+            return None
+        mfro_data = yield from read_planner.read(read_planner.size - MfraIndexReader._MFRO_SIZE, MfraIndexReader._MFRO_SIZE)
+        if mfro_data[4:8] != AtomType.MFRO_ATOM_TYPE.value.encode() or int.from_bytes(mfro_data[:4], byteorder='big') != MfraIndexReader._MFRO_SIZE:
+            return None
+        mfra_size = int.from_bytes(mfro_data[12:16], byteorder='big')
+        mfra_offset = read_planner.size - mfra_size
+        if mfra_size < MfraIndexReader._HEADER_LENGTH + MfraIndexReader._MFRO_SIZE or mfra_offset < 0:
+            return None
+        mfra_data = yield from read_planner.read(mfra_offset, mfra_size)
+
+        try:
+            return FragmentRandomAccessIndex(mfra_offset, MfraIndexReader.parse_mfra(mfra_data))
+        except ValueError as e:
+            MfraIndexReader.__logger.warning(f"Cannot read mfra box of {media_name}: {e}")
+            return None
+
+    @staticmethod
+    def parse_mfra(mfra_data: bytes) -> Dict[int, List[FragmentRandomAccessEntry]]:
+        if mfra_data[4:8] != AtomType.MFRA_ATOM_TYPE.value.encode():
+            raise ValueError(f"Not an mfra box: {mfra_data[4:8]}")
+        track_entries: Dict[int, List[FragmentRandomAccessEntry]] = {}
+        start_byte = MfraIndexReader._HEADER_LENGTH
+        while start_byte + MfraIndexReader._HEADER_LENGTH <= len(mfra_data):
+            atom_size = int.from_bytes(mfra_data[start_byte:start_byte + 4], byteorder='big')
+            if atom_size < MfraIndexReader._HEADER_LENGTH or start_byte + atom_size > len(mfra_data):
+                raise ValueError(f"Invalid size {atom_size} of atom at offset {start_byte} of mfra")
+            if mfra_data[start_byte + 4:start_byte + 8] == AtomType.TFRA_ATOM_TYPE.value.encode():
+                track_id, entries = MfraIndexReader.__parse_tfra(mfra_data[start_byte:start_byte + atom_size])
+                track_entries.setdefault(track_id, []).extend(entries)
+            start_byte += atom_size
+        return track_entries
+
+    @staticmethod
+    def __parse_tfra(tfra_data: bytes):
+        if len(tfra_data) < MfraIndexReader._TFRA_FIXED_SIZE:
+            raise ValueError(f"Invalid tfra box size: {len(tfra_data)}")
+        version = tfra_data[8]
+        track_id, lengths, entry_count = struct.unpack_from('>III', tfra_data, 12)
+        # traf_number, trun_number and sample_number sizes are coded on 2 bits each as (length - 1)
+        number_sizes = (((lengths >> 4) & 0x3) + 1, ((lengths >> 2) & 0x3) + 1, (lengths & 0x3) + 1)
+        time_offset_format = '>QQ' if version == 1 else '>II'
+        time_offset_size = struct.calcsize(time_offset_format)
+        entry_size = time_offset_size + sum(number_sizes)
+        if MfraIndexReader._TFRA_FIXED_SIZE + entry_count * entry_size > len(tfra_data):
+            raise ValueError(f"Invalid tfra box: {entry_count} entries do not fit into {len(tfra_data)} bytes")
+
+        entries = []
+        position = MfraIndexReader._TFRA_FIXED_SIZE
+        for _ in range(entry_count):
+            time, moof_offset = struct.unpack_from(time_offset_format, tfra_data, position)
+            position += time_offset_size
+            numbers = []
+            for number_size in number_sizes:
+                numbers.append(int.from_bytes(tfra_data[position:position + number_size], byteorder='big'))
+                position += number_size
+            entries.append(FragmentRandomAccessEntry(time, moof_offset, *numbers))
+        return track_id, entries
@@ -5,6 +5,9 @@ class AtomType(Enum):
     MOOV_ATOM_TYPE = 'moov'
     MOOF_ATOM_TYPE = 'moof'
     MFRA_ATOM_TYPE = 'mfra'
+    MFRO_ATOM_TYPE = 'mfro'
+    TFRA_ATOM_TYPE = 'tfra'
+    MDAT_ATOM_TYPE = 'mdat'
     MVEX_ATOM_TYPE = 'mvex'
 
     UNKNOWN = None
@@ -0,0 +1,35 @@
+from typing import Dict, List
+
+from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+
+
+class FragmentRandomAccessEntry(BaseModel):
+    time: int
+    moof_offset: int
+    traf_number: int
+    trun_number: int
+    sample_number: int
+
+    def __init__(self, time: int, moof_offset: int, traf_number: int, trun_number: int, sample_number: int):
+        self.time = time
+        self.moof_offset = moof_offset
+        self.traf_number = traf_number
+        self.trun_number = trun_number
+        self.sample_number = sample_number
+
+
+class FragmentRandomAccessIndex(BaseModel):
+    """
+    Content of an mfra box: for every track ID the tfra entries (presentation time in track timescale and moof offset),
+    and the file offset of the mfra box itself, which is the end of the last fragment.
+    """
+    mfra_offset: int
+    track_entries: Dict[int, List[FragmentRandomAccessEntry]]
+
+    def __init__(self, mfra_offset: int, track_entries: Dict[int, List[FragmentRandomAccessEntry]]):
+        self.mfra_offset = mfra_offset
+        self.track_entries = track_entries
+
+    @property
+    def moof_offsets(self) -> List[int]:
+        return sorted({entry.moof_offset for entries in self.track_entries.values() for entry in entries})
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+
+
+class TrackFragment(BaseModel):
+    """
+    Summary of a traf box: tfhd defaults, tfdt decode time and the totals of the sample durations and sizes listed in its trun.
+    Totals are None when the trun does not list the field.
+    """
+    track_id: int
+    sample_count: int
+    base_media_decode_time: Optional[int]
+    default_sample_duration: Optional[int]
+    default_sample_size: Optional[int]
+    sample_duration_sum: Optional[int]
+    sample_size_sum: Optional[int]
+
+    def __init__(self, track_id: int, sample_count: int, base_media_decode_time: Optional[int] = None, default_sample_duration: Optional[int] = None,
+                 default_sample_size: Optional[int] = None, sample_duration_sum: Optional[int] = None, sample_size_sum: Optional[int] = None):
+        self.track_id = track_id
+        self.sample_count = sample_count
+        self.base_media_decode_time = base_media_decode_time
+        self.default_sample_duration = default_sample_duration
+        self.default_sample_size = default_sample_size
+        self.sample_duration_sum = sample_duration_sum
+        self.sample_size_sum = sample_size_sum
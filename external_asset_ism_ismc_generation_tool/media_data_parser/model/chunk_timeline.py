@@ -0,0 +1,90 @@
+from array import array
+from math import gcd
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+
+
+class ChunkTimeline(BaseModel):
+    """
+    Chunk durations of a track in integer ticks of its own timescale, run-length encoded as (duration, repeat) runs in two array('q').
+    Iterating yields the durations in seconds. Two timelines are equal when their chunks last the same time, whatever their timescales,
+    the hash of the reduced runs is cached so that unequal timelines are told apart without comparing the runs.
+    """
+    timescale: int
+    run_durations: array
+    run_repeats: array
+    chunk_count: int
+    total_duration: int
+
+    def __init__(self, timescale: int, durations: Iterable[int] = ()):
+        self.timescale = timescale
+        self.run_durations = array('q')
+        self.run_repeats = array('q')
+        self.chunk_count = 0
+        self.total_duration = 0
+        self._hash: Optional[int] = None
+        for duration in durations:
+            self.append(duration)
+
+    @classmethod
+    def from_runs(cls, timescale: int, run_durations: array, run_repeats: array) -> 'ChunkTimeline':
+        chunk_timeline = cls(timescale)
+        chunk_timeline.run_durations = run_durations
+        chunk_timeline.run_repeats = run_repeats
+        chunk_timeline.chunk_count = sum(run_repeats)
+        chunk_timeline.total_duration = sum(duration * repeat for duration, repeat in zip(run_durations, run_repeats))
+        return chunk_timeline
+
+    def append(self, duration: int) -> None:
+        duration = int(duration)
+        if self.run_durations and self.run_durations[-1] == duration:
+            self.run_repeats[-1] += 1
+        else:
+            self.run_durations.append(duration)
+            self.run_repeats.append(1)
+        self.chunk_count += 1
+        self.total_duration += duration
+        self._hash = None
+
+    def get_runs(self) -> List[Tuple[int, int]]:
+        return list(zip(self.run_durations, self.run_repeats))
+
+    def get_tick_durations(self) -> Iterator[int]:
+        for duration, repeat in zip(self.run_durations, self.run_repeats):
+            for _ in range(repeat):
+                yield duration
+
+    def get_total_duration_in_seconds(self) -> float:
+        return self.total_duration / self.timescale
+
+    def __reduced(self) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+        """ Timescale and run durations divided by their greatest common divisor, the same for timelines of equal chunk durations """
+        divisor = gcd(self.timescale, *self.run_durations) or 1
+        return self.timescale // divisor, tuple(duration // divisor for duration in self.run_durations), tuple(self.run_repeats)
+
+    def __len__(self) -> int:
+        return self.chunk_count
+
+    def __iter__(self) -> Iterator[float]:
+        for duration in self.get_tick_durations():
+            yield duration / self.timescale
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ChunkTimeline):
+            return NotImplemented
+        if self is other:
+            return True
+        if self.chunk_count != other.chunk_count or hash(self) != hash(other):
+            return False
+        if self.timescale == other.timescale:
+            return self.run_durations == other.run_durations and self.run_repeats == other.run_repeats
+        return self.__reduced() == other.__reduced()
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self.__reduced())
+        return self._hash
+
+    def __str__(self):
+        return f"ChunkTimeline(timescale={self.timescale}, chunks={self.chunk_count}, runs={self.get_runs()})"
@@ -0,0 +1,15 @@
+from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+
+
+class MediaCacheKey(BaseModel):
+    """ Identifies one version of a rendition: storage location and name plus the version and size listed by the storage """
+    location: str
+    name: str
+    version: str
+    size: int
+
+    def __init__(self, location: str, name: str, version: str, size: int):
+        self.location = location
+        self.name = name
+        self.version = version
+        self.size = size
@@ -0,0 +1,41 @@
+from array import array
+from typing import Tuple
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_track_info import MediaTrackInfo
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
+
+
+class MediaDataRecord:
+    """
+    Compact form of a MediaData returned by the parsing workers: every track is a tuple of its field values,
+    its track type as the enum value and its chunk timeline as the raw buffers of its runs.
+    """
+    __slots__ = ('media_duration', 'track_records')
+    # MediaTrackInfo fields stored as they are, after the track type and the chunk timeline
+    _TRACK_FIELDS = ('bit_rate', 'track_id', 'chunks', 'four_cc', 'blob_name', 'codec_private_data', 'index_blob_name', 'width', 'height',
+                     'bits_per_sample', 'audio_tag', 'channels', 'packet_size', 'sampling_rate', 'language', 'track_name')
+
+    def __init__(self, media_duration: float, track_records: Tuple[tuple, ...]):
+        self.media_duration = media_duration
+        self.track_records = track_records
+
+    @staticmethod
+    def from_media_data(media_data: MediaData) -> 'MediaDataRecord':
+        return MediaDataRecord(media_data.media_duration, tuple(MediaDataRecord.__get_track_record(track) for track in media_data.media_track_info_list))
+
+    def to_media_data(self) -> MediaData:
+        return MediaData(self.media_duration, [MediaDataRecord.__get_track(track_record) for track_record in self.track_records])
+
+    @staticmethod
+    def __get_track_record(track: MediaTrackInfo) -> tuple:
+        chunk_timeline = track.chunk_datas
+        return (track.track_type.value, chunk_timeline.timescale, chunk_timeline.run_durations.tobytes(), chunk_timeline.run_repeats.tobytes()) + \
+            tuple(getattr(track, field) for field in MediaDataRecord._TRACK_FIELDS)
+
+    @staticmethod
+    def __get_track(track_record: tuple) -> MediaTrackInfo:
+        track_type, timescale, run_durations, run_repeats = track_record[:4]
+        return MediaTrackInfo(track_type=TrackType(track_type), chunk_datas=ChunkTimeline.from_runs(timescale, array('q', run_durations), array('q', run_repeats)),
+                              **dict(zip(MediaDataRecord._TRACK_FIELDS, track_record[4:])))
@@ -1,6 +1,7 @@
 from typing import Optional
 
 from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
 
 
@@ -10,7 +11,7 @@ class MediaTrackInfo(BaseModel):
     track_id: int
     chunks: int
     four_cc: str
-    chunk_datas: list
+    chunk_datas: ChunkTimeline
     blob_name: str
     codec_private_data: str
     index_blob_name: Optional[str]
@@ -29,7 +30,7 @@ class MediaTrackInfo(BaseModel):
                  track_id: int,
                  chunks: int,
                  four_cc: str,
-                 chunk_datas: list,
+                 chunk_datas: ChunkTimeline,
                  blob_name: str,
                  codec_private_data: str = "0",
                  index_blob_name: Optional[str] = None,
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+
+
+class SegmentationPolicy(BaseModel):
+    """
+    How the samples of non-fragmented renditions are grouped into chunks, and how text tracks are segmented.
+    A chunk is closed at the first key frame once it lasts `target_duration` (when aligned to key frames), or once it lasts
+    longer than `max_chunk_duration` (`target_duration` when not set). A last chunk shorter than `min_chunk_duration` is merged into the previous one.
+    """
+    DEFAULT_TARGET_DURATION = 2.0
+    DEFAULT_TEXT_TARGET_DURATION = 4.0
+    target_duration: float
+    text_target_duration: float
+    align_to_key_frames: bool
+    min_chunk_duration: float
+    max_chunk_duration: Optional[float]
+    __logger: ILogger = Logger("SegmentationPolicy")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, target_duration: float = DEFAULT_TARGET_DURATION, text_target_duration: float = DEFAULT_TEXT_TARGET_DURATION, align_to_key_frames: bool = True,
+                 min_chunk_duration: float = 0.0, max_chunk_duration: Optional[float] = None):
+        if target_duration <= 0 or text_target_duration <= 0:
+            SegmentationPolicy.__logger.error(f"Target durations must be positive: {target_duration}, {text_target_duration}")
+            raise ValueError(f"Invalid segmentation policy: target durations {target_duration}, {text_target_duration} must be positive")
+        if min_chunk_duration < 0 or min_chunk_duration > target_duration:
+            SegmentationPolicy.__logger.error(f"Minimum chunk duration {min_chunk_duration} must be between 0 and the target duration {target_duration}")
+            raise ValueError(f"Invalid segmentation policy: minimum chunk duration {min_chunk_duration}")
+        if max_chunk_duration is not None and max_chunk_duration < target_duration:
+            SegmentationPolicy.__logger.error(f"Maximum chunk duration {max_chunk_duration} must not be less than the target duration {target_duration}")
+            raise ValueError(f"Invalid segmentation policy: maximum chunk duration {max_chunk_duration}")
+        self.target_duration = target_duration
+        self.text_target_duration = text_target_duration
+        self.align_to_key_frames = align_to_key_frames
+        self.min_chunk_duration = min_chunk_duration
+        self.max_chunk_duration = max_chunk_duration
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> 'SegmentationPolicy':
+        return cls(Common.get_number_setting(settings, 'segment_duration', cls.DEFAULT_TARGET_DURATION),
+                   Common.get_number_setting(settings, 'text_segment_duration', cls.DEFAULT_TEXT_TARGET_DURATION),
+                   not settings.get('no_key_frame_alignment', False),
+                   Common.get_number_setting(settings, 'min_chunk_duration', 0.0),
+                   Common.get_number_setting(settings, 'max_chunk_duration', None))
+
+    def get_max_chunk_duration(self, is_key_frame_aligned: bool) -> float:
+        """ Duration above which a chunk is closed whatever the next sample is """
+        if is_key_frame_aligned and self.align_to_key_frames and self.max_chunk_duration is not None:
+            return self.max_chunk_duration
+        return self.target_duration
+
+    def get_key(self) -> str:
+        """ Identifies the chunks produced by the policy, parsed renditions are cached per policy """
+        return f"{self.target_duration}/{self.align_to_key_frames}/{self.min_chunk_duration}/{self.max_chunk_duration}"
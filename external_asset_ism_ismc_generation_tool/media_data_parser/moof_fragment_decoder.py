@@ -0,0 +1,103 @@
+import struct
+from typing import List, Optional, Union
+
+import numpy as np
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box import LazyBox
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box_navigator import LazyBoxNavigator
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.atom.track_fragment import TrackFragment
+
+
+class MoofFragmentDecoder:
+    """
+    Decodes the tfhd, tfdt and trun boxes of a moof straight from their bytes: fixed fields are unpacked with struct
+    and the per-sample trun fields are summed over a strided numpy view, no per-sample objects are built.
+    """
+    _UINT32 = np.dtype('>u4')
+    # tfhd flags and the size of the optional field each one adds
+    _TFHD_OPTIONAL_FIELDS = ((0x01, 8), (0x02, 4), (0x08, 4), (0x10, 4), (0x20, 4))
+    _TFHD_DEFAULT_SAMPLE_DURATION_PRESENT = 0x08
+    _TFHD_DEFAULT_SAMPLE_SIZE_PRESENT = 0x10
+    _TRUN_DATA_OFFSET_PRESENT = 0x01
+    _TRUN_FIRST_SAMPLE_FLAGS_PRESENT = 0x04
+    _TRUN_SAMPLE_DURATION_PRESENT = 0x100
+    _TRUN_SAMPLE_SIZE_PRESENT = 0x200
+    # Per-sample trun fields in the order they are stored, 4 bytes each
+    _TRUN_SAMPLE_FIELDS = (0x100, 0x200, 0x400, 0x800)
+    __logger: ILogger = Logger("MoofFragmentDecoder")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def decode(moof_data: Union[bytes, memoryview]) -> List[TrackFragment]:
+        """ Returns a TrackFragment for every traf of the moof, the first trun of a traf is used """
+        navigator = LazyBoxNavigator(moof_data)
+        if not navigator.boxes:
+            MoofFragmentDecoder.__logger.error(f'Cannot parse moof box: {moof_data}')
+            raise ValueError("Cannot parse moof box")
+        moof_atom = navigator.find('moof')
+        if not moof_atom:
+            MoofFragmentDecoder.__logger.error(f'Cannot get moof box from {navigator.boxes}')
+            raise ValueError("There is no 'moof' atom in mp4 data")
+
+        track_fragments = []
+        for traf_atom in navigator.find_all('traf', moof_atom):
+            tfhd_atom = navigator.find('tfhd', traf_atom)
+            trun_atom = navigator.find('trun', traf_atom)
+            if tfhd_atom is None or trun_atom is None:
+                MoofFragmentDecoder.__logger.error(f'No tfhd or trun box in the traf box of {moof_atom}')
+                raise ValueError("There is no 'tfhd' or 'trun' atom in the 'traf' atom")
+            try:
+                track_fragments.append(MoofFragmentDecoder.__decode_traf(tfhd_atom, navigator.find('tfdt', traf_atom), trun_atom))
+            except (struct.error, ValueError) as e:
+                MoofFragmentDecoder.__logger.error(f'Cannot decode the traf box of {moof_atom}: {e}')
+                raise ValueError(f"Cannot parse moof box: {e}")
+        return track_fragments
+
+    @staticmethod
+    def __decode_traf(tfhd_atom: LazyBox, tfdt_atom: Optional[LazyBox], trun_atom: LazyBox) -> TrackFragment:
+        tfhd_payload = tfhd_atom.get_payload()
+        tfhd_flags, track_id = struct.unpack_from('>II', tfhd_payload)
+        tfhd_flags &= 0xFFFFFF
+        offset = 8
+        default_sample_duration = None
+        default_sample_size = None
+        for flag, field_size in MoofFragmentDecoder._TFHD_OPTIONAL_FIELDS:
+            if tfhd_flags & flag:
+                if flag == MoofFragmentDecoder._TFHD_DEFAULT_SAMPLE_DURATION_PRESENT:
+                    default_sample_duration = struct.unpack_from('>I', tfhd_payload, offset)[0]
+                elif flag == MoofFragmentDecoder._TFHD_DEFAULT_SAMPLE_SIZE_PRESENT:
+                    default_sample_size = struct.unpack_from('>I', tfhd_payload, offset)[0]
+                offset += field_size
+
+        base_media_decode_time = None
+        if tfdt_atom is not None:
+            tfdt_payload = tfdt_atom.get_payload()
+            base_media_decode_time = struct.unpack_from('>Q' if tfdt_payload[0] == 1 else '>I', tfdt_payload, 4)[0]
+
+        trun_payload = trun_atom.get_payload()
+        trun_flags, sample_count = struct.unpack_from('>II', trun_payload)
+        trun_flags &= 0xFFFFFF
+        offset = 8
+        if trun_flags & MoofFragmentDecoder._TRUN_DATA_OFFSET_PRESENT:
+            offset += 4
+        if trun_flags & MoofFragmentDecoder._TRUN_FIRST_SAMPLE_FLAGS_PRESENT:
+            offset += 4
+        sample_fields = [flag for flag in MoofFragmentDecoder._TRUN_SAMPLE_FIELDS if trun_flags & flag]
+        sample_duration_sum = None
+        sample_size_sum = None
+        if sample_fields:
+            if len(trun_payload) < offset + sample_count * len(sample_fields) * 4:
+                raise ValueError(f"trun box of track {track_id} is shorter than its {sample_count} samples")
+            samples = np.frombuffer(trun_payload, dtype=MoofFragmentDecoder._UINT32, count=sample_count * len(sample_fields), offset=offset)
+            samples = samples.reshape(sample_count, len(sample_fields))
+            if trun_flags & MoofFragmentDecoder._TRUN_SAMPLE_DURATION_PRESENT:
+                sample_duration_sum = int(samples[:, sample_fields.index(MoofFragmentDecoder._TRUN_SAMPLE_DURATION_PRESENT)].sum(dtype=np.int64))
+            if trun_flags & MoofFragmentDecoder._TRUN_SAMPLE_SIZE_PRESENT:
+                sample_size_sum = int(samples[:, sample_fields.index(MoofFragmentDecoder._TRUN_SAMPLE_SIZE_PRESENT)].sum(dtype=np.int64))
+
+        return TrackFragment(track_id, sample_count, base_media_decode_time, default_sample_duration, default_sample_size, sample_duration_sum, sample_size_sum)
@@ -0,0 +1,163 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_cache_key import MediaCacheKey
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+
+
+class ParsedMediaCache:
+    """
+    On-disk SQLite cache of the MediaData parsed from each rendition. A record is only used when the version (ETag,
+    modification time) and the size listed by the storage still match, so unchanged renditions skip both the download
+    of their atoms and the parsing. Records are kept per segmentation policy, as it changes the chunks of the parsed MediaData.
+    The database is opened on first use; any cache error disables the cache for the run.
+    """
+    # Bump whenever the parsed MediaData of a rendition changes, so records written by older versions are ignored
+    _CACHE_VERSION = 3
+    # Bump whenever the table layout changes, the table of an older layout is dropped
+    _SCHEMA_VERSION = 2
+    _DEFAULT_MAX_AGE_DAYS = 30
+    _DEFAULT_MAX_SIZE_MB = 256
+    _SECONDS_IN_DAY = 24 * 60 * 60
+    _BYTES_IN_MB = 1024 * 1024
+    # Key of the MediaCacheKey stored next to 'moov' and 'moofs' in the media datas of a rendition which missed the cache
+    CACHE_KEY = 'cache_key'
+    __logger: ILogger = Logger("ParsedMediaCache")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, cache_path: str, max_age_days: int = _DEFAULT_MAX_AGE_DAYS, max_size_mb: int = _DEFAULT_MAX_SIZE_MB,
+                 segmentation_policy: Optional[SegmentationPolicy] = None):
+        self.cache_path = cache_path
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+        self.segmentation_key = (segmentation_policy or SegmentationPolicy()).get_key()
+        self.hit_count = 0
+        self.miss_count = 0
+        self.__connection: Optional[sqlite3.Connection] = None
+        self.__is_disabled = False
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> Optional['ParsedMediaCache']:
+        if settings.get('no_cache', False):
+            cls.__logger.info("Parsed media cache is disabled")
+            return None
+        return cls(settings.get('cache_path') or cls.get_default_cache_path(),
+                   Common.get_positive_int_setting(settings, 'cache_max_age_days', cls._DEFAULT_MAX_AGE_DAYS),
+                   Common.get_positive_int_setting(settings, 'cache_max_size_mb', cls._DEFAULT_MAX_SIZE_MB),
+                   SegmentationPolicy.from_settings(settings))
+
+    @staticmethod
+    def get_default_cache_path() -> str:
+        return os.path.join(os.path.expanduser('~'), '.cache', 'external_asset_ism_ismc_generation_tool', 'parsed_media_cache.sqlite')
+
+    @staticmethod
+    def get_cache_key(location: str, name: str, version: Optional[str], size: Optional[int]) -> Optional[MediaCacheKey]:
+        if not version or size is None:
+            return None
+        return MediaCacheKey(location, name, version, size)
+
+    def get(self, cache_key: Optional[MediaCacheKey]) -> Optional[MediaData]:
+        if cache_key is None:
+            return None
+        with self.__lock:
+            connection = self.__get_connection()
+            if connection is None:
+                return None
+            try:
+                row = connection.execute("SELECT value FROM parsed_media WHERE location = ? AND name = ? AND segmentation = ? AND version = ? AND size = ? AND cache_version = ?",
+                                         (cache_key.location, cache_key.name, self.segmentation_key, cache_key.version, cache_key.size, self._CACHE_VERSION)).fetchone()
+                if row is None:
+                    self.miss_count += 1
+                    return None
+                media_data = pickle.loads(row[0])
+                connection.execute("UPDATE parsed_media SET last_access = ? WHERE location = ? AND name = ? AND segmentation = ?",
+                                   (time.time(), cache_key.location, cache_key.name, self.segmentation_key))
+                connection.commit()
+            except (sqlite3.Error, pickle.UnpicklingError, AttributeError, EOFError, ImportError) as e:
+                self.__logger.warning(f"Cannot read the cached media data of {cache_key.name}: {e}")
+                self.miss_count += 1
+                return None
+        self.hit_count += 1
+        self.__logger.info(f"Use cached media data of {cache_key.name}")
+        return media_data
+
+    def put(self, cache_key: Optional[MediaCacheKey], media_data: MediaData):
+        if cache_key is None:
+            return
+        value = pickle.dumps(media_data, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.__lock:
+            connection = self.__get_connection()
+            if connection is None:
+                return
+            try:
+                connection.execute("INSERT OR REPLACE INTO parsed_media (location, name, segmentation, version, size, cache_version, value, last_access) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                   (cache_key.location, cache_key.name, self.segmentation_key, cache_key.version, cache_key.size, self._CACHE_VERSION, value, time.time()))
+                connection.commit()
+            except sqlite3.Error as e:
+                self.__logger.warning(f"Cannot cache the media data of {cache_key.name}: {e}")
+
+    def evict(self):
+        """ Drop the records not used for 'max_age_days', then the least recently used ones above 'max_size_mb' """
+        with self.__lock:
+            connection = self.__get_connection()
+            if connection is not None:
+                self.__evict(connection)
+
+    def close(self):
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+        if self.hit_count or self.miss_count:
+            self.__logger.info(f"Parsed media cache: {self.hit_count} hit(s), {self.miss_count} miss(es)")
+
+    def __get_connection(self) -> Optional[sqlite3.Connection]:
+        if self.__connection is None and not self.__is_disabled:
+            try:
+                cache_directory = os.path.dirname(self.cache_path)
+                if cache_directory:
+                    os.makedirs(cache_directory, exist_ok=True)
+                connection = sqlite3.connect(self.cache_path, timeout=30, check_same_thread=False)
+                if connection.execute("PRAGMA user_version").fetchone()[0] != self._SCHEMA_VERSION:
+                    connection.execute("DROP TABLE IF EXISTS parsed_media")
+                    connection.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+                connection.execute("CREATE TABLE IF NOT EXISTS parsed_media ("
+                                   "location TEXT NOT NULL, name TEXT NOT NULL, segmentation TEXT NOT NULL, version TEXT NOT NULL, size INTEGER NOT NULL, "
+                                   "cache_version INTEGER NOT NULL, value BLOB NOT NULL, last_access REAL NOT NULL, "
+                                   "PRIMARY KEY (location, name, segmentation))")
+                self.__evict(connection)
+                self.__connection = connection
+            except (sqlite3.Error, OSError) as e:
+                self.__logger.warning(f"Parsed media cache {self.cache_path} is not available, continue without cache: {e}")
+                self.__is_disabled = True
+        return self.__connection
+
+    def __evict(self, connection: sqlite3.Connection):
+        try:
+            connection.execute("DELETE FROM parsed_media WHERE last_access < ? OR cache_version != ?",
+                               (time.time() - self.max_age_days * self._SECONDS_IN_DAY, self._CACHE_VERSION))
+            max_size = self.max_size_mb * self._BYTES_IN_MB
+            total_size = connection.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM parsed_media").fetchone()[0]
+            if total_size > max_size:
+                rows = connection.execute("SELECT location, name, segmentation, LENGTH(value) FROM parsed_media ORDER BY last_access").fetchall()
+                for location, name, segmentation, value_size in rows:
+                    if total_size <= max_size:
+                        break
+                    connection.execute("DELETE FROM parsed_media WHERE location = ? AND name = ? AND segmentation = ?", (location, name, segmentation))
+                    total_size -= value_size
+            connection.commit()
+        except sqlite3.Error as e:
+            self.__logger.warning(f"Cannot evict the parsed media cache {self.cache_path}: {e}")
@@ -0,0 +1,205 @@
+import asyncio
+from bisect import bisect_right
+from typing import Any, Awaitable, Callable, Generator, List, Optional, Tuple, Union
+
+RangeRequest = Tuple[int, Optional[int]]  # (offset, length), length None reads to the end of the object
+RangeResponse = Tuple[bytes, Optional[int]]  # (data, total size of the object if known)
+RangeReader = Generator[Union[RangeRequest, List[RangeRequest]], Union[RangeResponse, List[RangeResponse]], Any]
+
+
+class RangeReadPlanner:
+    """
+    Serves byte range reads of a single remote object from a small set of coalesced windows.
+
+    The first read fetches a large speculative head window, which usually covers 'ftyp', 'moov'
+    and the first 'moof' of a rendition. Reads that fall near the end of the object fetch one tail
+    window (files with 'moov' after 'mdat'), and any other miss fetches a read-ahead window, so
+    walking top-level atom headers costs one or two requests instead of one per atom.
+
+    The planner does no I/O itself: read() is a generator yielding the range requests it needs and
+    receiving their responses, so the same parsing code is driven by run() with a blocking client
+    and by run_async() with an asyncio client. prefetch() yields a list of requests at once, which
+    run_async() issues concurrently.
+    """
+    HEAD_WINDOW_SIZE = 1024 * 1024  # 1 MiB
+    TAIL_WINDOW_SIZE = 1024 * 1024  # 1 MiB
+    READ_AHEAD_SIZE = 64 * 1024  # 64 KiB
+
+    def __init__(self,
+                 head_window_size: int = HEAD_WINDOW_SIZE,
+                 tail_window_size: int = TAIL_WINDOW_SIZE,
+                 read_ahead_size: int = READ_AHEAD_SIZE):
+        self.head_window_size = head_window_size
+        self.tail_window_size = tail_window_size
+        self.read_ahead_size = read_ahead_size
+        self.size: Optional[int] = None
+        self.request_count = 0
+        self.__is_head_fetched = False
+        # Disjoint windows sorted by start offset
+        self.__window_starts: List[int] = []
+        self.__windows: List[Tuple[int, bytes]] = []
+
+    @classmethod
+    def from_buffer(cls, buffer) -> 'RangeReadPlanner':
+        """
+        Planner over an object which is already entirely addressable in memory, e.g. a memory-mapped file:
+        every read is served by slicing 'buffer' and no range request is ever yielded.
+        """
+        read_planner = cls()
+        read_planner.size = len(buffer)
+        read_planner.__is_head_fetched = True
+        if len(buffer):
+            read_planner.__window_starts.append(0)
+            read_planner.__windows.append((0, buffer))
+        return read_planner
+
+    def release(self):
+        """ Drop all windows, e.g. to release the slices of a memory mapping before it is closed. """
+        self.__window_starts.clear()
+        self.__windows.clear()
+
+    @staticmethod
+    def run(range_reader: RangeReader, read_range: Callable[[int, Optional[int]], RangeResponse]):
+        """ Drive a range reading generator with a blocking read_range(offset, length) and return its result. """
+        try:
+            request = next(range_reader)
+            while True:
+                try:
+                    if isinstance(request, list):
+                        response = [read_range(*range_request) for range_request in request]
+                    else:
+                        response = read_range(*request)
+                except Exception as e:
+                    request = range_reader.throw(e)
+                else:
+                    request = range_reader.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    @staticmethod
+    async def run_async(range_reader: RangeReader, read_range: Callable[[int, Optional[int]], Awaitable[RangeResponse]]):
+        """ Drive a range reading generator with a coroutine read_range(offset, length) and return its result. """
+        try:
+            request = next(range_reader)
+            while True:
+                try:
+                    if isinstance(request, list):
+                        response = list(await asyncio.gather(*[read_range(*range_request) for range_request in request]))
+                    else:
+                        response = await read_range(*request)
+                except Exception as e:
+                    request = range_reader.throw(e)
+                else:
+                    request = range_reader.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    def read(self, offset: int, length: Optional[int] = None) -> Generator[RangeRequest, RangeResponse, bytes]:
+        """
+        Read 'length' bytes at 'offset', or everything up to the end of the object when length is None.
+        Covered bytes are served from memory, only the missing parts are requested.
+        """
+        if not self.__is_head_fetched:
+            yield from self.__fetch(0, max(self.head_window_size, offset + (length or 0)))
+            self.__is_head_fetched = True
+
+        result = b''
+        position = offset
+        while True:
+            end = self.__get_end(offset, length)
+            if end is not None and position >= end:
+                break
+            window = self.__find_window(position)
+            if window:
+                start, data = window
+                chunk = data[position - start:None if end is None else end - start]
+                result += chunk
+                position += len(chunk)
+                continue
+            if self.size is not None and position >= self.size:
+                break
+            if end is None:
+                next_window_start = self.__next_window_start(position)
+                data = yield from self.__fetch(position, None if next_window_start is None else next_window_start - position)
+            else:
+                data = yield from self.__fetch_window_for(position, end)
+            if not data:
+                break
+        return result
+
+    def prefetch(self, ranges: List[Tuple[int, int]]) -> Generator[List[RangeRequest], List[RangeResponse], None]:
+        """ Fetch windows for all given (offset, length) ranges that are not covered yet in one batch of requests. """
+        requests: List[RangeRequest] = []
+        for offset, length in sorted(ranges):
+            if self.__find_window(offset) or any(request_offset <= offset < request_offset + request_length for request_offset, request_length in requests[-1:]):
+                continue
+            window_end = offset + max(length, self.read_ahead_size)
+            next_window_start = self.__next_window_start(offset)
+            if next_window_start is not None:
+                window_end = min(window_end, next_window_start)
+            if self.size is not None:
+                window_end = min(window_end, self.size)
+            if window_end > offset:
+                requests.append((offset, window_end - offset))
+        if not requests:
+            return
+        responses = yield requests
+        for (offset, length), (data, size) in zip(requests, responses):
+            self.__store(offset, length, data, size)
+
+    def discard_before(self, offset: int):
+        """ Drop the windows which end before 'offset' to bound memory while scanning forward. """
+        index = 0
+        while index < len(self.__windows) and self.__windows[index][0] + len(self.__windows[index][1]) <= offset:
+            index += 1
+        del self.__windows[:index]
+        del self.__window_starts[:index]
+
+    def __get_end(self, offset: int, length: Optional[int]) -> Optional[int]:
+        if self.size is not None:
+            return self.size if length is None else min(offset + length, self.size)
+        return None if length is None else offset + length
+
+    def __fetch_window_for(self, offset: int, end: int) -> Generator[RangeRequest, RangeResponse, bytes]:
+        window_offset, window_end = offset, offset + max(end - offset, self.read_ahead_size)
+        if self.size is not None:
+            tail_offset = max(self.size - self.tail_window_size, 0)
+            next_window_start = self.__next_window_start(tail_offset)
+            if offset >= tail_offset and not self.__find_window(tail_offset) and (next_window_start is None or next_window_start > offset):
+                window_offset, window_end = tail_offset, self.size
+            window_end = min(window_end, self.size)
+        next_window_start = self.__next_window_start(window_offset)
+        if next_window_start is not None:
+            window_end = min(window_end, next_window_start)
+        data = yield from self.__fetch(window_offset, window_end - window_offset)
+        return data[offset - window_offset:]
+
+    def __fetch(self, offset: int, length: Optional[int]) -> Generator[RangeRequest, RangeResponse, bytes]:
+        if self.size is not None and offset >= self.size:
+            return b''
+        data, size = yield offset, length
+        self.__store(offset, length, data, size)
+        return data
+
+    def __store(self, offset: int, length: Optional[int], data: bytes, size: Optional[int]):
+        self.request_count += 1
+        if size is not None:
+            self.size = size
+        elif length is None or len(data) < length:
+            self.size = offset + len(data)
+        if data:
+            index = bisect_right(self.__window_starts, offset)
+            self.__window_starts.insert(index, offset)
+            self.__windows.insert(index, (offset, data))
+
+    def __find_window(self, position: int) -> Optional[Tuple[int, bytes]]:
+        index = bisect_right(self.__window_starts, position) - 1
+        if index >= 0:
+            start, data = self.__windows[index]
+            if position < start + len(data):
+                return start, data
+        return None
+
+    def __next_window_start(self, position: int) -> Optional[int]:
+        index = bisect_right(self.__window_starts, position)
+        return self.__window_starts[index] if index < len(self.__window_starts) else None
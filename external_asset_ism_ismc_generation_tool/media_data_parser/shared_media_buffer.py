@@ -0,0 +1,71 @@
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple, Union
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+
+# Offset of the atoms of a rendition in the block, length of its moov atom and lengths of its moof atoms
+MediaAtomLayout = Tuple[int, int, array]
+
+
+class SharedMediaBuffer:
+    """
+    Atoms of several renditions copied into one shared memory block. Parsing workers attach to the block by its name and read
+    the atoms of a rendition through memoryviews given its layout, so that the atoms are not pickled to the worker processes.
+    """
+    __logger: ILogger = Logger("SharedMediaBuffer")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, media_datas: Dict[str, Dict[str, Union[bytes, List[bytes]]]]):
+        """ :param media_datas: atoms of the renditions by blob name, `moov` and optional `moofs` """
+        self.layouts: Dict[str, MediaAtomLayout] = {}
+        offset = 0
+        for blob_name, media_data in media_datas.items():
+            moof_lengths = array('q', (len(moof) for moof in media_data.get('moofs') or []))
+            self.layouts[blob_name] = (offset, len(media_data['moov']), moof_lengths)
+            offset += len(media_data['moov']) + sum(moof_lengths)
+        self.shared_memory = SharedMemory(create=True, size=max(offset, 1))
+        buffer = self.shared_memory.buf
+        for blob_name, media_data in media_datas.items():
+            offset = self.layouts[blob_name][0]
+            for atom in [media_data['moov']] + list(media_data.get('moofs') or []):
+                buffer[offset:offset + len(atom)] = atom
+                offset += len(atom)
+        SharedMediaBuffer.__logger.info(f'{len(media_datas)} renditions are shared in {self.shared_memory.size} bytes of {self.shared_memory.name}')
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def close(self) -> None:
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def attach(name: str, layout: MediaAtomLayout) -> Tuple[SharedMemory, Dict[str, Union[memoryview, List[memoryview]]]]:
+        """ Returns the block and the atoms of a rendition as memoryviews of it, to be released by detach """
+        shared_memory = SharedMemory(name=name)
+        offset, moov_length, moof_lengths = layout
+        buffer = shared_memory.buf
+        media_data = {'moov': buffer[offset:offset + moov_length], 'moofs': []}
+        offset += moov_length
+        for moof_length in moof_lengths:
+            media_data['moofs'].append(buffer[offset:offset + moof_length])
+            offset += moof_length
+        return shared_memory, media_data
+
+    @staticmethod
+    def detach(shared_memory: SharedMemory, media_data: Dict[str, Union[memoryview, List[memoryview]]]) -> None:
+        for atom in [media_data['moov']] + media_data['moofs']:
+            atom.release()
+        shared_memory.close()
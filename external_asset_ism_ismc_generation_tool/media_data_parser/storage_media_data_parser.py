@@ -0,0 +1,44 @@
+from typing import Dict
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_atom_locator import MediaAtomLocator
+from external_asset_ism_ismc_generation_tool.media_data_parser.range_read_planner import RangeReadPlanner
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+
+
+class StorageMediaDataParser:
+    """ Reads the 'moov' and 'moof' atoms of a rendition from any storage backend with the shared MediaAtomLocator """
+    __logger: ILogger = Logger("StorageMediaDataParser")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    @staticmethod
+    def get_media_data(storage_backend: IStorageBackend, name: str) -> Dict[str, any]:
+        try:
+            file_reader = storage_backend.open_file_reader(name)
+            if file_reader is not None:
+                return StorageMediaDataParser.__get_media_data_from_file(file_reader, name)
+
+            read_planner = RangeReadPlanner()
+            media_data = RangeReadPlanner.run(MediaAtomLocator.locate_media_atoms(read_planner, name),
+                                              lambda offset, length: storage_backend.read_range(name, offset, length))
+        except Exception as e:
+            raise Exception(f"An unexpected error occurred: {str(e)}")
+
+        StorageMediaDataParser.__logger.info(f"Read atoms of {name} with {read_planner.request_count} range request(s)")
+        return media_data
+
+    @staticmethod
+    def __get_media_data_from_file(file_reader, name: str) -> Dict[str, any]:
+        with file_reader:
+            # The whole file is mapped, so atom headers and payloads are sliced from the mapping without reads
+            read_planner = RangeReadPlanner.from_buffer(file_reader.buffer)
+            try:
+                media_data = RangeReadPlanner.run(MediaAtomLocator.locate_media_atoms(read_planner, name), file_reader.read_with_size)
+            finally:
+                read_planner.release()
+
+        StorageMediaDataParser.__logger.info(f"Read atoms of {name} from a {file_reader.size} byte(s) memory mapping")
+        return media_data
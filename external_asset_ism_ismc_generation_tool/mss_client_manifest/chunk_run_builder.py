@@ -0,0 +1,76 @@
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
+
+
+class ChunkRunBuilder:
+    """
+    Converts a chunk timeline to the (t, d, r) runs of the ISMC timescale in integer arithmetic.
+    A chunk lasts the decimal value of its float duration in seconds times the timescale, as the manifests always converted it.
+    Every value is kept as a numerator over the common power of ten denominator of these decimals, so that the sums and half-even
+    roundings are exact and give the same runs as the Decimal arithmetic.
+    The duration of a chunk is corrected so that the start of the next chunk is the rounded sum of the durations before it,
+    a corrected chunk is split off the run of its equal predecessors.
+    """
+    # Numerators above this bound are summed as Python integers
+    _INT64_BOUND = 2 ** 62
+
+    @staticmethod
+    def build(chunk_timeline: ChunkTimeline, timescale: int) -> List[Tuple[Optional[int], int, int]]:
+        """ Returns (start time, duration, repeat) runs, the start time is set for the first run only """
+        chunk_count = len(chunk_timeline)
+        if not chunk_count:
+            return []
+        run_numerators, denominator = ChunkRunBuilder.__get_run_numerators(chunk_timeline, timescale)
+        total_numerator = sum(numerator * repeat for numerator, repeat in zip(run_numerators, chunk_timeline.run_repeats))
+        dtype = np.int64 if abs(total_numerator) < ChunkRunBuilder._INT64_BOUND else object
+
+        durations = np.repeat(np.array(run_numerators, dtype=dtype), np.array(chunk_timeline.run_repeats, dtype=np.int64))
+        start_times = np.zeros(chunk_count + 1, dtype=dtype)
+        np.cumsum(durations, out=start_times[1:])
+        rounded_start_times = ChunkRunBuilder.__round_half_even(start_times, denominator)
+        # Correction of every chunk but the last so that the next chunk starts at the rounded exact start time
+        corrections = np.zeros(chunk_count, dtype=dtype)
+        corrections[:-1] = np.diff(rounded_start_times)[:-1] - ChunkRunBuilder.__round_half_even(durations[:-1], denominator)
+        corrected_durations = durations + corrections * denominator
+
+        # A chunk joins the run of the previous chunk when its duration equals the corrected duration of the previous one
+        is_joined = np.zeros(chunk_count, dtype=bool)
+        is_joined[1:] = corrected_durations[:-1] == durations[1:]
+        # and leaves it again when it is corrected itself
+        is_run_start = ~is_joined | (corrections != 0)
+        is_run_start[0] = True
+        # Repeat counter of the runs, it restarts at chunks which do not join the previous run only
+        chunk_numbers = np.arange(chunk_count)
+        counter_starts = np.maximum.accumulate(np.where(is_joined, 0, chunk_numbers))
+        repeat_counters = chunk_numbers - counter_starts + 1
+
+        run_starts = np.flatnonzero(is_run_start)
+        run_ends = np.append(run_starts[1:], chunk_count) - 1
+        has_next_joined = np.append(is_joined[run_ends[:-1] + 1], False)
+        # A run repeats the counter of its last chunk once a chunk joined it, even if that chunk left it again
+        repeats = np.where((run_ends > run_starts) | has_next_joined, repeat_counters[run_ends], 1)
+        run_durations = ChunkRunBuilder.__round_half_even(corrected_durations[run_starts], denominator)
+
+        runs = [(None, int(duration), int(repeat)) for duration, repeat in zip(run_durations.tolist(), repeats.tolist())]
+        runs[0] = (0,) + runs[0][1:]
+        return runs
+
+    @staticmethod
+    def __get_run_numerators(chunk_timeline: ChunkTimeline, timescale: int) -> Tuple[List[int], int]:
+        """
+        Numerators of the run durations over their common power of ten denominator. A duration is the shortest decimal of the
+        float seconds times the timescale, e.g. 34 ticks at 12800 last 26562.500000000004 and not 26562.5 ticks.
+        """
+        run_decimals = [Decimal(repr(duration / chunk_timeline.timescale * timescale)) for duration in chunk_timeline.run_durations]
+        exponent = max([0] + [-run_decimal.as_tuple().exponent for run_decimal in run_decimals])
+        return [int(run_decimal.scaleb(exponent)) for run_decimal in run_decimals], 10 ** exponent
+
+    @staticmethod
+    def __round_half_even(numerators: np.ndarray, denominator: int) -> np.ndarray:
+        quotients = numerators // denominator
+        remainders = numerators - quotients * denominator
+        return quotients + ((2 * remainders > denominator) | ((2 * remainders == denominator) & (quotients % 2 == 1)))
@@ -1,14 +1,16 @@
 import decimal
-import xml.etree.ElementTree as ET
+import io
 from itertools import chain
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, List, Tuple, Dict, Union, TextIO
 
 from external_asset_ism_ismc_generation_tool.common.common import Common
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.four_cc import FourCC
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_track_info import MediaTrackInfo
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
+from external_asset_ism_ismc_generation_tool.mss_client_manifest.chunk_run_builder import ChunkRunBuilder
 from external_asset_ism_ismc_generation_tool.mss_client_manifest.models.chunk_data import ChunkData
 from external_asset_ism_ismc_generation_tool.mss_client_manifest.models.quality_level import QualityLevel
 from external_asset_ism_ismc_generation_tool.mss_client_manifest.models.smooth_streaming_media import SmoothStreamingMedia
@@ -31,6 +33,13 @@ class IsmcGenerator:
 
     @staticmethod
     def generate(duration: int, media_track_infos: List[MediaTrackInfo], text_data_info_list: Optional[List[TextDataInfo]] = None) -> str:
+        sink = io.StringIO()
+        IsmcGenerator.write(sink, duration, media_track_infos, text_data_info_list)
+        return sink.getvalue()
+
+    @staticmethod
+    def write(sink: TextIO, duration: int, media_track_infos: List[MediaTrackInfo], text_data_info_list: Optional[List[TextDataInfo]] = None) -> None:
+        """ Writes the client manifest to the text sink while the models are walked, no element tree of the chunks is built """
         IsmcGenerator.__logger.info('Create client (.ismc) manifest')
 
         audio_stream_indexes = IsmcGenerator.__get_stream_indexes(
@@ -51,9 +60,9 @@ class IsmcGenerator:
         for stream_index in stream_indexes:
             ismc_document.add_stream_index(stream_index)
 
-        xml_ismc = ismc_document.to_xml()
-        ET.indent(xml_ismc)
-        return ET.tostring(xml_ismc, encoding="utf-8", method="xml", xml_declaration=True).decode("utf-8")
+        writer = XmlStreamWriter(sink)
+        writer.write_declaration()
+        ismc_document.write_xml(writer)
 
     @staticmethod
     def __get_stream_indexes(
@@ -165,53 +174,17 @@ class IsmcGenerator:
     @staticmethod
     def __get_chunks(media_track_info: Optional[MediaTrackInfo] = None, text_stream_timings: Optional[Tuple] = None, timescale: int = 0) -> List[ChunkData]:
         c = []
-        current_r = 1  # Start with r = 1 for the first chunk
-        time_start = 0
-        time_start_round = 0
-
         if media_track_info:
-            for index, chunk in enumerate(media_track_info.chunk_datas):
-                duration = decimal.Decimal(str(chunk * timescale))
-
-                if index == 0:
-                    IsmcGenerator.__add_new_chunk(c, duration, time_start, str(current_r))
-                else:
-                    time_start += c[-1].duration
-                    time_start_round += round(c[-1].duration)
-
-                    diff = round(time_start) - time_start_round
-                    if diff != 0:
-                        new_chunk = IsmcGenerator.__adjust_previous_chunk_duration(c, diff)
-                        if new_chunk:
-                            c.append(new_chunk)
-                        time_start_round += diff
-
-                    if c[-1].duration == duration:
-                        current_r += 1
-                        c[-1].r = str(current_r)
-                    else:
-                        current_r = 1
-                        IsmcGenerator.__add_new_chunk(c, duration, None, str(current_r))
+            for time_start, duration, repeat in ChunkRunBuilder.build(media_track_info.chunk_datas, timescale):
+                IsmcGenerator.__add_new_chunk(c, duration, time_start, str(repeat))
         elif text_stream_timings:
             time_start = str(int(text_stream_timings[0] * timescale))
             duration = decimal.Decimal(str(text_stream_timings[1] * timescale))
-            IsmcGenerator.__add_new_chunk(c, duration, time_start, str(current_r))
+            IsmcGenerator.__add_new_chunk(c, duration, time_start, '1')
         return c
 
     @staticmethod
-    def __adjust_previous_chunk_duration(chunks: List[ChunkData], diff: int) -> Optional[ChunkData]:
-        last_chunk = chunks[-1]
-        last_repeat = int(last_chunk.r)
-        if last_repeat > 1:
-            last_chunk.r = str(last_repeat - 1)
-            new_chunk_duration = last_chunk.duration + diff
-            return ChunkData(duration=new_chunk_duration, r='1')
-        else:
-            last_chunk.duration += diff
-        return None
-
-    @staticmethod
-    def __add_new_chunk(chunks: List[ChunkData], duration: decimal.Decimal, time_start: Optional[str], repeat: str = '1') -> None:
+    def __add_new_chunk(chunks: List[ChunkData], duration: Union[int, decimal.Decimal], time_start: Optional[str], repeat: str = '1') -> None:
         time_start_str = str(time_start) if time_start is not None else None
         chunks.append(ChunkData(time_start=time_start_str, duration=duration, r=repeat))
 
@@ -1,8 +1,9 @@
 import decimal
 import xml.etree.ElementTree as ET
-from typing import Optional
+from typing import Optional, List, Tuple
 
 from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 
 
 class ChunkData(BaseModel):
@@ -19,12 +20,21 @@ class ChunkData(BaseModel):
 
     def to_xml(self) -> ET.Element:
         chunk = ET.Element("c")
+        for name, value in self.__get_attributes():
+            chunk.set(name, value)
+        return chunk
+
+    def write_xml(self, writer: XmlStreamWriter) -> None:
+        writer.write_empty_element("c", self.__get_attributes())
+
+    def __get_attributes(self) -> List[Tuple[str, str]]:
+        attributes = []
         if self.time_start:
-            chunk.set("t", self.time_start)
+            attributes.append(("t", self.time_start))
         if self.number:
-            chunk.set("n", self.number)
+            attributes.append(("n", self.number))
         if self.duration:
-            chunk.set("d", str(round(self.duration)))
+            attributes.append(("d", str(round(self.duration))))
         if self.r:
-            chunk.set("r", self.r)
-        return chunk
+            attributes.append(("r", self.r))
+        return attributes
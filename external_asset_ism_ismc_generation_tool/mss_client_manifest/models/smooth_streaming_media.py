@@ -2,6 +2,7 @@ import xml.etree.ElementTree as ET
 from typing import Optional
 
 from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 
 
 class SmoothStreamingMedia(BaseModel):
@@ -39,6 +40,29 @@ class SmoothStreamingMedia(BaseModel):
         self.protections.append(protection)
 
     def to_xml(self) -> ET.Element:
+        smooth_streaming_media = self.__get_element()
+        for protection in self.protections:
+            if protection:
+                smooth_streaming_media.append(protection.to_xml())
+
+        for stream_index in self.stream_indexes:
+            if stream_index:
+                smooth_streaming_media.append(stream_index.to_xml())
+
+        return smooth_streaming_media
+
+    def write_xml(self, writer: XmlStreamWriter) -> None:
+        writer.start_element(self.__get_element())
+        for protection in self.protections:
+            if protection:
+                writer.write_element(protection.to_xml())
+
+        for stream_index in self.stream_indexes:
+            if stream_index:
+                stream_index.write_xml(writer)
+        writer.end_element()
+
+    def __get_element(self) -> ET.Element:
         smooth_streaming_media = ET.Element("SmoothStreamingMedia")
         smooth_streaming_media.set("MajorVersion", str(self.major_version))
         smooth_streaming_media.set("MinorVersion", str(self.minor_version))
@@ -51,13 +75,4 @@ class SmoothStreamingMedia(BaseModel):
             smooth_streaming_media.set("LookaheadCount", str(self.lookahead_count))
         if self.dvr_window_length:
             smooth_streaming_media.set("DVRWindowLength", str(self.dvr_window_length))
-
-        for protection in self.protections:
-            if protection:
-                smooth_streaming_media.append(protection.to_xml())
-
-        for stream_index in self.stream_indexes:
-            if stream_index:
-                smooth_streaming_media.append(stream_index.to_xml())
-
         return smooth_streaming_media
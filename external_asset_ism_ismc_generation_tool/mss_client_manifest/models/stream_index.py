@@ -3,6 +3,7 @@ from typing import Optional
 
 from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
 from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 from external_asset_ism_ismc_generation_tool.mss_client_manifest.models.stream_type import StreamType
 
 
@@ -50,6 +51,30 @@ class StreamIndex(BaseModel):
         self.chunk_datas.append(chunk_data)
 
     def to_xml(self) -> ET.Element:
+        stream_index = self.__get_element()
+        for quality_level in self.quality_level_list:
+            if quality_level:
+                stream_index.append(quality_level.to_xml())
+
+        for chunk_data in self.chunk_datas:
+            if chunk_data:
+                stream_index.append(chunk_data.to_xml())
+
+        return stream_index
+
+    def write_xml(self, writer: XmlStreamWriter) -> None:
+        writer.start_element(self.__get_element())
+        for quality_level in self.quality_level_list:
+            if quality_level:
+                writer.write_element(quality_level.to_xml())
+
+        for chunk_data in self.chunk_datas:
+            if chunk_data:
+                chunk_data.write_xml(writer)
+        writer.end_element()
+
+    def __get_element(self) -> ET.Element:
+        """ StreamIndex element with its sorted attributes and without children """
         stream_index = ET.Element("StreamIndex")
         if self.stream_type.value:
             stream_index.set("Type", self.stream_type.value)
@@ -71,14 +96,5 @@ class StreamIndex(BaseModel):
             stream_index.set("Name", self.name)
         if self.language:
             stream_index.set("Language", self.language)
-        for quality_level in self.quality_level_list:
-            if quality_level:
-                stream_index.append(quality_level.to_xml())
-
         Common.sort_attributes_in_xml(stream_index)
-
-        for chunk_data in self.chunk_datas:
-            if chunk_data:
-                stream_index.append(chunk_data.to_xml())
-
         return stream_index
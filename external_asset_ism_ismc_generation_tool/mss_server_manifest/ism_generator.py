@@ -1,8 +1,9 @@
-import xml.etree.ElementTree as ET
-from typing import Optional, List
+import io
+from typing import Optional, List, TextIO
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
 from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.audio import Audio
 from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.body import Body
@@ -24,15 +25,21 @@ class IsmGenerator:
 
     @staticmethod
     def generate(manifest_name: str, audios: Optional[list] = None, videos: Optional[list] = None, text_streams: Optional[list] = None) -> str:
+        sink = io.StringIO()
+        IsmGenerator.write(sink, manifest_name, audios, videos, text_streams)
+        return sink.getvalue()
+
+    @staticmethod
+    def write(sink: TextIO, manifest_name: str, audios: Optional[list] = None, videos: Optional[list] = None, text_streams: Optional[list] = None) -> None:
+        """ Writes the server manifest to the text sink while the models are walked """
         IsmGenerator.__logger.info(f'Create server manifest {manifest_name}.ism')
         ism_document = Smil()
 
         ism_document.head = IsmGenerator.__fill_head(manifest_name)
         ism_document.body = IsmGenerator.__fill_body(audios, videos, text_streams)
-        xml_ism = ism_document.to_xml()
-        ET.indent(xml_ism)
-        ism_doc = ET.tostring(xml_ism, encoding="utf-8", method="xml", xml_declaration=True)
-        return ism_doc.decode("utf-8")
+        writer = XmlStreamWriter(sink)
+        writer.write_declaration()
+        ism_document.write_xml(writer)
 
     @staticmethod
     def __fill_head(manifest_name: str) -> Head:
@@ -1,6 +1,7 @@
 import xml.etree.ElementTree as ET
 
 from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 
 
 class Body(BaseModel):
@@ -26,3 +27,11 @@ class Body(BaseModel):
         body_element.append(switch_element)
 
         return body_element
+
+    def write_xml(self, writer: XmlStreamWriter) -> None:
+        writer.start_element(ET.Element("body"))
+        writer.start_element(ET.Element("switch"))
+        for item in self.switch:
+            writer.write_element(item.to_xml())
+        writer.end_element()
+        writer.end_element()
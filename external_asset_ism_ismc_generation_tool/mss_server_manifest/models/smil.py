@@ -2,6 +2,7 @@ import xml.etree.ElementTree as ET
 from typing import Optional
 
 from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
 from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.body import Body
 from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.head import Head
 
@@ -25,3 +26,13 @@ class Smil(BaseModel):
             smil_element.append(self.body.to_xml())
 
         return smil_element
+
+    def write_xml(self, writer: XmlStreamWriter) -> None:
+        smil_element = ET.Element("smil")
+        smil_element.set("xmlns", self.xmlns)
+        writer.start_element(smil_element)
+        if self.head:
+            writer.write_element(self.head.to_xml())
+        if self.body:
+            self.body.write_xml(writer)
+        writer.end_element()
@@ -17,8 +17,31 @@ class CliArgumentsParser:
         argument_parser.add_argument('-connection_string', metavar='connection_string', type=str, help="Connection string for the Azure Storage account.")
         argument_parser.add_argument('-container_name', metavar="container_name", type=str, help="Azure container name")
         argument_parser.add_argument("-is_multithreading", action="store_true", help="Enable multi-threaded mode. Default is single-threaded mode.")
+        argument_parser.add_argument("-is_pipelined", action="store_true", help="Parse every rendition in a worker process as soon as its atoms are downloaded, so that downloads and parsing overlap.")
+        argument_parser.add_argument('-max_pending_parses', metavar='max_pending_parses', type=int, help="Maximum number of downloaded renditions waiting for their parse in pipelined mode. Default is twice the number of CPUs.")
+        argument_parser.add_argument("-is_bounded_memory", action="store_true", help="Parse every rendition right after its download and keep only its tracks, memory is bounded by the renditions downloaded concurrently.")
+        argument_parser.add_argument("-is_async", action="store_true", help="Read blobs with the asyncio Azure client. Requires the aiohttp package.")
+        argument_parser.add_argument('-max_concurrent_requests', metavar='max_concurrent_requests', type=int, help="Maximum number of Azure requests in flight in async mode. Default is 64.")
         argument_parser.add_argument("-asset_zip_name", metavar="asset_zip_name", type=str, help="Name of the asset zip file.")
         argument_parser.add_argument("-local_copy", action="store_true", help="Create local copy of ISM/ISMC files.")
+        argument_parser.add_argument('-connection_pool_size', metavar='connection_pool_size', type=int, help="Number of per-host connection pools kept by the shared Azure HTTP transport. Default is 10.")
+        argument_parser.add_argument('-max_connections_per_host', metavar='max_connections_per_host', type=int, help="Maximum number of keep-alive connections per storage host. Default is 32.")
+        argument_parser.add_argument("-no_cache", action="store_true", help="Do not use the cache of parsed renditions, every rendition is downloaded and parsed again.")
+        argument_parser.add_argument('-cache_path', metavar='cache_path', type=str, help="Path of the SQLite cache of parsed renditions. Default is ~/.cache/external_asset_ism_ismc_generation_tool/parsed_media_cache.sqlite.")
+        argument_parser.add_argument('-cache_max_age_days', metavar='cache_max_age_days', type=int, help="Cached renditions unused for this number of days are evicted. Default is 30.")
+        argument_parser.add_argument('-cache_max_size_mb', metavar='cache_max_size_mb', type=int, help="Maximum size of the cache of parsed renditions in MB, least recently used renditions are evicted first. Default is 256.")
+        argument_parser.add_argument('-segment_duration', metavar='segment_duration', type=float, help="Target duration in seconds of the chunks of non-fragmented renditions. Default is 2.")
+        argument_parser.add_argument('-text_segment_duration', metavar='text_segment_duration', type=float, help="Duration in seconds of the segments of the CMFT files converted from WebVTT. Default is 4.")
+        argument_parser.add_argument('-max_conversion_workers', metavar='max_conversion_workers', type=int, help="Number of WebVTT files converted to CMFT at a time in multi-threaded mode. Default is the number of CPUs.")
+        argument_parser.add_argument('-conversion_timeout', metavar='conversion_timeout', type=float, help="A WebVTT file whose conversion to CMFT lasts longer than this number of seconds fails in multi-threaded mode. Default is 300.")
+        argument_parser.add_argument("-is_streaming_cmft", action="store_true", help="Write the CMFT files converted from WebVTT fragment by fragment, Azure blobs are uploaded as staged blocks.")
+        argument_parser.add_argument("-no_key_frame_alignment", action="store_true", help="Do not close video chunks on key frames, video is chunked like audio.")
+        argument_parser.add_argument('-min_chunk_duration', metavar='min_chunk_duration', type=float, help="A last chunk shorter than this number of seconds is merged into the previous one. Default is 0.")
+        argument_parser.add_argument('-max_chunk_duration', metavar='max_chunk_duration', type=float, help="Video chunks waiting for a key frame are closed once longer than this number of seconds. Default is the segment duration.")
+        argument_parser.add_argument('-s3_bucket', metavar='s3_bucket', type=str, help="S3 bucket name (alternative to Azure). Requires the boto3 package.")
+        argument_parser.add_argument('-s3_prefix', metavar='s3_prefix', type=str, help="Key prefix of the asset inside the S3 bucket.")
+        argument_parser.add_argument('-aws_endpoint_url', metavar='aws_endpoint_url', type=str, help="Endpoint URL of an S3-compatible storage, e.g. MinIO.")
+        argument_parser.add_argument('-aws_region', metavar='aws_region', type=str, help="Region of the S3 bucket.")
         argument_parser.add_argument('-local_directory', metavar='local_directory', type=str, help="Local directory containing MP4 files (alternative to Azure)")
         return argument_parser
 
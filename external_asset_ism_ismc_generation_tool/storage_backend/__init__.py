@@ -0,0 +1,8 @@
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+from external_asset_ism_ismc_generation_tool.storage_backend.azure_storage_backend import AzureStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.local_storage_backend import LocalStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.s3_storage_backend import S3StorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.in_memory_storage_backend import InMemoryStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.storage_writer_stream import StorageWriterStream
@@ -0,0 +1,60 @@
+from typing import List
+
+from azure.core import MatchConditions
+from azure.storage.blob import BlobClient
+
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+
+
+class AzureBlockStorageWriter(IStorageWriter):
+    """
+    Writer of a block blob: the data is staged as blocks of 'block_size' bytes while it is written, the header is staged
+    as its own block and the block list with the header first is committed by commit. Blocks which are not committed
+    are discarded by Azure.
+    """
+    DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, blob_client: BlobClient, header_size: int, overwrite: bool = True, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.blob_client = blob_client
+        self.header_size = header_size
+        self.overwrite = overwrite
+        self.block_size = block_size
+        self.__header_block_id = AzureBlockStorageWriter.__get_block_id(0)
+        self.__block_ids: List[str] = []
+        self.__buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.__buffer += data
+        if len(self.__buffer) >= self.block_size:
+            self.__stage_buffer()
+
+    def write_header(self, header: bytes) -> None:
+        if len(header) != self.header_size:
+            raise ValueError(f"Header of {self.blob_client.blob_name} is {len(header)} bytes instead of {self.header_size}")
+        self.blob_client.stage_block(self.__header_block_id, header)
+
+    def commit(self) -> None:
+        self.__stage_buffer()
+        # The header block is staged by write_header only when a header was reserved
+        block_ids = ([self.__header_block_id] if self.header_size else []) + self.__block_ids
+        if self.overwrite:
+            self.blob_client.commit_block_list(block_ids)
+        else:
+            self.blob_client.commit_block_list(block_ids, match_condition=MatchConditions.IfMissing)
+
+    def abort(self) -> None:
+        self.__buffer = bytearray()
+        self.__block_ids = []
+
+    def __stage_buffer(self) -> None:
+        if not self.__buffer:
+            return
+        block_id = AzureBlockStorageWriter.__get_block_id(len(self.__block_ids) + 1)
+        self.blob_client.stage_block(block_id, bytes(self.__buffer))
+        self.__block_ids.append(block_id)
+        self.__buffer = bytearray()
+
+    @staticmethod
+    def __get_block_id(index: int) -> str:
+        # Block ids of a blob must have the same length
+        return f"{index:012d}"
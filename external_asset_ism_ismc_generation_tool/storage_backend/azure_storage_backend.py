@@ -0,0 +1,32 @@
+from typing import List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.storage_backend.azure_block_storage_writer import AzureBlockStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+
+
+class AzureStorageBackend(IStorageBackend):
+    def __init__(self, az_blob_service_client: AzureBlobServiceClient):
+        self.az_blob_service_client = az_blob_service_client
+        self.location = f"container {az_blob_service_client.container_name}"
+        self.is_multithreading = az_blob_service_client.is_multithreading
+
+    def list(self) -> List[StorageItem]:
+        return [StorageItem(blob.name, blob.size, blob.etag) for blob in self.az_blob_service_client.get_list_of_blobs()]
+
+    def read_range(self, name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[bytes, Optional[int]]:
+        return self.az_blob_service_client.download_part_of_blob_with_size(blob_name=name, offset=offset, length=length)
+
+    def size(self, name: str) -> int:
+        return self.az_blob_service_client.get_blob_client(name).get_blob_properties().size
+
+    def write(self, name: str, data: bytes, overwrite: bool = True):
+        self.az_blob_service_client.get_blob_client(name).upload_blob(data, overwrite=overwrite)
+
+    def exists(self, name: str) -> bool:
+        return self.az_blob_service_client.blob_exists(name)
+
+    def open_writer(self, name: str, header_size: int = 0, overwrite: bool = True) -> IStorageWriter:
+        return AzureBlockStorageWriter(self.az_blob_service_client.get_blob_client(name), header_size, overwrite)
@@ -0,0 +1,27 @@
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+
+
+class BufferedStorageWriter(IStorageWriter):
+    """ Writer of the backends without chunked uploads: the object is buffered and written at once by commit """
+    def __init__(self, storage_backend, name: str, header_size: int, overwrite: bool = True):
+        """ :param storage_backend: IStorageBackend the object is written to """
+        self.storage_backend = storage_backend
+        self.name = name
+        self.header_size = header_size
+        self.overwrite = overwrite
+        self.__buffer = bytearray(header_size)
+
+    def write(self, data: bytes) -> None:
+        self.__buffer += data
+
+    def write_header(self, header: bytes) -> None:
+        if len(header) != self.header_size:
+            raise ValueError(f"Header of {self.name} is {len(header)} bytes instead of {self.header_size}")
+        self.__buffer[:self.header_size] = header
+
+    def commit(self) -> None:
+        self.storage_backend.write(self.name, bytes(self.__buffer), overwrite=self.overwrite)
+        self.__buffer = bytearray()
+
+    def abort(self) -> None:
+        self.__buffer = bytearray()
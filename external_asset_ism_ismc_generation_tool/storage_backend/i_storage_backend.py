@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.storage_backend.buffered_storage_writer import BufferedStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+
+if TYPE_CHECKING:
+    from external_asset_ism_ismc_generation_tool.local_file_client.local_file_reader import LocalFileReader
+
+
+class IStorageBackend:
+    """
+    Storage of the renditions and manifests of one asset (Azure container, local directory, S3 bucket, ...).
+    Atom discovery, text parsing, VTT conversion and manifest upload are written once against this interface.
+    """
+    location: str = ""
+    is_multithreading: bool = False
+
+    def list(self) -> List[StorageItem]:
+        raise NotImplementedError
+
+    def read_range(self, name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[bytes, Optional[int]]:
+        """ Read 'length' bytes at 'offset' (the whole object by default) and the total object size if it is known """
+        raise NotImplementedError
+
+    def size(self, name: str) -> int:
+        raise NotImplementedError
+
+    def write(self, name: str, data: bytes, overwrite: bool = True):
+        raise NotImplementedError
+
+    def exists(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def open_writer(self, name: str, header_size: int = 0, overwrite: bool = True) -> IStorageWriter:
+        """ Writer of the object chunk by chunk, the object is buffered and written at once unless the backend uploads chunks """
+        return BufferedStorageWriter(self, name, header_size, overwrite)
+
+    def open_file_reader(self, name: str) -> Optional['LocalFileReader']:
+        """ Optional: memory-mapped reader of the object when the backend is backed by local files, None otherwise """
+        return None
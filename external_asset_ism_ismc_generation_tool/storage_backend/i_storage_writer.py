@@ -0,0 +1,29 @@
+class IStorageWriter:
+    """
+    Object of a storage written chunk by chunk, so that the whole content is never held in memory.
+    The first 'header_size' bytes of the object are reserved when the writer is opened and written last by write_header,
+    e.g. a header which depends on the size of the content. The object is created by commit, a writer which is not committed
+    leaves no object behind.
+    """
+    def write(self, data: bytes) -> None:
+        """ Append data after the header and the data written before """
+        raise NotImplementedError
+
+    def write_header(self, header: bytes) -> None:
+        """ Write the reserved header, its length shall be the header size the writer was opened with """
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
@@ -0,0 +1,43 @@
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+
+
+class InMemoryStorageBackend(IStorageBackend):
+    """ Storage kept in a dict of name -> bytes, for local runs and tests without any storage account """
+    def __init__(self, objects: Optional[Dict[str, bytes]] = None, is_multithreading: bool = False):
+        self.objects: Dict[str, bytes] = dict(objects or {})
+        self.location = "in-memory storage"
+        self.is_multithreading = is_multithreading
+        self.__lock = threading.Lock()
+
+    def list(self) -> List[StorageItem]:
+        with self.__lock:
+            return [StorageItem(name, len(data), str(zlib.crc32(data))) for name, data in self.objects.items()]
+
+    def read_range(self, name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[bytes, Optional[int]]:
+        data = self.__get(name)
+        offset = offset or 0
+        return data[offset:None if length is None else offset + length], len(data)
+
+    def size(self, name: str) -> int:
+        return len(self.__get(name))
+
+    def write(self, name: str, data: bytes, overwrite: bool = True):
+        with self.__lock:
+            if not overwrite and name in self.objects:
+                raise ValueError(f"Object already exists: {name}")
+            self.objects[name] = bytes(data)
+
+    def exists(self, name: str) -> bool:
+        with self.__lock:
+            return name in self.objects
+
+    def __get(self, name: str) -> bytes:
+        data = self.objects.get(name)
+        if data is None:
+            raise FileNotFoundError(f"Object does not exist: {name}")
+        return data
@@ -0,0 +1,44 @@
+import os
+from typing import List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.local_file_client.local_file_reader import LocalFileReader
+from external_asset_ism_ismc_generation_tool.local_file_client.local_file_service_client import LocalFileServiceClient
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.local_storage_writer import LocalStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+
+
+class LocalStorageBackend(IStorageBackend):
+    def __init__(self, local_file_service_client: LocalFileServiceClient):
+        self.local_file_service_client = local_file_service_client
+        self.location = f"directory {os.path.abspath(local_file_service_client.local_directory)}"
+        self.is_multithreading = local_file_service_client.is_multithreading
+
+    def list(self) -> List[StorageItem]:
+        items = []
+        for file in self.local_file_service_client.get_list_of_files():
+            file_stat = self.local_file_service_client.get_file_stat(file.name)
+            items.append(StorageItem(file.name, file_stat.st_size, f"{file_stat.st_mtime_ns}-{file_stat.st_ino}"))
+        return items
+
+    def read_range(self, name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[bytes, Optional[int]]:
+        data = self.local_file_service_client.download_part_of_file(file_name=name, offset=offset, length=length)
+        return data, self.local_file_service_client.get_file_size(name)
+
+    def size(self, name: str) -> int:
+        return self.local_file_service_client.get_file_size(name)
+
+    def write(self, name: str, data: bytes, overwrite: bool = True):
+        if not overwrite and self.exists(name):
+            raise ValueError(f"File already exists: {name}")
+        self.local_file_service_client.write_file(name, data)
+
+    def exists(self, name: str) -> bool:
+        return self.local_file_service_client.file_exists(name)
+
+    def open_writer(self, name: str, header_size: int = 0, overwrite: bool = True) -> IStorageWriter:
+        return LocalStorageWriter(os.path.join(self.local_file_service_client.local_directory, name), header_size, overwrite)
+
+    def open_file_reader(self, name: str) -> Optional[LocalFileReader]:
+        return self.local_file_service_client.open_file(name)
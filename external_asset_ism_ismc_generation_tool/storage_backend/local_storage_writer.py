@@ -0,0 +1,41 @@
+import os
+
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+
+
+class LocalStorageWriter(IStorageWriter):
+    """
+    Writer of a local file: the data is written to a temporary file next to it, the header is written in place of the
+    reserved bytes and the temporary file is renamed to the file by commit.
+    """
+    def __init__(self, file_path: str, header_size: int, overwrite: bool = True):
+        if not overwrite and os.path.exists(file_path):
+            raise ValueError(f"File already exists: {file_path}")
+        self.file_path = file_path
+        self.header_size = header_size
+        self.overwrite = overwrite
+        self.temporary_file_path = f"{file_path}.part"
+        self.__file = open(self.temporary_file_path, 'wb')
+        self.__file.write(bytes(header_size))
+
+    def write(self, data: bytes) -> None:
+        self.__file.write(data)
+
+    def write_header(self, header: bytes) -> None:
+        if len(header) != self.header_size:
+            raise ValueError(f"Header of {self.file_path} is {len(header)} bytes instead of {self.header_size}")
+        self.__file.seek(0)
+        self.__file.write(header)
+        self.__file.seek(0, os.SEEK_END)
+
+    def commit(self) -> None:
+        self.__file.close()
+        if not self.overwrite and os.path.exists(self.file_path):
+            os.remove(self.temporary_file_path)
+            raise ValueError(f"File already exists: {self.file_path}")
+        os.replace(self.temporary_file_path, self.file_path)
+
+    def abort(self) -> None:
+        self.__file.close()
+        if os.path.exists(self.temporary_file_path):
+            os.remove(self.temporary_file_path)
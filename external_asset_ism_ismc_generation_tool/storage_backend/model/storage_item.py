@@ -0,0 +1,18 @@
+from typing import Optional
+
+from external_asset_ism_ismc_generation_tool.common.base_model import BaseModel
+
+
+class StorageItem(BaseModel):
+    """
+    Object listed by a storage backend, 'name' is relative to the container, directory or bucket prefix.
+    'version' changes whenever the content changes (ETag, modification time, ...), None when it is unknown.
+    """
+    name: str
+    size: Optional[int]
+    version: Optional[str]
+
+    def __init__(self, name: str, size: Optional[int] = None, version: Optional[str] = None):
+        self.name = name
+        self.size = size
+        self.version = version
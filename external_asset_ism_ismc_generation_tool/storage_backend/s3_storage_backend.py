@@ -0,0 +1,99 @@
+from typing import List, Optional, Tuple
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.model.storage_item import StorageItem
+
+
+class S3StorageBackend(IStorageBackend):
+    """
+    Backend for Amazon S3 and S3-compatible storages (MinIO, Ceph, ...) selected with 'aws_endpoint_url'.
+    Object names are relative to the optional 's3_prefix' of the bucket. Requires the boto3 package.
+    """
+    __logger: ILogger = Logger("S3StorageBackend")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, settings: dict):
+        try:
+            import boto3
+        except ImportError as exc:
+            self.__logger.error(f"S3 storage requires the 'boto3' package: {exc}")
+            raise ImportError("S3 storage requires the 'boto3' package, install it with 'pip install boto3'") from exc
+
+        try:
+            self.bucket_name = settings["s3_bucket"]
+        except KeyError as exc:
+            self.__logger.error("Required setting 's3_bucket' is missing.")
+            raise ValueError("Missing required setting: s3_bucket") from exc
+
+        self.prefix = settings.get('s3_prefix') or ''
+        if self.prefix and not self.prefix.endswith('/'):
+            self.prefix += '/'
+        self.location = f"bucket {self.bucket_name}/{self.prefix}"
+        self.is_multithreading = settings.get('is_multithreading', False)
+        # Credentials not given in the settings are resolved by the default boto3 chain (environment, profile, role)
+        self.s3_client = boto3.client('s3',
+                                      endpoint_url=settings.get('aws_endpoint_url'),
+                                      region_name=settings.get('aws_region'),
+                                      aws_access_key_id=settings.get('aws_access_key_id'),
+                                      aws_secret_access_key=settings.get('aws_secret_access_key'))
+
+    def list(self) -> List[StorageItem]:
+        items = []
+        for page in self.s3_client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket_name, Prefix=self.prefix):
+            for s3_object in page.get('Contents', []):
+                name = s3_object['Key'][len(self.prefix):]
+                if name and '/' not in name:
+                    items.append(StorageItem(name, s3_object['Size'], s3_object.get('ETag')))
+        return items
+
+    def read_range(self, name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[bytes, Optional[int]]:
+        if length == 0:
+            return b'', None
+        if offset is None and length is None:
+            data = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.prefix + name)['Body'].read()
+            return data, len(data)
+        offset = offset or 0
+        byte_range = f"bytes={offset}-{'' if length is None else offset + length - 1}"
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.prefix + name, Range=byte_range)
+        except self.s3_client.exceptions.ClientError as exc:
+            # A range starting at or past the end of the object is refused with 416 InvalidRange instead of an empty body
+            if exc.response.get('Error', {}).get('Code') != 'InvalidRange':
+                raise
+            return b'', self.__get_invalid_range_object_size(name, exc)
+        data = response['Body'].read()
+        content_range = response.get('ContentRange')
+        object_size = int(content_range.split('/')[-1]) if content_range and not content_range.endswith('*') else None
+        return data, object_size
+
+    def __get_invalid_range_object_size(self, name: str, exc) -> int:
+        """ Object size given by the InvalidRange error (S3) or its Content-Range header, from a HEAD request otherwise """
+        actual_object_size = exc.response.get('Error', {}).get('ActualObjectSize')
+        if actual_object_size is not None:
+            return int(actual_object_size)
+        content_range = exc.response.get('ResponseMetadata', {}).get('HTTPHeaders', {}).get('content-range')
+        if content_range and not content_range.endswith('*'):
+            return int(content_range.split('/')[-1])
+        return self.size(name)
+
+    def size(self, name: str) -> int:
+        return self.s3_client.head_object(Bucket=self.bucket_name, Key=self.prefix + name)['ContentLength']
+
+    def write(self, name: str, data: bytes, overwrite: bool = True):
+        if not overwrite and self.exists(name):
+            raise ValueError(f"Object already exists: {self.prefix + name}")
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=self.prefix + name, Body=data)
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=self.prefix + name)
+        except self.s3_client.exceptions.ClientError as exc:
+            if exc.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
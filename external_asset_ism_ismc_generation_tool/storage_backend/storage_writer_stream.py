@@ -0,0 +1,30 @@
+import io
+from typing import List
+
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
+
+
+class StorageWriterStream(io.RawIOBase):
+    """
+    Binary stream which writes its data to storage writers, so that text written to the stream returned by open_text
+    is encoded and sent to the storage chunk by chunk. The stream does not commit the writers.
+    """
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, writers: List[IStorageWriter]):
+        super().__init__()
+        self.writers = writers
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        for writer in self.writers:
+            writer.write(data)
+        return len(data)
+
+    @staticmethod
+    def open_text(writers: List[IStorageWriter], buffer_size: int = DEFAULT_BUFFER_SIZE) -> io.TextIOWrapper:
+        """ UTF-8 text stream over the writers, closing it flushes the buffered text to them """
+        return io.TextIOWrapper(io.BufferedWriter(StorageWriterStream(writers), buffer_size), encoding='utf-8', newline='')
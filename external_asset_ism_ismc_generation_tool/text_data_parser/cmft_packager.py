@@ -1,9 +1,10 @@
 import struct
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_writer import IStorageWriter
 
 
 class CmftPackager:
@@ -36,6 +37,22 @@ class CmftPackager:
     
     # Microsoft-specific UUID for fragment timing
     MS_FRAGMENT_UUID = UUID('6d1d9b05-42d5-44e6-80e2-141daff757b2')
+    
+    # Offsets of the duration fields of the mvhd, tkhd and mdhd boxes in the moov box
+    _MOOV_DURATION_OFFSETS = (40, 212, 320)
+    # Offsets of the variable fields in the moof box: mfhd sequence_number, uuid fragment_duration and trun sample_duration
+    # followed by sample_size
+    _MFHD_SEQUENCE_NUMBER_OFFSET = 20
+    _UUID_FRAGMENT_DURATION_OFFSET = 84
+    _TRUN_SAMPLE_DURATION_OFFSET = 112
+    _MDAT_HEADER_SIZE = 8
+    _TFRA_HEADER_SIZE = 24
+    _MFRO_BOX_SIZE = 16
+    
+    # Box templates shared by all files, moov templates by timescale and language and moof templates by trun version
+    __ftyp_box: Optional[bytes] = None
+    __moov_templates: Dict[Tuple[int, str], bytes] = {}
+    __moof_templates: Dict[bool, bytes] = {}
 
     @classmethod
     def redefine_logger(cls, logger: ILogger):
@@ -85,33 +102,30 @@ class CmftPackager:
         
         try:
             # Build the CMFT structure: ftyp + moov + (moof + mdat) for each segment + mfra
-            cmft_data = bytearray()
+            # All box sizes are computed first, then the boxes are written into one preallocated buffer
             
-            # 1. Create ftyp box
-            ftyp_box = CmftPackager.__create_ftyp_box()
-            cmft_data.extend(ftyp_box)
+            # 1. Get ftyp box
+            ftyp_box = CmftPackager.__get_ftyp_box()
             
-            # 2. Create moov box
+            # 2. Create moov box from its template
             if not total_duration and segments:
                 # Calculate from last segment
                 last_start, last_xml = segments[-1]
                 # Estimate duration from XML (simple approach)
                 total_duration = last_start + 10  # Add some buffer
             
-            moov_box = CmftPackager.__create_moov_box(timescale, total_duration, language_code)
-            cmft_data.extend(moov_box)
+            moov_box = CmftPackager.__get_moov_box(timescale, total_duration, language_code)
             
-            # 3. Create moof + mdat pairs for each segment and track random access info
+            # 3. Compute the moof + mdat pairs of the segments and track random access info
+            fragments = []  # Track fragment duration and XML bytes of each segment
             moof_offsets = []  # Track the file offset for each moof
             segment_times = []  # Track presentation time for each segment
+            offset = len(ftyp_box) + len(moov_box)
             
             for idx, (start_time, imsc1_xml) in enumerate(segments):
                 try:
-                    sequence_number = idx + 1
-                    
                     # Record the offset of this moof box
-                    moof_offset = len(cmft_data)
-                    moof_offsets.append(moof_offset)
+                    moof_offsets.append(offset)
                     
                     # Convert start time to timescale units
                     presentation_time = int(start_time * timescale)
@@ -128,50 +142,217 @@ class CmftPackager:
                         duration_seconds = total_duration - start_time
                     
                     duration_timescale = int(duration_seconds * timescale)
-                    
-                    # Create moof box
-                    moof_box = CmftPackager.__create_moof_box(
-                        sequence_number,
-                        duration_timescale,
-                        len(xml_bytes)
-                    )
-                    cmft_data.extend(moof_box)
-                    
-                    # Create mdat box
-                    mdat_box = CmftPackager.__create_mdat_box(xml_bytes)
-                    cmft_data.extend(mdat_box)
+                    fragments.append((duration_timescale, xml_bytes))
+                    offset += len(CmftPackager.__get_moof_template(duration_timescale)) + CmftPackager._MDAT_HEADER_SIZE + len(xml_bytes)
                     
                 except Exception as e:
                     raise ValueError(f"Failed to process segment {idx + 1}/{len(segments)} at time {start_time:.2f}s: {e}") from e
             
-            # 4. Create mfra box with random access information
-            mfra_box = CmftPackager.__create_mfra_box(moof_offsets, segment_times)
-            cmft_data.extend(mfra_box)
+            # 4. Write all boxes, the mfra box with random access information is last
+            cmft_data = bytearray(offset + CmftPackager.__get_mfra_box_size(moof_offsets, segment_times))
+            buffer = memoryview(cmft_data)
+            try:
+                buffer[:len(ftyp_box)] = ftyp_box
+                buffer[len(ftyp_box):moof_offsets[0]] = moov_box
+                for idx, ((duration_timescale, xml_bytes), moof_offset) in enumerate(zip(fragments, moof_offsets)):
+                    try:
+                        CmftPackager.__write_fragment(buffer, moof_offset, idx + 1, duration_timescale, xml_bytes)
+                    except Exception as e:
+                        raise ValueError(f"Failed to process segment {idx + 1}/{len(segments)} at time {segments[idx][0]:.2f}s: {e}") from e
+                CmftPackager.__write_mfra_box(buffer, offset, moof_offsets, segment_times)
+            finally:
+                buffer.release()
             
             CmftPackager.__logger.info(f"Successfully packaged CMFT: {len(cmft_data)} bytes")
             return bytes(cmft_data)
             
-        except ValueError as e:
+        except Exception as e:
+            raise CmftPackager.__get_packaging_error(e, len(segments), timescale, total_duration)
+
+    @staticmethod
+    def write_stream(segments: Iterable[Tuple[float, str]], writer: IStorageWriter, segment_duration: float, timescale: int = 10000000,
+                     language_code: str = 'und') -> int:
+        """
+        Package segmented IMSC1 content into CMFT format fragment by fragment, for segments created lazily.
+        Every moof + mdat pair is written as soon as the start of the next segment is known, the mfra box follows them and
+        the ftyp + moov header, whose duration is known last, is written into the header reserved by the writer.
+        The file is the same as package() of all segments with the total duration of the last segment start + segment_duration.
+        
+        Args:
+            segments: Iterable of tuples (start_time, imsc1_xml_string) in ascending start time
+            writer: Writer of the CMFT file opened with the header size given by get_header_size
+            segment_duration: Duration of the last segment in seconds
+            timescale: Timescale for the track (default: 10000000 for 10MHz)
+            language_code: ISO 639-2/T 3-letter language code (default: 'und')
+            
+        Returns:
+            Size of the CMFT file in bytes
+        """
+        if timescale <= 0:
+            raise ValueError(f"Invalid timescale: {timescale}. Must be positive.")
+        
+        if segment_duration < 0:
+            raise ValueError(f"Invalid segment_duration: {segment_duration}. Must be non-negative.")
+        
+        if not language_code or not isinstance(language_code, str):
+            language_code = CmftPackager.DEFAULT_LANGUAGE
+        
+        segment_iterator = iter(segments)
+        current_segment = next(segment_iterator, None)
+        if current_segment is None:
+            raise ValueError("Cannot package CMFT: segments list is empty")
+        
+        moof_offsets = []  # Track the file offset for each moof
+        segment_times = []  # Track presentation time for each segment
+        total_duration = 0.0
+        offset = CmftPackager.get_header_size(timescale, language_code)
+        while current_segment is not None:
+            start_time, imsc1_xml = current_segment
+            # Segmentation errors of lazily created segments are raised as they are
+            next_segment = next(segment_iterator, None)
+            try:
+                # Convert start time to timescale units and XML to bytes
+                presentation_time = int(start_time * timescale)
+                xml_bytes = imsc1_xml.encode('utf-8')
+                
+                # The last segment lasts segment_duration, like in package() with the total duration of the file
+                if next_segment is not None:
+                    duration_seconds = next_segment[0] - start_time
+                else:
+                    total_duration = start_time + segment_duration
+                    duration_seconds = total_duration - start_time
+                
+                duration_timescale = int(duration_seconds * timescale)
+                fragment_header = bytearray(len(CmftPackager.__get_moof_template(duration_timescale)) + CmftPackager._MDAT_HEADER_SIZE)
+                CmftPackager.__write_fragment_header(memoryview(fragment_header), 0, len(moof_offsets) + 1, duration_timescale, len(xml_bytes))
+                writer.write(fragment_header)
+                writer.write(xml_bytes)
+            except Exception as e:
+                error = ValueError(f"Failed to process segment {len(moof_offsets) + 1} at time {start_time:.2f}s: {e}")
+                raise CmftPackager.__get_packaging_error(error, len(moof_offsets) + 1, timescale, total_duration) from e
+            
+            moof_offsets.append(offset)
+            segment_times.append(presentation_time)
+            offset += len(fragment_header) + len(xml_bytes)
+            current_segment = next_segment
+        
+        try:
+            # The mfra box with random access information is last, the header is written once the duration is known
+            mfra_box = bytearray(CmftPackager.__get_mfra_box_size(moof_offsets, segment_times))
+            CmftPackager.__write_mfra_box(memoryview(mfra_box), 0, moof_offsets, segment_times)
+            writer.write(mfra_box)
+            writer.write_header(CmftPackager.__get_ftyp_box() + CmftPackager.__get_moov_box(timescale, total_duration, language_code))
+        except Exception as e:
+            raise CmftPackager.__get_packaging_error(e, len(moof_offsets), timescale, total_duration)
+        
+        CmftPackager.__logger.info(f"Successfully packaged {len(moof_offsets)} segments into CMFT: {offset + len(mfra_box)} bytes")
+        return offset + len(mfra_box)
+
+    @staticmethod
+    def get_header_size(timescale: int = 10000000, language_code: str = 'und') -> int:
+        """Size of the ftyp + moov header of the CMFT files of the timescale and language, which does not depend on the content."""
+        return len(CmftPackager.__get_ftyp_box()) + len(CmftPackager.__get_moov_box(timescale, 0, language_code or CmftPackager.DEFAULT_LANGUAGE))
+
+    @staticmethod
+    def __get_packaging_error(error: Exception, segment_count: int, timescale: int, total_duration: float) -> ValueError:
+        """Log a packaging error and return the ValueError to raise for it."""
+        if isinstance(error, ValueError):
             # Re-raise ValueError with context
-            if "Failed to package CMFT" in str(e):
-                raise
-            error_msg = f"CMFT packaging validation error: {e}"
+            if "Failed to package CMFT" in str(error):
+                return error
+            error_msg = f"CMFT packaging validation error: {error}"
             CmftPackager.__logger.error(error_msg)
-            raise ValueError(f"Failed to package CMFT: {error_msg}")
-            
-        except struct.error as e:
+            return ValueError(f"Failed to package CMFT: {error_msg}")
+        
+        if isinstance(error, struct.error):
             # Binary packing errors
-            error_msg = f"CMFT binary data packing error: {e}"
+            error_msg = f"CMFT binary data packing error: {error}"
             CmftPackager.__logger.error(error_msg)
-            CmftPackager.__logger.error(f"Check segment data integrity - segments count: {len(segments)}")
-            raise ValueError(f"Failed to package CMFT: {error_msg}")
+            CmftPackager.__logger.error(f"Check segment data integrity - segments count: {segment_count}")
+            return ValueError(f"Failed to package CMFT: {error_msg}")
+        
+        error_type = type(error).__name__
+        error_msg = f"Unexpected error packaging CMFT ({error_type}): {error}"
+        CmftPackager.__logger.error(error_msg)
+        CmftPackager.__logger.error(f"Segments count: {segment_count}, timescale: {timescale}, duration: {total_duration}")
+        return ValueError(f"Failed to package CMFT: {error_msg}")
+
+    @staticmethod
+    def __get_ftyp_box() -> bytes:
+        """Get the ftyp box, which is the same for every file."""
+        if CmftPackager.__ftyp_box is None:
+            CmftPackager.__ftyp_box = CmftPackager.__create_ftyp_box()
+        return CmftPackager.__ftyp_box
+
+    @staticmethod
+    def __get_moov_box(timescale: int, duration: float, language_code: str) -> bytearray:
+        """Get the moov box from the template of the timescale and language with the duration written in place."""
+        template_key = (timescale, language_code)
+        moov_template = CmftPackager.__moov_templates.get(template_key)
+        if moov_template is None:
+            moov_template = CmftPackager.__create_moov_box(timescale, 0, language_code)
+            CmftPackager.__moov_templates[template_key] = moov_template
+        
+        # Convert duration to timescale units
+        duration_timescale = int(duration * timescale)
+        moov_box = bytearray(moov_template)
+        for duration_offset in CmftPackager._MOOV_DURATION_OFFSETS:
+            struct.pack_into('>Q', moov_box, duration_offset, duration_timescale)
+        return moov_box
+
+    @staticmethod
+    def __get_moof_template(duration: int) -> bytes:
+        """Get the moof box template of the trun version needed for the duration, its sequence number, durations and sample size are zero."""
+        use_version_1 = duration > 0xFFFFFFFF
+        moof_template = CmftPackager.__moof_templates.get(use_version_1)
+        if moof_template is None:
+            moof_template = CmftPackager.__create_moof_box(0, 0xFFFFFFFF + 1 if use_version_1 else 0, 0)
+            CmftPackager.__moof_templates[use_version_1] = moof_template
+        return moof_template
+
+    @staticmethod
+    def __write_fragment(buffer: memoryview, offset: int, sequence_number: int, duration: int, xml_bytes: bytes) -> None:
+        """
+        Write the moof and mdat boxes of a segment.
+        
+        Args:
+            buffer: Buffer of the whole file
+            offset: File offset of the moof box
+            sequence_number: Sequence number of the fragment
+            duration: Duration of the segment in timescale units
+            xml_bytes: IMSC1 XML of the segment, the only sample of the fragment
+        """
+        offset += CmftPackager.__write_fragment_header(buffer, offset, sequence_number, duration, len(xml_bytes))
+        buffer[offset:offset + len(xml_bytes)] = xml_bytes
+
+    @staticmethod
+    def __write_fragment_header(buffer: memoryview, offset: int, sequence_number: int, duration: int, sample_size: int) -> int:
+        """
+        Write the moof box of a segment and the header of its mdat box.
+        
+        Args:
+            buffer: Buffer to write into
+            offset: Offset of the moof box in the buffer
+            sequence_number: Sequence number of the fragment
+            duration: Duration of the segment in timescale units
+            sample_size: Size of the IMSC1 XML of the segment
             
-        except Exception as e:
-            error_type = type(e).__name__
-            error_msg = f"Unexpected error packaging CMFT ({error_type}): {e}"
-            CmftPackager.__logger.error(error_msg)
-            CmftPackager.__logger.error(f"Segments count: {len(segments)}, timescale: {timescale}, duration: {total_duration}")
-            raise ValueError(f"Failed to package CMFT: {error_msg}")
+        Returns:
+            Number of bytes written, the XML of the segment follows them
+        """
+        moof_template = CmftPackager.__get_moof_template(duration)
+        buffer[offset:offset + len(moof_template)] = moof_template
+        struct.pack_into('>I', buffer, offset + CmftPackager._MFHD_SEQUENCE_NUMBER_OFFSET, sequence_number)
+        struct.pack_into('>Q', buffer, offset + CmftPackager._UUID_FRAGMENT_DURATION_OFFSET, duration)
+        if duration > 0xFFFFFFFF:
+            struct.pack_into('>QI', buffer, offset + CmftPackager._TRUN_SAMPLE_DURATION_OFFSET, duration, sample_size)
+        else:
+            struct.pack_into('>II', buffer, offset + CmftPackager._TRUN_SAMPLE_DURATION_OFFSET, duration, sample_size)
+        
+        # mdat box with the XML of the segment
+        offset += len(moof_template)
+        struct.pack_into('>I4s', buffer, offset, CmftPackager._MDAT_HEADER_SIZE + sample_size, CmftPackager.BOX_MDAT)
+        return len(moof_template) + CmftPackager._MDAT_HEADER_SIZE
 
     @staticmethod
     def __create_ftyp_box() -> bytes:
@@ -438,12 +619,6 @@ class CmftPackager:
         moof_data = b'moof' + mfhd_box + traf_box
         return CmftPackager.__wrap_box(moof_data)
 
-    @staticmethod
-    def __create_mdat_box(data: bytes) -> bytes:
-        """Create an mdat (media data) box."""
-        mdat_data = b'mdat' + data
-        return CmftPackager.__wrap_box(mdat_data)
-
     @staticmethod
     def __encode_language(language_code: str) -> int:
         """
@@ -482,118 +657,61 @@ class CmftPackager:
         return encoded
 
     @staticmethod
-    def __create_mfra_box(moof_offsets: List[int], segment_times: List[int]) -> bytes:
+    def __is_tfra_version_1(moof_offsets: List[int], segment_times: List[int]) -> bool:
+        """Determine if the tfra box needs version 1 (64-bit) based on max values."""
+        # Version 0 uses 32-bit unsigned integers, max value: 4,294,967,295
+        max_time = max(segment_times) if segment_times else 0
+        max_offset = max(moof_offsets) if moof_offsets else 0
+        return max_time > 0xFFFFFFFF or max_offset > 0xFFFFFFFF
+
+    @staticmethod
+    def __get_mfra_box_size(moof_offsets: List[int], segment_times: List[int]) -> int:
         """
-        Create the mfra (movie fragment random access) box.
+        Calculate the size of the mfra (movie fragment random access) box.
         
         Args:
             moof_offsets: List of file offsets for each moof box
             segment_times: List of presentation times for each segment (in timescale units)
             
         Returns:
-            Bytes containing the complete mfra box with tfra and mfro
+            Size of the mfra box with tfra and mfro in bytes
         """
-        # Create tfra box for track 1 (subtitle track)
-        tfra_box = CmftPackager.__create_tfra_box(moof_offsets, segment_times)
-        
-        # Calculate mfra box size (will include tfra + mfro)
         # mfra header: 8 bytes (size + 'mfra')
-        # tfra box: calculated
+        # tfra box: 8 header + 4 version/flags + 4 track_ID + 4 length sizes + 4 number_of_entry + entries
+        # tfra entry: time and moof_offset (32-bit in version 0, 64-bit in version 1) + 3 bytes traf, trun and sample numbers
         # mfro box: 16 bytes (8 header + 8 version/flags/parent_size)
-        mfra_size = 8 + len(tfra_box) + 16
-        
-        # Create mfro box
-        mfro_box = CmftPackager.__create_mfro_box(mfra_size)
-        
-        # Assemble mfra box
-        mfra_data = b'mfra' + tfra_box + mfro_box
-        return CmftPackager.__wrap_box(mfra_data)
+        entry_size = 19 if CmftPackager.__is_tfra_version_1(moof_offsets, segment_times) else 11
+        return 8 + CmftPackager._TFRA_HEADER_SIZE + entry_size * len(moof_offsets) + CmftPackager._MFRO_BOX_SIZE
 
     @staticmethod
-    def __create_tfra_box(moof_offsets: List[int], segment_times: List[int]) -> bytes:
+    def __write_mfra_box(buffer: memoryview, offset: int, moof_offsets: List[int], segment_times: List[int]) -> None:
         """
-        Create the tfra (track fragment random access) box.
+        Write the mfra (movie fragment random access) box at the end of the file.
         
         Args:
+            buffer: Buffer of the whole file
+            offset: File offset of the mfra box
             moof_offsets: List of file offsets for each moof box
             segment_times: List of presentation times for each segment (in timescale units)
-            
-        Returns:
-            Bytes containing the complete tfra box
-        """
-        # Determine if we need version 1 (64-bit) based on max values
-        # Version 0 uses 32-bit unsigned integers, max value: 4,294,967,295
-        max_time = max(segment_times) if segment_times else 0
-        max_offset = max(moof_offsets) if moof_offsets else 0
-        use_version_1 = max_time > 0xFFFFFFFF or max_offset > 0xFFFFFFFF
-        
-        # tfra is a FullBox with version and flags
-        tfra_data = b'tfra'
-        tfra_data += struct.pack('>B', 1 if use_version_1 else 0)  # version
-        tfra_data += struct.pack('>I', 0)[1:]  # flags (3 bytes)
-        
-        # track_ID = 1 (our subtitle track)
-        tfra_data += struct.pack('>I', 1)
-        
-        # reserved (26 bits) + length_size fields (2 bits each for traf, trun, sample)
-        # length_size_of_traf_num = 0 (means 1 byte)
-        # length_size_of_trun_num = 0 (means 1 byte)
-        # length_size_of_sample_num = 0 (means 1 byte)
-        # Format: 26 bits reserved + 2 bits traf + 2 bits trun + 2 bits sample = 32 bits total
-        reserved_and_lengths = (0 << 6) | (0 << 4) | (0 << 2) | 0
-        tfra_data += struct.pack('>I', reserved_and_lengths)
-        
-        # number_of_entry
-        number_of_entries = len(moof_offsets)
-        tfra_data += struct.pack('>I', number_of_entries)
-        
-        # Add entries for each segment
-        for i in range(number_of_entries):
-            if use_version_1:
-                # time (64-bit in version 1)
-                tfra_data += struct.pack('>Q', segment_times[i])
-                
-                # moof_offset (64-bit in version 1)
-                tfra_data += struct.pack('>Q', moof_offsets[i])
-            else:
-                # time (32-bit in version 0)
-                tfra_data += struct.pack('>I', segment_times[i])
-                
-                # moof_offset (32-bit in version 0)
-                tfra_data += struct.pack('>I', moof_offsets[i])
-            
-            # traf_number (1 byte, since length_size_of_traf_num = 0)
-            # We have only one traf per moof, so always 1
-            tfra_data += struct.pack('>B', 1)
-            
-            # trun_number (1 byte, since length_size_of_trun_num = 0)
-            # We have only one trun per traf, so always 1
-            tfra_data += struct.pack('>B', 1)
-            
-            # sample_delta (1 byte, since length_size_of_sample_num = 0)
-            # sample_delta = 1 + desired_sample - first_sample_in_trun
-            # Since we have one sample per trun starting at 1, delta = 1 + 1 - 1 = 1
-            tfra_data += struct.pack('>B', 1)
-        
-        return CmftPackager.__wrap_box(tfra_data)
-
-    @staticmethod
-    def __create_mfro_box(parent_size: int) -> bytes:
-        """
-        Create the mfro (movie fragment random access offset) box.
-        
-        Args:
-            parent_size: Size of the enclosing mfra box (in bytes)
-            
-        Returns:
-            Bytes containing the complete mfro box
         """
-        # mfro is a FullBox with version and flags
-        mfro_data = b'mfro'
-        mfro_data += struct.pack('>B', 0)  # version 0
-        mfro_data += struct.pack('>I', 0)[1:]  # flags (3 bytes)
-        
-        # parent_size (32-bit unsigned int)
-        mfro_data += struct.pack('>I', parent_size)
-        
-        return CmftPackager.__wrap_box(mfro_data)
+        mfra_size = CmftPackager.__get_mfra_box_size(moof_offsets, segment_times)
+        use_version_1 = CmftPackager.__is_tfra_version_1(moof_offsets, segment_times)
+        struct.pack_into('>I4s', buffer, offset, mfra_size, CmftPackager.BOX_MFRA)
+        offset += 8
+        
+        # tfra (track fragment random access) box, a FullBox for track_ID 1 (our subtitle track)
+        # reserved (26 bits) + length_size fields (2 bits each for traf, trun, sample) are 0, traf, trun and sample numbers take 1 byte
+        tfra_size = mfra_size - 8 - CmftPackager._MFRO_BOX_SIZE
+        struct.pack_into('>I4sB3xIII', buffer, offset, tfra_size, b'tfra', 1 if use_version_1 else 0, 1, 0, len(moof_offsets))
+        offset += CmftPackager._TFRA_HEADER_SIZE
+        
+        # Add entries for each segment: time, moof_offset, traf_number, trun_number and sample_delta
+        # We have one traf per moof, one trun per traf and one sample per trun, so the numbers are always 1
+        entry_format = '>QQBBB' if use_version_1 else '>IIBBB'
+        entry_size = struct.calcsize(entry_format)
+        for segment_time, moof_offset in zip(segment_times, moof_offsets):
+            struct.pack_into(entry_format, buffer, offset, segment_time, moof_offset, 1, 1, 1)
+            offset += entry_size
+        
+        # mfro (movie fragment random access offset) box, a FullBox with the size of the enclosing mfra box
+        struct.pack_into('>I4sB3xI', buffer, offset, CmftPackager._MFRO_BOX_SIZE, b'mfro', 0, mfra_size)
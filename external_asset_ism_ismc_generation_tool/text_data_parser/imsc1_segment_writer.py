@@ -0,0 +1,182 @@
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
+
+
+class Imsc1SegmentWriter:
+    """
+    Writes the XML documents of the segments of one IMSC1 document.
+    The document around the cues of a segment is serialized once per distinct set of regions and namespaces used by the cues and cached
+    as a prefix and a suffix, so that only the cues are serialized for every segment. The output is the same as ET.tostring of the
+    whole segment document, segments which cannot be written from a template are built and serialized as a whole.
+    """
+    _TTML_NAMESPACE = 'http://www.w3.org/ns/ttml'
+    _XML_ID = '{http://www.w3.org/XML/1998/namespace}id'
+    # Prefixes ElementTree generates for namespaces which are not registered, they depend on the order of the namespaces in the document
+    _GENERATED_PREFIX = re.compile(r'ns\d+$')
+
+    __logger: ILogger = Logger("Imsc1SegmentWriter")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, root: ET.Element, namespaces: dict):
+        """
+        Args:
+            root: Original IMSC1 root element
+            namespaces: XML namespaces
+        """
+        for prefix, uri in namespaces.items():
+            ET.register_namespace(prefix, uri)
+        ET.register_namespace('', Imsc1SegmentWriter._TTML_NAMESPACE)
+
+        self.root = root
+        self.head = root.find('.//tt:head', namespaces)
+        if self.head is None:
+            self.head = root.find('.//head')
+        self.body = root.find('.//tt:body', namespaces)
+        if self.body is None:
+            self.body = root.find('.//body')
+        self.div = self.body.find('.//tt:div', namespaces) if self.body is not None else None
+        if self.div is None and self.body is not None:
+            self.div = self.body.find('.//div')
+
+        # Prefix and suffix of the segment documents by regions and namespaces of the cues, None when a template cannot be used
+        self.__templates: Dict[Tuple[FrozenSet[str], FrozenSet[str]], Optional[Tuple[str, str]]] = {}
+        self.__prefixes: Dict[str, Optional[str]] = {}
+
+    def to_xml(self, cues: List[ET.Element]) -> str:
+        """
+        Create the IMSC1 XML document of a segment.
+
+        Args:
+            cues: List of <p> elements to include in this segment
+
+        Returns:
+            XML string for the segment
+        """
+        used_regions = frozenset(cue.get('region') for cue in cues if cue.get('region'))
+        cue_namespaces = Imsc1SegmentWriter.__get_namespaces(cues)
+        template = self.__get_template(used_regions, cue_namespaces, cues[0].tag) if cue_namespaces is not None and cues else None
+        if template is None:
+            return ET.tostring(self.__build_document(cues, used_regions), encoding='utf-8', xml_declaration=True).decode('utf-8')
+
+        prefix, suffix = template
+        parts = [prefix]
+        for cue in cues:
+            self.__serialize(cue, parts.append)
+        parts.append(suffix)
+        return ''.join(parts)
+
+    def __get_template(self, used_regions: FrozenSet[str], cue_namespaces: FrozenSet[str], cue_tag: str) -> Optional[Tuple[str, str]]:
+        key = (used_regions, cue_namespaces)
+        if key not in self.__templates:
+            self.__templates[key] = self.__create_template(used_regions, cue_namespaces, cue_tag)
+        return self.__templates[key]
+
+    def __create_template(self, used_regions: FrozenSet[str], cue_namespaces: FrozenSet[str], cue_tag: str) -> Optional[Tuple[str, str]]:
+        if any(self.__get_prefix(uri) is None for uri in cue_namespaces):
+            return None
+
+        # The probe cue uses every namespace of the cues, so that the root of the template declares the same namespaces as the segment
+        probe = ET.Element(cue_tag, {f'{{{uri}}}probe': '' for uri in sorted(cue_namespaces)})
+        probe.text = 'probe'
+        document = ET.tostring(self.__build_document([probe], used_regions), encoding='utf-8', xml_declaration=True).decode('utf-8')
+        probe_parts = []
+        self.__serialize(probe, probe_parts.append)
+        probe_xml = ''.join(probe_parts)
+        if document.count(probe_xml) != 1:
+            Imsc1SegmentWriter.__logger.warning(f"Cannot create the template of segments with regions {sorted(used_regions)}")
+            return None
+
+        prefix, suffix = document.split(probe_xml)
+        return prefix, suffix
+
+    def __build_document(self, cues: List[ET.Element], used_regions: FrozenSet[str]) -> ET.Element:
+        # Create new root element with same attributes
+        new_root = ET.Element(self.root.tag, attrib=self.root.attrib)
+
+        # Copy head element with filtered regions
+        if self.head is not None:
+            new_head = ET.SubElement(new_root, self.head.tag, attrib=self.head.attrib)
+            # Copy children of head, filtering layout regions
+            for child in self.head:
+                if 'layout' in child.tag.lower():
+                    # This is a layout element, need to filter regions
+                    new_layout = ET.SubElement(new_head, child.tag, attrib=child.attrib)
+                    # Copy only the regions that are used in this segment
+                    for region in child:
+                        if 'region' in region.tag.lower():
+                            if region.get(Imsc1SegmentWriter._XML_ID) in used_regions:
+                                new_layout.append(region)
+                        else:
+                            # Not a region element, copy as-is
+                            new_layout.append(region)
+                else:
+                    # Not a layout element, copy as-is
+                    new_head.append(child)
+        else:
+            # Create empty head
+            ET.SubElement(new_root, f'{{{Imsc1SegmentWriter._TTML_NAMESPACE}}}head')
+
+        body_attrib = self.body.attrib if self.body is not None else {}
+        new_body = ET.SubElement(new_root, f'{{{Imsc1SegmentWriter._TTML_NAMESPACE}}}body', attrib=body_attrib)
+        div_attrib = self.div.attrib if self.div is not None else {}
+        new_div = ET.SubElement(new_body, f'{{{Imsc1SegmentWriter._TTML_NAMESPACE}}}div', attrib=div_attrib)
+
+        # Add cues to div
+        for cue in cues:
+            new_div.append(cue)
+        return new_root
+
+    def __serialize(self, element: ET.Element, write: Callable[[str], None]) -> None:
+        """ Serializes the element like ElementTree does inside a document which declares the namespaces of the element on its root """
+        tag = self.__get_qualified_name(element.tag)
+        write(f'<{tag}')
+        for name, value in element.items():
+            write(f' {self.__get_qualified_name(name)}="{escape(value, XmlStreamWriter._ATTRIBUTE_ENTITIES)}"')
+        if element.text or len(element):
+            write('>')
+            if element.text:
+                write(escape(element.text))
+            for child in element:
+                self.__serialize(child, write)
+            write(f'</{tag}>')
+        else:
+            write(' />')
+        if element.tail:
+            write(escape(element.tail))
+
+    def __get_qualified_name(self, name: str) -> str:
+        if not name.startswith('{'):
+            return name
+        uri, local_name = name[1:].split('}', 1)
+        prefix = self.__get_prefix(uri)
+        return f'{prefix}:{local_name}' if prefix else local_name
+
+    def __get_prefix(self, uri: str) -> Optional[str]:
+        """ Returns the prefix ElementTree writes for the namespace, None when the namespace is not registered """
+        if uri not in self.__prefixes:
+            tag = ET.tostring(ET.Element(f'{{{uri}}}probe'), encoding='unicode')[1:].split(' ', 1)[0]
+            prefix = tag[:-len(':probe')] if tag.endswith(':probe') else ''
+            self.__prefixes[uri] = None if Imsc1SegmentWriter._GENERATED_PREFIX.match(prefix) else prefix
+        return self.__prefixes[uri]
+
+    @staticmethod
+    def __get_namespaces(cues: List[ET.Element]) -> Optional[FrozenSet[str]]:
+        """ Returns the namespaces of the tags and attributes of the cues, None when the cues contain comments or processing instructions """
+        namespaces = set()
+        for cue in cues:
+            for element in cue.iter():
+                if not isinstance(element.tag, str):
+                    return None
+                for name in [element.tag, *element.keys()]:
+                    if name.startswith('{'):
+                        namespaces.add(name[1:].split('}', 1)[0])
+        return frozenset(namespaces)
@@ -1,8 +1,10 @@
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Tuple
 from xml.etree import ElementTree as ET
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+from external_asset_ism_ismc_generation_tool.text_data_parser.imsc1_segment_writer import Imsc1SegmentWriter
 
 
 class Imsc1Segmenter:
@@ -26,6 +28,20 @@ class Imsc1Segmenter:
         Returns:
             List of tuples containing (start_time, segment_xml_string)
         """
+        return list(Imsc1Segmenter.iter_segments(imsc1_content, segment_duration))
+
+    @staticmethod
+    def iter_segments(imsc1_content: str, segment_duration: float) -> Iterator[Tuple[float, str]]:
+        """
+        Segment IMSC1 content into fixed-duration chunks lazily, the XML of a segment is created when it is requested.
+        
+        Args:
+            imsc1_content: String containing IMSC1 (TTML) XML content
+            segment_duration: Duration of each segment in seconds (fixed value, typically 4.0)
+            
+        Yields:
+            Tuples containing (start_time, segment_xml_string) in ascending start time
+        """
         Imsc1Segmenter.__logger.info(f"Segmenting IMSC1 with segment duration: {segment_duration}s")
         
         try:
@@ -64,12 +80,7 @@ class Imsc1Segmenter:
             
             if not p_elements:
                 Imsc1Segmenter.__logger.warning("No subtitle cues found in IMSC1 content")
-                return []
-            
-            # Group cues by segments
-            segments = []
-            current_segment_start = 0.0
-            current_segment_end = float(segment_duration)
+                return
             
             # Get total duration from the last cue
             last_p = p_elements[-1]
@@ -78,50 +89,56 @@ class Imsc1Segmenter:
             
             Imsc1Segmenter.__logger.info(f"Total subtitle duration: {total_duration}s")
             
-            # Create segments
-            while current_segment_start < total_duration:
-                segment_cues = []
+            # Segment boundaries, the end of a segment is the start of the next one
+            segment_starts, segment_ends = Imsc1Segmenter.__get_segment_boundaries(total_duration, segment_duration)
+            
+            # Times of every cue are parsed once, each cue is added to the segments it overlaps in document order
+            segment_cue_lists = [[] for _ in segment_starts]
+            for p_elem in p_elements:
+                begin_time = Imsc1Segmenter.__parse_time(p_elem.get('begin', ''))
+                end_time = Imsc1Segmenter.__parse_time(p_elem.get('end', ''))
+                
+                # A cue overlaps the segments which end after its begin and start before its end
+                first_segment_index = bisect_right(segment_ends, begin_time)
+                last_segment_index = bisect_left(segment_starts, end_time)
+                for segment_index in range(first_segment_index, last_segment_index):
+                    segment_cue_lists[segment_index].append((p_elem, begin_time, end_time))
+            
+            # Create segments, the document around the cues is serialized once per distinct set of regions
+            segment_writer = Imsc1SegmentWriter(root, namespaces)
+            segment_count = 0
+            for current_segment_start, current_segment_end, segment_cue_list in zip(segment_starts, segment_ends, segment_cue_lists):
+                if not segment_cue_list:
+                    continue
                 
-                for p_elem in p_elements:
-                    begin_str = p_elem.get('begin', '')
-                    end_str = p_elem.get('end', '')
+                segment_cues = []
+                for p_elem, begin_time, end_time in segment_cue_list:
+                    # Create a copy of the cue element to modify its timing
+                    cue_copy = ET.Element(p_elem.tag, attrib=p_elem.attrib.copy())
+                    cue_copy.text = p_elem.text
+                    cue_copy.tail = p_elem.tail
+                    
+                    # Copy all child elements
+                    for child in p_elem:
+                        cue_copy.append(child)
+                    
+                    # Adjust timing to fit within segment boundaries
+                    adjusted_begin = max(begin_time, current_segment_start)
+                    adjusted_end = min(end_time, current_segment_end)
                     
-                    begin_time = Imsc1Segmenter.__parse_time(begin_str)
-                    end_time = Imsc1Segmenter.__parse_time(end_str)
+                    # Format times back to HH:MM:SS.mmm format
+                    cue_copy.set('begin', Imsc1Segmenter.__format_time(adjusted_begin))
+                    cue_copy.set('end', Imsc1Segmenter.__format_time(adjusted_end))
                     
-                    # Check if cue overlaps with current segment
-                    if begin_time < current_segment_end and end_time > current_segment_start:
-                        # Create a copy of the cue element to modify its timing
-                        cue_copy = ET.Element(p_elem.tag, attrib=p_elem.attrib.copy())
-                        cue_copy.text = p_elem.text
-                        cue_copy.tail = p_elem.tail
-                        
-                        # Copy all child elements
-                        for child in p_elem:
-                            cue_copy.append(child)
-                        
-                        # Adjust timing to fit within segment boundaries
-                        adjusted_begin = max(begin_time, current_segment_start)
-                        adjusted_end = min(end_time, current_segment_end)
-                        
-                        # Format times back to HH:MM:SS.mmm format
-                        cue_copy.set('begin', Imsc1Segmenter.__format_time(adjusted_begin))
-                        cue_copy.set('end', Imsc1Segmenter.__format_time(adjusted_end))
-                        
-                        segment_cues.append(cue_copy)
+                    segment_cues.append(cue_copy)
                 
                 # Create segment XML
-                if segment_cues:
-                    segment_xml = Imsc1Segmenter.__create_segment_xml(root, segment_cues, namespaces)
-                    segments.append((current_segment_start, segment_xml))
-                    Imsc1Segmenter.__logger.info(f"Created segment at {current_segment_start}s with {len(segment_cues)} cues")
-                
-                # Move to next segment
-                current_segment_start = current_segment_end
-                current_segment_end += segment_duration
+                segment_xml = segment_writer.to_xml(segment_cues)
+                segment_count += 1
+                Imsc1Segmenter.__logger.info(f"Created segment at {current_segment_start}s with {len(segment_cues)} cues")
+                yield current_segment_start, segment_xml
             
-            Imsc1Segmenter.__logger.info(f"Created {len(segments)} segments")
-            return segments
+            Imsc1Segmenter.__logger.info(f"Created {segment_count} segments")
             
         except ET.ParseError as e:
             error_msg = f"Failed to parse IMSC1 XML: {e}"
@@ -144,6 +161,33 @@ class Imsc1Segmenter:
             Imsc1Segmenter.__logger.error(f"Segment duration: {segment_duration}s")
             raise ValueError(f"Failed to segment IMSC1: {error_msg}")
 
+    @staticmethod
+    def __get_segment_boundaries(total_duration: float, segment_duration: float) -> Tuple[List[float], List[float]]:
+        """
+        Get the start and end times of the segments covering the total duration.
+        
+        Args:
+            total_duration: End time of the last cue in seconds
+            segment_duration: Duration of each segment in seconds
+            
+        Returns:
+            Tuple of the ascending start times and end times of the segments
+        """
+        if segment_duration <= 0:
+            raise ValueError(f"Segment duration must be positive: {segment_duration}")
+        
+        segment_starts = []
+        segment_ends = []
+        current_segment_start = 0.0
+        current_segment_end = float(segment_duration)
+        # Ends are accumulated like the segments are walked, so that cue times are clipped to the same float boundaries
+        while current_segment_start < total_duration:
+            segment_starts.append(current_segment_start)
+            segment_ends.append(current_segment_end)
+            current_segment_start = current_segment_end
+            current_segment_end += segment_duration
+        return segment_starts, segment_ends
+
     @staticmethod
     def __parse_time(time_str: str) -> float:
         """
@@ -191,83 +235,3 @@ class Imsc1Segmenter:
         
         # Format with milliseconds (3 decimal places)
         return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
-
-    @staticmethod
-    def __create_segment_xml(root: ET.Element, cues: List[ET.Element], namespaces: dict) -> str:
-        """
-        Create a new IMSC1 XML document for a segment.
-        
-        Args:
-            root: Original IMSC1 root element
-            cues: List of <p> elements to include in this segment
-            namespaces: XML namespaces
-            
-        Returns:
-            XML string for the segment
-        """
-        # Create a new IMSC1 document structure
-        # Register namespaces
-        for prefix, uri in namespaces.items():
-            ET.register_namespace(prefix, uri)
-        ET.register_namespace('', 'http://www.w3.org/ns/ttml')
-        
-        # Create new root element with same attributes
-        new_root = ET.Element(root.tag, attrib=root.attrib)
-        
-        # Collect regions used in this segment's cues
-        used_regions = set()
-        for cue in cues:
-            region = cue.get('region')
-            if region:
-                used_regions.add(region)
-        
-        # Copy head element with filtered regions
-        head = root.find('.//tt:head', namespaces)
-        if head is None:
-            head = root.find('.//head')
-        if head is not None:
-            new_head = ET.SubElement(new_root, head.tag, attrib=head.attrib)
-            # Copy children of head, filtering layout regions
-            for child in head:
-                if 'layout' in child.tag.lower():
-                    # This is a layout element, need to filter regions
-                    new_layout = ET.SubElement(new_head, child.tag, attrib=child.attrib)
-                    # Copy only the regions that are used in this segment
-                    for region in child:
-                        if 'region' in region.tag.lower():
-                            region_id = region.get('{http://www.w3.org/XML/1998/namespace}id')
-                            if region_id in used_regions:
-                                new_layout.append(region)
-                        else:
-                            # Not a region element, copy as-is
-                            new_layout.append(region)
-                else:
-                    # Not a layout element, copy as-is
-                    new_head.append(child)
-        else:
-            # Create empty head
-            ET.SubElement(new_root, '{http://www.w3.org/ns/ttml}head')
-        
-        # Create body element
-        body = root.find('.//tt:body', namespaces)
-        if body is None:
-            body = root.find('.//body')
-        
-        body_attrib = body.attrib if body is not None else {}
-        new_body = ET.SubElement(new_root, '{http://www.w3.org/ns/ttml}body', attrib=body_attrib)
-        
-        # Create div element
-        div = body.find('.//tt:div', namespaces) if body is not None else None
-        if div is None and body is not None:
-            div = body.find('.//div')
-        
-        div_attrib = div.attrib if div is not None else {}
-        new_div = ET.SubElement(new_body, '{http://www.w3.org/ns/ttml}div', attrib=div_attrib)
-        
-        # Add cues to div
-        for cue in cues:
-            new_div.append(cue)
-        
-        # Convert to string
-        xml_str = ET.tostring(new_root, encoding='utf-8', xml_declaration=True).decode('utf-8')
-        return xml_str
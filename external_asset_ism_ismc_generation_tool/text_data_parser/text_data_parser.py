@@ -9,6 +9,8 @@ from typing import Tuple, Union, Optional
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
 from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.storage_backend.azure_storage_backend import AzureStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
 from external_asset_ism_ismc_generation_tool.text_data_parser.model.text_data_info import TextDataInfo
 from external_asset_ism_ismc_generation_tool.common.common import Common
 
@@ -23,10 +25,23 @@ class TextDataParser:
 
     @staticmethod
     def get_text_data_info(blob_name: str, az_blob_service_client: AzureBlobServiceClient) -> Optional[TextDataInfo]:
-        TextDataParser.__logger.info(f"Found a subtitle file {blob_name}")
+        return TextDataParser.get_text_data_info_from_storage(blob_name, AzureStorageBackend(az_blob_service_client))
 
+    @staticmethod
+    def get_text_data_info_from_storage(name: str, storage_backend: IStorageBackend) -> Optional[TextDataInfo]:
+        TextDataParser.__logger.info(f"Found a subtitle file {name}")
+
+        try:
+            contents, _ = storage_backend.read_range(name)
+        except Exception as e:
+            TextDataParser.__logger.error(f"Failed to process subtitle file {name}: {e}")
+            TextDataParser.__logger.warning(f"Skipping {name} and continuing with other files")
+            return None
+        return TextDataParser.get_text_data_info_from_contents(name, contents)
+
+    @staticmethod
+    def get_text_data_info_from_contents(blob_name: str, blob_contents: bytes) -> Optional[TextDataInfo]:
         try:
-            blob_contents = az_blob_service_client.download_part_of_blob(blob_name=blob_name)
             blob_contents = blob_contents.decode("utf-8")
 
             if blob_contents.startswith('\ufeff'):
@@ -0,0 +1,137 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from os import cpu_count
+from threading import BoundedSemaphore, Lock
+from typing import Callable, List, Optional, Set, Tuple, TypeVar
+
+from external_asset_ism_ismc_generation_tool.common.common import Common
+from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
+from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
+
+T = TypeVar('T')
+
+
+class VttConversionPool:
+    """
+    Runs the CPU-heavy steps of the VTT to CMFT conversions (ttconv, segmentation and packaging) in at most max_workers worker
+    processes, started when they are first needed and reused for the next conversions. The files are downloaded and uploaded by
+    max_workers threads, each of them waits for the conversion of its file, so that at most max_workers files are held in memory.
+    A conversion which lasts longer than conversion_timeout is stopped with its worker, which is replaced, and fails its file only.
+    """
+    DEFAULT_CONVERSION_TIMEOUT = 300.0
+
+    __logger: ILogger = Logger("VttConversionPool")
+
+    @classmethod
+    def redefine_logger(cls, logger: ILogger):
+        cls.__logger = logger
+
+    def __init__(self, max_workers: int, conversion_timeout: float):
+        self.max_workers = max_workers
+        self.conversion_timeout = conversion_timeout
+        self.worker_slots = BoundedSemaphore(max_workers)
+        self.timed_out_conversions = 0
+        # Workers waiting for a conversion with the parent end of their pipe, a worker is taken out while it converts
+        self.__idle_workers: List[Tuple[multiprocessing.Process, Connection]] = []
+        self.__workers: Set[multiprocessing.Process] = set()
+        self.__lock = Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional['VttConversionPool']:
+        if not settings or not settings.get('is_multithreading', False):
+            return None
+        return cls(Common.get_positive_int_setting(settings, 'max_conversion_workers', cpu_count()),
+                   Common.get_number_setting(settings, 'conversion_timeout', cls.DEFAULT_CONVERSION_TIMEOUT, is_positive=True))
+
+    def run(self, function: Callable[..., T], *args) -> T:
+        """
+        Runs the function in a free worker once one of the max_workers slots is free and waits for its result at most
+        conversion_timeout seconds from the moment the worker got it, the worker is terminated when it lasts longer
+        """
+        with self.worker_slots:
+            worker, connection = self.__get_idle_worker()
+            is_reusable = False
+            try:
+                connection.send((function, args))
+                if not connection.poll(self.conversion_timeout):
+                    with self.__lock:
+                        self.timed_out_conversions += 1
+                    raise ValueError(f"Conversion timed out after {self.conversion_timeout}s")
+                try:
+                    is_success, result = connection.recv()
+                except EOFError:
+                    worker.join()
+                    raise ValueError(f"Conversion worker exited with code {worker.exitcode}")
+                is_reusable = True
+                if not is_success:
+                    raise result
+                return result
+            finally:
+                if is_reusable:
+                    with self.__lock:
+                        self.__idle_workers.append((worker, connection))
+                else:
+                    self.__stop_worker(worker, connection)
+
+    def shutdown(self) -> None:
+        """ Stops the idle workers and terminates the conversions still running, e.g. when the threads waiting for them were interrupted """
+        with self.__lock:
+            idle_workers, self.__idle_workers = self.__idle_workers, []
+            busy_workers = self.__workers.difference(worker for worker, _ in idle_workers)
+            self.__workers.clear()
+        for worker in busy_workers:
+            worker.terminate()
+        for worker, connection in idle_workers:
+            try:
+                connection.send(None)
+            except OSError:
+                worker.terminate()
+            worker.join()
+            connection.close()
+        if self.timed_out_conversions:
+            VttConversionPool.__logger.warning(f"{self.timed_out_conversions} conversion(s) timed out and their workers were replaced")
+
+    def __get_idle_worker(self) -> Tuple[multiprocessing.Process, Connection]:
+        """ Takes an idle worker, a new one is started when none is idle, which the worker slots keep below max_workers """
+        with self.__lock:
+            if self.__idle_workers:
+                return self.__idle_workers.pop()
+        connection, worker_connection = multiprocessing.Pipe()
+        worker = multiprocessing.Process(target=VttConversionPool._run_worker, args=(worker_connection,), daemon=True)
+        worker.start()
+        # The worker holds the only other end, so that the connection gets EOF if it exits
+        worker_connection.close()
+        with self.__lock:
+            self.__workers.add(worker)
+        return worker, connection
+
+    def __stop_worker(self, worker: multiprocessing.Process, connection: Connection) -> None:
+        worker.terminate()
+        worker.join()
+        connection.close()
+        with self.__lock:
+            self.__workers.discard(worker)
+
+    @staticmethod
+    def _run_worker(connection: Connection) -> None:
+        """ Entry point of a worker process, runs the functions it receives until None and sends whether each succeeded and its result or error """
+        try:
+            while True:
+                try:
+                    task = connection.recv()
+                except EOFError:
+                    return
+                if task is None:
+                    return
+                function, args = task
+                try:
+                    result = (True, function(*args))
+                except Exception as e:
+                    result = (False, e)
+                try:
+                    connection.send(result)
+                except Exception as e:
+                    # The error of the function may not be picklable
+                    connection.send((False, ValueError(f"{type(result[1]).__name__}: {result[1]}" if not result[0] else f"Cannot send the conversion result: {e}")))
+        finally:
+            connection.close()
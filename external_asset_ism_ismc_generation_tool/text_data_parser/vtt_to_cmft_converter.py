@@ -1,15 +1,18 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 from external_asset_ism_ismc_generation_tool.common.logger.i_logger import ILogger
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
-from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
 from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_to_imsc1_converter import VttToImsc1Converter
 from external_asset_ism_ismc_generation_tool.text_data_parser.imsc1_segmenter import Imsc1Segmenter
 from external_asset_ism_ismc_generation_tool.text_data_parser.cmft_packager import CmftPackager
 from external_asset_ism_ismc_generation_tool.text_data_parser.model.conversion_summary import ConversionSummary
+from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_conversion_pool import VttConversionPool
 
 from external_asset_ism_ismc_generation_tool.common.common import Common
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_format import MediaFormat
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
 
 
 class VttToCmftConverter:
@@ -22,12 +25,17 @@ class VttToCmftConverter:
         cls.__logger = logger
 
     @staticmethod
-    def convert_vtt_files_in_container(az_blob_service_client: AzureBlobServiceClient) -> ConversionSummary:
+    def convert_vtt_files_in_container(storage_backend: IStorageBackend, segmentation_policy: Optional[SegmentationPolicy] = None,
+                                       is_streaming: bool = False, conversion_pool: Optional[VttConversionPool] = None) -> ConversionSummary:
         """
-        Find and convert all WebVTT files in the Azure container to CMFT format.
+        Find and convert all WebVTT files in the storage (Azure container, local directory, ...) to CMFT format.
         
         Args:
-            az_blob_service_client: Azure blob service client
+            storage_backend: Storage backend holding the asset
+            segmentation_policy: Policy giving the text segment duration, the default policy when not set
+            is_streaming: Write every CMFT file fragment by fragment as its segments are created, see convert_vtt_to_cmft
+            conversion_pool: Pool converting several files at a time in worker processes, files are converted one by one when not set.
+                The CMFT files converted in the pool are uploaded at once, is_streaming applies to the conversions one by one
             
         Returns:
             ConversionSummary with results for all files
@@ -36,7 +44,7 @@ class VttToCmftConverter:
         
         try:
             # Get list of all blobs
-            blobs = az_blob_service_client.get_list_of_blobs()
+            blobs = storage_backend.list()
             if not blobs:
                 VttToCmftConverter.__logger.warning("No blobs found in container")
                 return ConversionSummary()
@@ -60,24 +68,25 @@ class VttToCmftConverter:
             
             VttToCmftConverter.__logger.info(f"Found {len(vtt_files)} VTT file(s): {vtt_files}")
             
-            # Use fixed segment duration as per specification
-            segment_duration = 4.0
+            segment_duration = (segmentation_policy or SegmentationPolicy()).text_target_duration
             
             VttToCmftConverter.__logger.info(f"Using segment duration: {segment_duration}s")
             
-            # Convert each VTT file
-            for vtt_filename in vtt_files:
-                try:
-                    warnings = VttToCmftConverter.convert_vtt_to_cmft(
-                        vtt_filename,
-                        az_blob_service_client,
-                        segment_duration
-                    )
-                    summary.add_success(vtt_filename, warnings)
-                except Exception as e:
-                    error_msg = str(e).replace(f"Failed to convert {vtt_filename} to CMFT: ", "")
-                    VttToCmftConverter.__logger.error(f"Failed to convert {vtt_filename}: {error_msg}")
-                    summary.add_failure(vtt_filename, error_msg)
+            if conversion_pool is not None and len(vtt_files) > 1:
+                VttToCmftConverter.__convert_vtt_files_in_pool(vtt_files, storage_backend, segment_duration, conversion_pool, summary)
+            else:
+                # Convert each VTT file
+                for vtt_filename in vtt_files:
+                    try:
+                        warnings = VttToCmftConverter.convert_vtt_to_cmft(
+                            vtt_filename,
+                            storage_backend,
+                            segment_duration,
+                            is_streaming
+                        )
+                        summary.add_success(vtt_filename, warnings)
+                    except Exception as e:
+                        VttToCmftConverter.__add_failure(summary, vtt_filename, e)
             
             VttToCmftConverter.__logger.info(f"Successfully converted {summary.successful}/{summary.total} VTT file(s) to CMFT")
             return summary
@@ -86,19 +95,62 @@ class VttToCmftConverter:
             VttToCmftConverter.__logger.error(f"Error in VTT to CMFT conversion process: {e}")
             raise
 
+    @staticmethod
+    def __convert_vtt_files_in_pool(vtt_files: List[str], storage_backend: IStorageBackend, segment_duration: float,
+                                    conversion_pool: VttConversionPool, summary: ConversionSummary) -> None:
+        """ Converts the files concurrently, every file is converted in isolation and its result is added to the summary in the order of the files """
+        VttToCmftConverter.__logger.info(f"Converting {len(vtt_files)} VTT file(s) with {conversion_pool.max_workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=conversion_pool.max_workers) as executor:
+            tasks = [executor.submit(VttToCmftConverter.__convert_vtt_to_cmft_in_pool, vtt_filename, storage_backend, segment_duration, conversion_pool)
+                     for vtt_filename in vtt_files]
+            for vtt_filename, task in zip(vtt_files, tasks):
+                try:
+                    summary.add_success(vtt_filename, task.result())
+                except Exception as e:
+                    VttToCmftConverter.__add_failure(summary, vtt_filename, e)
+
+    @staticmethod
+    def __convert_vtt_to_cmft_in_pool(vtt_filename: str, storage_backend: IStorageBackend, segment_duration: float,
+                                      conversion_pool: VttConversionPool) -> List[str]:
+        """ Downloads and uploads a file in the calling thread, the file is converted in a worker process of the pool """
+        VttToCmftConverter.__logger.info(f"Converting {vtt_filename} to CMFT in a worker process")
+        
+        try:
+            vtt_data, _ = storage_backend.read_range(vtt_filename)
+            cmft_data, warnings = conversion_pool.run(VttToCmftConverter.create_cmft, vtt_filename, vtt_data, segment_duration)
+            
+            cmft_filename = VttToCmftConverter.get_cmft_filename(vtt_filename)
+            storage_backend.write(cmft_filename, cmft_data, overwrite=True)
+            VttToCmftConverter.__logger.info(f"Uploaded {cmft_filename} ({len(cmft_data)} bytes) to the {storage_backend.location}")
+            
+            return warnings
+            
+        except Exception as e:
+            VttToCmftConverter.__logger.error(f"Error converting {vtt_filename} to CMFT: {e}")
+            raise ValueError(f"Failed to convert {vtt_filename} to CMFT: {e}")
+
+    @staticmethod
+    def __add_failure(summary: ConversionSummary, vtt_filename: str, error: Exception) -> None:
+        error_msg = str(error).replace(f"Failed to convert {vtt_filename} to CMFT: ", "")
+        VttToCmftConverter.__logger.error(f"Failed to convert {vtt_filename}: {error_msg}")
+        summary.add_failure(vtt_filename, error_msg)
+
     @staticmethod
     def convert_vtt_to_cmft(
         vtt_filename: str,
-        az_blob_service_client: AzureBlobServiceClient,
-        segment_duration: float
+        storage_backend: IStorageBackend,
+        segment_duration: float,
+        is_streaming: bool = False
     ) -> List[str]:
         """
         Convert a single WebVTT file to CMFT format.
         
         Args:
             vtt_filename: Name of the VTT file in the container
-            az_blob_service_client: Azure blob service client
+            storage_backend: Storage backend holding the asset
             segment_duration: Duration of each segment in seconds
+            is_streaming: Create the segments lazily and write the CMFT fragment by fragment through a writer of the storage
+                (staged blocks for Azure, a file for local directories), so that the CMFT is never held in memory
             
         Returns:
             List of warning messages from sanitization
@@ -107,52 +159,88 @@ class VttToCmftConverter:
         
         try:
             # 1. Download VTT content
-            vtt_content = az_blob_service_client.download_part_of_blob(blob_name=vtt_filename)
-            vtt_content = vtt_content.decode("utf-8")
-            
-            # Remove BOM if present
-            if vtt_content.startswith('\ufeff'):
-                vtt_content = vtt_content[1:]
-            
-            VttToCmftConverter.__logger.info(f"Downloaded VTT file: {len(vtt_content)} bytes")
-            
-            # Extract language code from filename
-            language_code = Common.extract_language_from_filename(vtt_filename)
-            VttToCmftConverter.__logger.info(f"Language code for IMSC1: {language_code}")
-            
-            # 2. Convert VTT to IMSC1
-            imsc1_content, warnings = VttToImsc1Converter.convert(vtt_content, language_code)
-            VttToCmftConverter.__logger.info("Converted VTT to IMSC1")
-            
-            # 3. Segment IMSC1
-            segments = Imsc1Segmenter.segment(imsc1_content, segment_duration)
-            VttToCmftConverter.__logger.info(f"Segmented IMSC1 into {len(segments)} segments")
-            
-            if not segments:
-                VttToCmftConverter.__logger.warning("No segments created - empty subtitle file?")
-                raise ValueError("No segments created from VTT file")
-            
-            # Calculate total duration from segments
-            if segments:
-                last_start, _ = segments[-1]
-                total_duration = last_start + segment_duration
-            else:
-                total_duration = 0.0
-            
-            # 4. Package into CMFT
-            cmft_data = CmftPackager.package(segments, timescale=10000000, total_duration=total_duration, language_code=language_code)
-            VttToCmftConverter.__logger.info(f"Packaged CMFT: {len(cmft_data)} bytes")
+            vtt_data, _ = storage_backend.read_range(vtt_filename)
             
             # 5. Generate CMFT filename
-            cmft_filename = vtt_filename.rsplit('.', 1)[0] + '.cmft'
-            
-            # 6. Upload to Azure container
-            blob_client = az_blob_service_client.container_client.get_blob_client(cmft_filename)
-            blob_client.upload_blob(cmft_data, overwrite=True)
-            VttToCmftConverter.__logger.info(f"Uploaded {cmft_filename} to container")
+            cmft_filename = VttToCmftConverter.get_cmft_filename(vtt_filename)
+            
+            if is_streaming:
+                # 2. Convert VTT to IMSC1
+                imsc1_content, language_code, warnings = VttToCmftConverter.__convert_to_imsc1(vtt_filename, vtt_data)
+                
+                # 3., 4. and 6. Segment IMSC1 and upload every fragment as soon as it is packaged
+                segments = Imsc1Segmenter.iter_segments(imsc1_content, segment_duration)
+                header_size = CmftPackager.get_header_size(timescale=10000000, language_code=language_code)
+                with storage_backend.open_writer(cmft_filename, header_size, overwrite=True) as cmft_writer:
+                    cmft_size = CmftPackager.write_stream(segments, cmft_writer, segment_duration, timescale=10000000, language_code=language_code)
+                VttToCmftConverter.__logger.info(f"Packaged and uploaded {cmft_filename} ({cmft_size} bytes) to the {storage_backend.location}")
+                return warnings
+            
+            # 2., 3. and 4. Convert VTT to IMSC1, segment and package it into CMFT
+            cmft_data, warnings = VttToCmftConverter.create_cmft(vtt_filename, vtt_data, segment_duration)
+            
+            # 6. Upload to the storage
+            storage_backend.write(cmft_filename, cmft_data, overwrite=True)
+            VttToCmftConverter.__logger.info(f"Uploaded {cmft_filename} to the {storage_backend.location}")
             
             return warnings
             
         except Exception as e:
             VttToCmftConverter.__logger.error(f"Error converting {vtt_filename} to CMFT: {e}")
             raise ValueError(f"Failed to convert {vtt_filename} to CMFT: {e}")
+
+    @staticmethod
+    def create_cmft(vtt_filename: str, vtt_data: bytes, segment_duration: float) -> Tuple[bytes, List[str]]:
+        """
+        Convert the content of a WebVTT file to CMFT format without any storage access, e.g. in a worker process.
+        
+        Args:
+            vtt_filename: Name of the VTT file, the language code is extracted from it
+            vtt_data: Content of the VTT file
+            segment_duration: Duration of each segment in seconds
+            
+        Returns:
+            Tuple of the CMFT file content and the list of warning messages from sanitization
+        """
+        # 2. Convert VTT to IMSC1
+        imsc1_content, language_code, warnings = VttToCmftConverter.__convert_to_imsc1(vtt_filename, vtt_data)
+        
+        # 3. Segment IMSC1
+        segments = Imsc1Segmenter.segment(imsc1_content, segment_duration)
+        VttToCmftConverter.__logger.info(f"Segmented IMSC1 into {len(segments)} segments")
+        
+        if not segments:
+            VttToCmftConverter.__logger.warning("No segments created - empty subtitle file?")
+            raise ValueError("No segments created from VTT file")
+        
+        # Calculate total duration from segments
+        last_start, _ = segments[-1]
+        total_duration = last_start + segment_duration
+        
+        # 4. Package into CMFT
+        cmft_data = CmftPackager.package(segments, timescale=10000000, total_duration=total_duration, language_code=language_code)
+        VttToCmftConverter.__logger.info(f"Packaged CMFT: {len(cmft_data)} bytes")
+        return cmft_data, warnings
+
+    @staticmethod
+    def get_cmft_filename(vtt_filename: str) -> str:
+        return vtt_filename.rsplit('.', 1)[0] + '.cmft'
+
+    @staticmethod
+    def __convert_to_imsc1(vtt_filename: str, vtt_data: bytes) -> Tuple[str, str, List[str]]:
+        """ Returns the IMSC1 content, the language code and the sanitization warnings of the content of a VTT file """
+        vtt_content = vtt_data.decode("utf-8")
+        
+        # Remove BOM if present
+        if vtt_content.startswith('\ufeff'):
+            vtt_content = vtt_content[1:]
+        
+        VttToCmftConverter.__logger.info(f"Downloaded VTT file: {len(vtt_content)} bytes")
+        
+        # Extract language code from filename
+        language_code = Common.extract_language_from_filename(vtt_filename)
+        VttToCmftConverter.__logger.info(f"Language code for IMSC1: {language_code}")
+        
+        imsc1_content, warnings = VttToImsc1Converter.convert(vtt_content, language_code)
+        VttToCmftConverter.__logger.info("Converted VTT to IMSC1")
+        return imsc1_content, language_code, warnings
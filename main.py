@@ -1,8 +1,15 @@
+from contextlib import ExitStack
+from typing import Callable, TextIO
+
 from external_asset_ism_ismc_generation_tool.common.common import Common
 from external_asset_ism_ismc_generation_tool.common.logger.logger import Logger
 from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
 from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
 from external_asset_ism_ismc_generation_tool.blob_data_handler.blob_data_handler import BlobDataHandler
+from external_asset_ism_ismc_generation_tool.blob_data_handler.async_blob_data_handler import AsyncBlobDataHandler
+from external_asset_ism_ismc_generation_tool.blob_data_handler.storage_data_handler import StorageDataHandler
 from external_asset_ism_ismc_generation_tool.mss_client_manifest.ismc_generator import IsmcGenerator
 from external_asset_ism_ismc_generation_tool.mss_server_manifest.ism_generator import IsmGenerator
 from external_asset_ism_ismc_generation_tool.settings_parser.cli_arguments_parser import CliArgumentsParser
@@ -11,36 +18,51 @@ from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_cli
 from external_asset_ism_ismc_generation_tool.blob_data_handler.model.blob_media_data import BlobMediaData
 from external_asset_ism_ismc_generation_tool.local_file_client.local_file_service_client import LocalFileServiceClient
 from external_asset_ism_ismc_generation_tool.local_data_handler.local_data_handler import LocalDataHandler
+from external_asset_ism_ismc_generation_tool.storage_backend.i_storage_backend import IStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.azure_storage_backend import AzureStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.local_storage_backend import LocalStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.local_storage_writer import LocalStorageWriter
+from external_asset_ism_ismc_generation_tool.storage_backend.s3_storage_backend import S3StorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.storage_writer_stream import StorageWriterStream
+from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_conversion_pool import VttConversionPool
 from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_to_cmft_converter import VttToCmftConverter
 from external_asset_ism_ismc_generation_tool.text_data_parser.model.conversion_summary import ConversionSummary, ProcessingSummary, ManifestResult
 
-def convert_vtt_to_cmft(settings: dict, use_local: bool = False) -> ConversionSummary:
+def convert_vtt_to_cmft(settings: dict, use_local: bool = False, use_s3: bool = False) -> ConversionSummary:
     """
-    Convert WebVTT files found in the Azure container to CMFT files.
+    Convert WebVTT files found in the Azure container, local directory or S3 bucket to CMFT files.
     This must be called before generate_manifests() so that the CMFT files
     are available for manifest generation.
     
     Args:
         settings: Configuration settings including Azure connection info
         use_local: Whether to use local directory mode
+        use_s3: Whether to use S3-compatible storage mode
         
     Returns:
         ConversionSummary with results
     """
     logger: Logger = Logger("main")
+    conversion_pool = None
     
     try:
         logger.info("Starting VTT to CMFT conversion process")
+        segmentation_policy = SegmentationPolicy.from_settings(settings)
+        is_streaming = settings.get('is_streaming_cmft', False)
+        conversion_pool = VttConversionPool.from_settings(settings)
         
         if use_local:
             logger.info("Using local directory mode")
             local_file_service_client: LocalFileServiceClient = LocalFileServiceClient(settings)
-            summary = VttToCmftConverter.convert_vtt_files_in_container(local_file_service_client)
+            summary = VttToCmftConverter.convert_vtt_files_in_container(LocalStorageBackend(local_file_service_client), segmentation_policy, is_streaming, conversion_pool)
+        elif use_s3:
+            logger.info("Using S3 mode")
+            summary = VttToCmftConverter.convert_vtt_files_in_container(S3StorageBackend(settings), segmentation_policy, is_streaming, conversion_pool)
         else:
             logger.info("Using Azure mode")
             # Convert all VTT files in the container to CMFT
             az_blob_service_client: AzureBlobServiceClient = AzureBlobServiceClient(settings)
-            summary = VttToCmftConverter.convert_vtt_files_in_container(az_blob_service_client)
+            summary = VttToCmftConverter.convert_vtt_files_in_container(AzureStorageBackend(az_blob_service_client), segmentation_policy, is_streaming, conversion_pool)
 
         if summary.total > 0:
             logger.info(f"VTT conversion completed: {summary.successful}/{summary.total} successful")
@@ -53,6 +75,28 @@ def convert_vtt_to_cmft(settings: dict, use_local: bool = False) -> ConversionSu
         logger.error(f"Error during VTT to CMFT conversion: {e}")
         # Return empty summary on error
         return ConversionSummary()
+    
+    finally:
+        if conversion_pool:
+            conversion_pool.shutdown()
+
+def write_manifest(storage_backend: IStorageBackend, manifest_name: str, write: Callable[[TextIO], None], overwrite: bool = False, local_copy: bool = False):
+    """
+    Stream a manifest to the storage while it is generated, the storage object is created once the whole manifest is written.
+    
+    Args:
+        storage_backend: Storage the manifest is written to
+        manifest_name: Name of the manifest in the storage
+        write: Function writing the manifest to a text sink, e.g. IsmGenerator.write
+        overwrite: Whether an existing manifest is replaced
+        local_copy: Whether the manifest is also written to the working directory
+    """
+    with ExitStack() as writers:
+        storage_writers = [writers.enter_context(storage_backend.open_writer(manifest_name, overwrite=overwrite))]
+        if local_copy:
+            storage_writers.append(writers.enter_context(LocalStorageWriter(manifest_name, 0)))
+        with StorageWriterStream.open_text(storage_writers) as sink:
+            write(sink)
 
 def generate_manifests_azure_use(settings: dict) -> ManifestResult:
     """
@@ -68,9 +112,19 @@ def generate_manifests_azure_use(settings: dict) -> ManifestResult:
     logger.info("Starting manifest generation process")
     
     az_blob_service_client: AzureBlobServiceClient = AzureBlobServiceClient(settings)
+    storage_backend: AzureStorageBackend = AzureStorageBackend(az_blob_service_client)
 
-    blob_media_data: BlobMediaData = BlobDataHandler.get_data_from_blobs(az_blob_service_client, settings)
-    media_data: MediaData = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas, settings.get('is_multithreading', False))
+    media_cache = ParsedMediaCache.from_settings(settings)
+    try:
+        if settings.get('is_async', False):
+            blob_media_data: BlobMediaData = AsyncBlobDataHandler.get_data_from_blobs(settings, media_cache)
+        else:
+            blob_media_data: BlobMediaData = BlobDataHandler.get_data_from_blobs(az_blob_service_client, settings, media_cache)
+        media_data: MediaData = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas, settings.get('is_multithreading', False), media_cache,
+                                                               SegmentationPolicy.from_settings(settings))
+    finally:
+        if media_cache:
+            media_cache.close()
 
     result = ManifestResult(manifest_name=blob_media_data.manifest_name)
     
@@ -85,14 +139,11 @@ def generate_manifests_azure_use(settings: dict) -> ManifestResult:
     audios = IsmGenerator.get_audios(media_track_infos=media_data.media_track_info_list)
     videos = IsmGenerator.get_videos(media_track_infos=media_data.media_track_info_list)
     text_streams = IsmGenerator.get_text_streams(media_data.media_track_info_list, blob_media_data.text_data_info_list)
-    ism_xml_string = IsmGenerator.generate(blob_media_data.manifest_name, audios=audios, videos=videos, text_streams=text_streams)
-
-    # Create local copy of ISM file
-    if (settings.get('local_copy', False)):
-        with open(server_manifest_name, 'wb') as f:
-            f.write(ism_xml_string.encode('utf-8'))
 
-    az_blob_service_client.upload_blob_to_container(server_manifest_name, ism_xml_string, overwrite=False)
+    # Upload the ISM file while it is generated, with a local copy if requested
+    write_manifest(storage_backend, server_manifest_name,
+                   lambda sink: IsmGenerator.write(sink, blob_media_data.manifest_name, audios=audios, videos=videos, text_streams=text_streams),
+                   local_copy=settings.get('local_copy', False))
     logger.info(f"{server_manifest_name} is created and stored to the {az_blob_service_client.container_client.container_name} container")
     result.ism_created = True
 
@@ -104,14 +155,10 @@ def generate_manifests_azure_use(settings: dict) -> ManifestResult:
         client_manifest_name = f'{blob_media_data.manifest_name}_new.ismc'
         logger.info(f"Existing manifest found, generating new manifest as {client_manifest_name}")
     
-    ismc_xml_string = IsmcGenerator.generate(duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list, text_data_info_list=blob_media_data.text_data_info_list)
-
-    # Create local copy of ISMC file
-    if (settings.get('local_copy', False)):
-        with open(client_manifest_name, 'wb') as f:
-            f.write(ismc_xml_string.encode('utf-8'))
-
-    az_blob_service_client.upload_blob_to_container(client_manifest_name, ismc_xml_string, overwrite=False)
+    # Upload the ISMC file while it is generated, with a local copy if requested
+    write_manifest(storage_backend, client_manifest_name,
+                   lambda sink: IsmcGenerator.write(sink, duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list, text_data_info_list=blob_media_data.text_data_info_list),
+                   local_copy=settings.get('local_copy', False))
     logger.info(f"{client_manifest_name} is created and stored to the {az_blob_service_client.container_client.container_name} container")
 
     result.ismc_created = True
@@ -133,9 +180,15 @@ def generate_manifests_local_use(settings: dict) -> ManifestResult:
 
     logger.info("Using local directory mode")
     local_file_service_client: LocalFileServiceClient = LocalFileServiceClient(settings)
-    blob_media_data: BlobMediaData = LocalDataHandler.get_data_from_local_files(local_file_service_client)
-    
-    media_data: MediaData = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas, settings.get('is_multithreading', False))
+    storage_backend: LocalStorageBackend = LocalStorageBackend(local_file_service_client)
+    media_cache = ParsedMediaCache.from_settings(settings)
+    try:
+        blob_media_data: BlobMediaData = LocalDataHandler.get_data_from_local_files(local_file_service_client, settings, media_cache)
+        media_data: MediaData = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas, settings.get('is_multithreading', False), media_cache,
+                                                               SegmentationPolicy.from_settings(settings))
+    finally:
+        if media_cache:
+            media_cache.close()
 
     result = ManifestResult(manifest_name=blob_media_data.manifest_name)
     
@@ -145,9 +198,9 @@ def generate_manifests_local_use(settings: dict) -> ManifestResult:
     audios = IsmGenerator.get_audios(media_track_infos=media_data.media_track_info_list)
     videos = IsmGenerator.get_videos(media_track_infos=media_data.media_track_info_list)
     text_streams = IsmGenerator.get_text_streams(media_data.media_track_info_list, blob_media_data.text_data_info_list)
-    ism_xml_string = IsmGenerator.generate(blob_media_data.manifest_name, audios=audios, videos=videos, text_streams=text_streams)
-    
-    local_file_service_client.write_file(server_manifest_name, ism_xml_string)
+    write_manifest(storage_backend, server_manifest_name,
+                   lambda sink: IsmGenerator.write(sink, blob_media_data.manifest_name, audios=audios, videos=videos, text_streams=text_streams),
+                   overwrite=True)
     logger.info(f"{server_manifest_name} is created and stored to the {local_file_service_client.local_directory} directory")
 
     result.ism_created = True
@@ -157,8 +210,9 @@ def generate_manifests_local_use(settings: dict) -> ManifestResult:
     client_manifest_name = f'{blob_media_data.manifest_name}.ismc'
     logger.info(f"Generating client manifest: {client_manifest_name}")
 
-    ismc_xml_string = IsmcGenerator.generate(duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list, text_data_info_list=blob_media_data.text_data_info_list)
-    local_file_service_client.write_file(client_manifest_name, ismc_xml_string)
+    write_manifest(storage_backend, client_manifest_name,
+                   lambda sink: IsmcGenerator.write(sink, duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list, text_data_info_list=blob_media_data.text_data_info_list),
+                   overwrite=True)
     logger.info(f"{client_manifest_name} is created and stored to the {local_file_service_client.local_directory} directory")
 
     result.ismc_created = True
@@ -166,12 +220,68 @@ def generate_manifests_local_use(settings: dict) -> ManifestResult:
 
     return result
 
+def generate_manifests_s3_use(settings: dict) -> ManifestResult:
+    """
+    Generate and upload server and client manifests (.ism and .ismc) to an S3-compatible bucket.
+    
+    Args:
+        settings: Configuration settings including the S3 bucket settings
+        
+    Returns:
+        ManifestResult with generation status
+    """
+    logger: Logger = Logger("main")
+    logger.info("Starting manifest generation process")
+
+    logger.info("Using S3 mode")
+    storage_backend: S3StorageBackend = S3StorageBackend(settings)
+    media_cache = ParsedMediaCache.from_settings(settings)
+    try:
+        blob_media_data: BlobMediaData = StorageDataHandler.get_data_from_storage(storage_backend, settings, media_cache)
+        media_data: MediaData = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas, settings.get('is_multithreading', False), media_cache,
+                                                               SegmentationPolicy.from_settings(settings))
+    finally:
+        if media_cache:
+            media_cache.close()
+
+    result = ManifestResult(manifest_name=blob_media_data.manifest_name)
+
+    # Generate and upload server manifest (.ism), existing manifests are kept and new ones get the '_new' suffix
+    server_manifest_name = f'{blob_media_data.manifest_name}.ism'
+    if storage_backend.exists(server_manifest_name):
+        server_manifest_name = f'{blob_media_data.manifest_name}_new.ism'
+        logger.info(f"Existing manifest found, generating new manifest as {server_manifest_name}")
+
+    audios = IsmGenerator.get_audios(media_track_infos=media_data.media_track_info_list)
+    videos = IsmGenerator.get_videos(media_track_infos=media_data.media_track_info_list)
+    text_streams = IsmGenerator.get_text_streams(media_data.media_track_info_list, blob_media_data.text_data_info_list)
+    write_manifest(storage_backend, server_manifest_name,
+                   lambda sink: IsmGenerator.write(sink, blob_media_data.manifest_name, audios=audios, videos=videos, text_streams=text_streams))
+    logger.info(f"{server_manifest_name} is created and stored to the {storage_backend.location}")
+    result.ism_created = True
+    result.ism_filename = server_manifest_name
+
+    # Generate and upload client manifest (.ismc)
+    client_manifest_name = f'{blob_media_data.manifest_name}.ismc'
+    if storage_backend.exists(client_manifest_name):
+        client_manifest_name = f'{blob_media_data.manifest_name}_new.ismc'
+        logger.info(f"Existing manifest found, generating new manifest as {client_manifest_name}")
+
+    write_manifest(storage_backend, client_manifest_name,
+                   lambda sink: IsmcGenerator.write(sink, duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list, text_data_info_list=blob_media_data.text_data_info_list))
+    logger.info(f"{client_manifest_name} is created and stored to the {storage_backend.location}")
+    result.ismc_created = True
+    result.ismc_filename = client_manifest_name
+
+    return result
+
 if __name__ == '__main__':
     settings_from_cli_arguments = CliArgumentsParser.parse()
     settings_from_config_file = ConfigFileParser.parse()
     settings = Common.merge_dicts([settings_from_config_file, settings_from_cli_arguments])
 
     use_local = 'local_directory' in settings and settings['local_directory'] is not None
+    use_s3 = not use_local and settings.get('s3_bucket') is not None
     
     # Create overall summary
     overall_summary = ProcessingSummary()
@@ -179,11 +289,13 @@ if __name__ == '__main__':
     # Convert VTT files to CMFT before manifest generation if configured
     # Default to False if not specified to maintain backward compatibility
     if settings.get('convert_webvtt', False):
-        conversion_summary = convert_vtt_to_cmft(settings, use_local=use_local)
+        conversion_summary = convert_vtt_to_cmft(settings, use_local=use_local, use_s3=use_s3)
         overall_summary.conversion_summary = conversion_summary
     
     if use_local:
         manifest_result = generate_manifests_local_use(settings)
+    elif use_s3:
+        manifest_result = generate_manifests_s3_use(settings)
     else:   
         manifest_result = generate_manifests_azure_use(settings)
     
@@ -5,11 +5,16 @@ This module tests that appropriate error messages are logged when
 malformed or invalid files are processed, and that sanitization reports fixed issues.
 """
 
+import multiprocessing
+import os
+import time
+
 import pytest
 import xml.etree.ElementTree as ET
 from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_to_imsc1_converter import VttToImsc1Converter
 from external_asset_ism_ismc_generation_tool.text_data_parser.imsc1_segmenter import Imsc1Segmenter
 from external_asset_ism_ismc_generation_tool.text_data_parser.cmft_packager import CmftPackager
+from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_conversion_pool import VttConversionPool
 
 
 def test_empty_vtt_error():
@@ -209,6 +214,39 @@ Text with <invalid> and </bad> and <wrong> tags
     print("✓ Multiple HTML issues all fixed")
 
 
+def test_conversion_pool_timeout():
+    """Test that a conversion lasting longer than the timeout fails alone, its worker is replaced and the other workers are reused."""
+    assert VttConversionPool.from_settings({}) is None
+    with pytest.raises(ValueError, match="max_conversion_workers"):
+        VttConversionPool.from_settings({'is_multithreading': True, 'max_conversion_workers': 0})
+    with pytest.raises(ValueError, match="conversion_timeout"):
+        VttConversionPool.from_settings({'is_multithreading': True, 'conversion_timeout': -1})
+    
+    conversion_pool = VttConversionPool.from_settings({'is_multithreading': True, 'max_conversion_workers': 1, 'conversion_timeout': 0.5})
+    try:
+        # The worker is started for the first conversion and reused for the next ones, also after a failed conversion
+        worker_pid = conversion_pool.run(os.getpid)
+        with pytest.raises(ValueError, match="invalid literal"):
+            conversion_pool.run(int, 'not a number')
+        assert conversion_pool.run(os.getpid) == worker_pid
+        assert [process.pid for process in multiprocessing.active_children()] == [worker_pid]
+        
+        start_time = time.monotonic()
+        with pytest.raises(ValueError) as exc_info:
+            conversion_pool.run(time.sleep, 5)
+        assert "timed out after 0.5s" in str(exc_info.value)
+        assert conversion_pool.timed_out_conversions == 1
+        
+        # The timed out worker is terminated and replaced, so that the next file gets its slot and its own timeout right away
+        assert conversion_pool.run(abs, -1) == 1
+        assert time.monotonic() - start_time < 3
+        assert conversion_pool.run(os.getpid) != worker_pid
+        assert len(multiprocessing.active_children()) == 1
+    finally:
+        conversion_pool.shutdown()
+    assert not multiprocessing.active_children()
+
+
 if __name__ == '__main__':
     print("Running error handling tests...\n")
     
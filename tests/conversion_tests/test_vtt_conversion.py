@@ -11,6 +11,8 @@ import xml.etree.ElementTree as ET
 from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_to_imsc1_converter import VttToImsc1Converter
 from external_asset_ism_ismc_generation_tool.text_data_parser.imsc1_segmenter import Imsc1Segmenter
 from external_asset_ism_ismc_generation_tool.text_data_parser.cmft_packager import CmftPackager
+from external_asset_ism_ismc_generation_tool.media_data_parser.mfra_index_reader import MfraIndexReader
+from external_asset_ism_ismc_generation_tool.media_data_parser.moof_fragment_decoder import MoofFragmentDecoder
 from tests.test_utils.common.common import Common
 
 
@@ -338,6 +340,79 @@ def test_imsc1_segmentation():
     print(f"✓ IMSC1 segmentation successful: {len(segments)} segments created")
 
 
+def test_imsc1_segmentation_of_overlapping_cues():
+    """Test that cues out of order and spanning several segments are clipped to every segment they overlap, in document order."""
+    imsc1_content = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<tt xmlns="http://www.w3.org/ns/ttml" xml:lang="en"><head/><body><div>'
+        '<p begin="00:00:05.000" end="00:00:06.000">second</p>'
+        '<p begin="00:00:01.000" end="00:00:09.500">long</p>'
+        '<p begin="00:00:03.000" end="00:00:04.000">first</p>'
+        '<p begin="00:00:08.000" end="00:00:10.000">last</p>'
+        '</div></body></tt>'
+    )
+    
+    segments = Imsc1Segmenter.segment(imsc1_content, 4.0)
+    
+    namespaces = {'tt': 'http://www.w3.org/ns/ttml'}
+    segment_cues = [(start_time, [(p.text, p.get('begin'), p.get('end')) for p in ET.fromstring(segment_xml).iterfind('.//tt:p', namespaces)])
+                    for start_time, segment_xml in segments]
+    assert segment_cues == [
+        (0.0, [('long', '00:00:01.000', '00:00:04.000'), ('first', '00:00:03.000', '00:00:04.000')]),
+        (4.0, [('second', '00:00:05.000', '00:00:06.000'), ('long', '00:00:04.000', '00:00:08.000')]),
+        (8.0, [('long', '00:00:08.000', '00:00:09.500'), ('last', '00:00:08.000', '00:00:10.000')]),
+    ]
+
+
+def test_imsc1_segment_regions_and_namespaces():
+    """Test that segment documents written from templates keep only the regions of their cues and declare the namespaces of their cues."""
+    imsc1_content = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling" xml:lang="en">'
+        '<head><layout><region xml:id="r1" tts:origin="10% 10%"/><region xml:id="r2" tts:origin="20% 20%"/></layout></head><body><div>'
+        '<p begin="00:00:00.000" end="00:00:01.000" region="r1">a &amp; b</p>'
+        '<p begin="00:00:04.000" end="00:00:05.000" region="r2"><span tts:color="red">c</span><br/>d</p>'
+        '<p begin="00:00:08.000" end="00:00:09.000" region="r1"><span xmlns:foo="urn:foo" foo:bar="1">e</span></p>'
+        '<p begin="00:00:12.000" end="00:00:13.000" region="r1">f</p>'
+        '</div></body></tt>'
+    )
+    
+    segments = Imsc1Segmenter.segment(imsc1_content, 4.0)
+    
+    assert len(segments) == 4
+    namespaces = {'tt': 'http://www.w3.org/ns/ttml', 'tts': 'http://www.w3.org/ns/ttml#styling'}
+    region_ids = []
+    for _, segment_xml in segments:
+        segment_root = ET.fromstring(segment_xml)
+        region_ids.append([region.get('{http://www.w3.org/XML/1998/namespace}id') for region in segment_root.iterfind('.//tt:region', namespaces)])
+    assert region_ids == [['r1'], ['r2'], ['r1'], ['r1']]
+    assert segments[0][1].endswith('<body><div><p begin="00:00:00.000" end="00:00:01.000" region="r1">a &amp; b</p></div></body></tt>')
+    assert '<span tts:color="red">c</span><br />d' in segments[1][1]
+    # Cues with namespaces which are not registered are serialized with the whole document
+    assert ET.fromstring(segments[2][1]).find('.//tt:span', namespaces).get('{urn:foo}bar') == '1'
+
+
+def test_cmft_packaging_fragments_and_random_access():
+    """Test that the moof, mdat and mfra boxes written into the preallocated buffer describe every segment."""
+    timescale = 10000000
+    segments = [(0.0, '<tt>first</tt>'), (4.0, '<tt>second é</tt>'), (8.0, '<tt>third</tt>')]
+    total_duration = 11.5
+    
+    cmft_data = CmftPackager.package(segments, timescale=timescale, total_duration=total_duration, language_code='eng')
+    
+    mfra_size = int.from_bytes(cmft_data[-4:], byteorder='big')
+    entries = MfraIndexReader.parse_mfra(cmft_data[-mfra_size:])[1]
+    assert [entry.time for entry in entries] == [0, 4 * timescale, 8 * timescale]
+    for entry, (start_time, segment_xml), end_time in zip(entries, segments, [4.0, 8.0, total_duration]):
+        moof_size = int.from_bytes(cmft_data[entry.moof_offset:entry.moof_offset + 4], byteorder='big')
+        track_fragment = MoofFragmentDecoder.decode(cmft_data[entry.moof_offset:entry.moof_offset + moof_size])[0]
+        assert track_fragment.sample_duration_sum == int((end_time - start_time) * timescale)
+        assert track_fragment.sample_size_sum == len(segment_xml.encode('utf-8'))
+        mdat_offset = entry.moof_offset + moof_size
+        assert cmft_data[mdat_offset + 4:mdat_offset + 8] == b'mdat'
+        assert cmft_data[mdat_offset + 8:mdat_offset + 8 + track_fragment.sample_size_sum] == segment_xml.encode('utf-8')
+
+
 def test_cmft_packaging():
     """Test that segmented IMSC1 can be packaged into CMFT format."""
     # Read asset-test-vtt-syntax_ENG.vtt
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.blob_data_handler.async_blob_data_handler import AsyncBlobDataHandler
+from external_asset_ism_ismc_generation_tool.blob_data_handler.blob_data_handler import BlobDataHandler
+from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.file_processor.async_file_processor import AsyncFileProcessor
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.common.common import Common
+from tests.test_utils.fake_blob_server.fake_blob_server import FakeBlobServer
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+class TestAsyncBlobDataHandler:
+    @staticmethod
+    def __get_container_blobs() -> dict:
+        blobs = Mp4TestFileBuilder.get_fixture_files()
+        with open(Common.get_data_file_path('asset-test-vtt-syntax_ENG.vtt'), 'rb') as vtt_file:
+            blobs['asset-test-vtt-syntax_ENG.vtt'] = vtt_file.read()
+        return blobs
+
+    @title('Test async blob data handler against a fake blob server')
+    @description('Async listing and atom discovery return the same moov/moof atoms and text data as the threaded handler')
+    def test_async_blob_data_handler_matches_sync_handler(self):
+        with Allure.Step("Start fake blob server"):
+            blobs = self.__get_container_blobs()
+            with FakeBlobServer('asset', blobs) as fake_blob_server:
+                with Allure.Step("Get data with async and sync handlers"):
+                    settings = fake_blob_server.get_settings(max_concurrent_requests=4)
+                    async_blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(settings)
+                    sync_blob_media_data = BlobDataHandler.get_data_from_blobs(AzureBlobServiceClient(settings), settings)
+        with Allure.Step("Verify blob media data"):
+            assert async_blob_media_data.manifest_name == sync_blob_media_data.manifest_name == '0128'
+            assert async_blob_media_data.media_datas.keys() == {name for name in blobs if not name.endswith('.vtt')}
+            assert async_blob_media_data.media_datas == sync_blob_media_data.media_datas
+            assert async_blob_media_data.media_index_datas == sync_blob_media_data.media_index_datas
+            assert [text_data_info.to_dict() for text_data_info in async_blob_media_data.text_data_info_list] == \
+                   [text_data_info.to_dict() for text_data_info in sync_blob_media_data.text_data_info_list]
+            assert len(async_blob_media_data.text_data_info_list) == 1
+
+    @title('Test async blob data handler skips unreadable blobs')
+    @description('A blob that is not a valid media file is logged and skipped, the other blobs are still processed')
+    def test_async_blob_data_handler_skips_invalid_blob(self):
+        with Allure.Step("Start fake blob server with an invalid blob"):
+            blobs = self.__get_container_blobs()
+            blobs['broken.ismv'] = b'not an mp4 file'
+            with FakeBlobServer('asset', blobs) as fake_blob_server:
+                async_blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(fake_blob_server.get_settings())
+        with Allure.Step("Verify blob media data"):
+            assert 'broken.ismv' not in async_blob_media_data.media_datas
+            assert len(async_blob_media_data.media_datas) == len(blobs) - 2
+
+    @title('Test async blob data handler in bounded memory mode')
+    @description('Blobs parsed right after their download keep only their tracks, which are the same as the tracks parsed after all downloads')
+    def test_async_blob_data_handler_bounded_memory(self):
+        with Allure.Step("Start fake blob server"):
+            blobs = self.__get_container_blobs()
+            with FakeBlobServer('asset', blobs) as fake_blob_server:
+                with Allure.Step("Get data with and without bounded memory mode"):
+                    async_blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(fake_blob_server.get_settings())
+                    bounded_blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(fake_blob_server.get_settings(is_bounded_memory=True))
+        with Allure.Step("Verify only tracks are kept"):
+            assert bounded_blob_media_data.media_datas.keys() == async_blob_media_data.media_datas.keys()
+            assert all(isinstance(media_data, MediaData) for media_data in bounded_blob_media_data.media_datas.values())
+        with Allure.Step("Verify media data"):
+            media_data = MediaDataParser.get_media_data(async_blob_media_data.media_datas, async_blob_media_data.media_index_datas)
+            bounded_media_data = MediaDataParser.get_media_data(bounded_blob_media_data.media_datas, bounded_blob_media_data.media_index_datas)
+            assert bounded_media_data.media_duration == media_data.media_duration
+            assert [track.__dict__ for track in bounded_media_data.media_track_info_list] == [track.__dict__ for track in media_data.media_track_info_list]
+
+    @title('Test async blob data handler bounds the blobs in flight in bounded memory mode')
+    @description('When parsing is slower than downloading, at most max_concurrent_requests blobs are downloaded or wait for their parse at a time')
+    def test_async_blob_data_handler_bounded_memory_blobs_in_flight(self, monkeypatch):
+        with Allure.Step("Slow down the parse of the blobs and count the blobs in flight"):
+            blobs = self.__get_container_blobs()
+            lock = threading.Lock()
+            blobs_in_flight = [0, 0]
+            process_file = AsyncFileProcessor.process_file
+            fold_media_data = MediaDataParser.fold_media_data
+
+            async def counted_process_file(format, blob_name, az_blob_service_client):
+                with lock:
+                    blobs_in_flight[0] += 1
+                    blobs_in_flight[1] = max(blobs_in_flight)
+                return await process_file(format, blob_name, az_blob_service_client)
+
+            def slow_fold_media_data(*args, **kwargs):
+                time.sleep(0.05)
+                try:
+                    return fold_media_data(*args, **kwargs)
+                finally:
+                    with lock:
+                        blobs_in_flight[0] -= 1
+
+            monkeypatch.setattr(AsyncFileProcessor, 'process_file', staticmethod(counted_process_file))
+            monkeypatch.setattr(MediaDataParser, 'fold_media_data', staticmethod(slow_fold_media_data))
+        with Allure.Step("Get data in bounded memory mode"):
+            with FakeBlobServer('asset', blobs) as fake_blob_server:
+                bounded_blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(fake_blob_server.get_settings(is_bounded_memory=True, max_concurrent_requests=2))
+        with Allure.Step("Verify the blobs in flight"):
+            assert len(bounded_blob_media_data.media_datas) == len(blobs) - 1
+            assert 0 < blobs_in_flight[1] <= 2
+
+    @title('Test async blob data handler with the cache of parsed renditions')
+    @description('Renditions cached by a bounded memory run are read from the cache off the event loop and are not downloaded again')
+    def test_async_blob_data_handler_cached_renditions(self, tmp_path):
+        with Allure.Step("Get data twice with the cache"):
+            blobs = self.__get_container_blobs()
+            media_cache = ParsedMediaCache(str(tmp_path / 'cache.sqlite'))
+            with FakeBlobServer('asset', blobs) as fake_blob_server:
+                settings = fake_blob_server.get_settings(is_bounded_memory=True)
+                blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(settings, media_cache)
+                requests_counts = {name: fake_blob_server.count_requests('GET', name) for name in blob_media_data.media_datas}
+                cached_blob_media_data = AsyncBlobDataHandler.get_data_from_blobs(settings, media_cache)
+                cached_requests_counts = {name: fake_blob_server.count_requests('GET', name) for name in blob_media_data.media_datas}
+        with Allure.Step("Verify renditions come from the cache"):
+            assert cached_blob_media_data.media_datas.keys() == blob_media_data.media_datas.keys()
+            assert all(isinstance(media_data, MediaData) for media_data in cached_blob_media_data.media_datas.values())
+            assert all(requests_count > 0 for requests_count in requests_counts.values())
+            assert cached_requests_counts == requests_counts
@@ -0,0 +1,34 @@
+import pytest
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from tests.test_utils.common.allure_helper import Allure
+
+_SETTINGS = {
+    'connection_string': 'DefaultEndpointsProtocol=https;AccountName=testaccount;AccountKey=dGVzdGtleQ==;EndpointSuffix=core.windows.net',
+    'container_name': 'test-container',
+    'is_multithreading': True,
+}
+
+
+class TestAzureBlobServiceClient:
+    @title('Test blob clients are cached and share one pooled transport')
+    @description('Repeated requests for the same blob reuse its client, all clients use the configured connection pool')
+    def test_blob_clients_share_pooled_transport(self):
+        with Allure.Step("Create client with custom pool settings"):
+            az_blob_service_client = AzureBlobServiceClient({**_SETTINGS, 'connection_pool_size': 4, 'max_connections_per_host': 64})
+        with Allure.Step("Verify blob client cache"):
+            blob_client = az_blob_service_client.get_blob_client('video.ismv')
+            assert az_blob_service_client.get_blob_client('video.ismv') is blob_client
+            assert az_blob_service_client.get_blob_client('audio.isma') is not blob_client
+        with Allure.Step("Verify pooled transport"):
+            adapter = az_blob_service_client.transport.session.get_adapter('https://testaccount.blob.core.windows.net')
+            assert adapter._pool_connections == 4
+            assert adapter._pool_maxsize == 64
+
+    @title('Test invalid connection pool settings')
+    @description('Non-positive pool sizes are rejected')
+    def test_invalid_connection_pool_settings(self):
+        with Allure.Step("Create client with invalid pool size"):
+            with pytest.raises(ValueError):
+                AzureBlobServiceClient({**_SETTINGS, 'max_connections_per_host': 0})
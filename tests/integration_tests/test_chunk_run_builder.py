@@ -0,0 +1,95 @@
+import decimal
+import random
+
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
+from external_asset_ism_ismc_generation_tool.mss_client_manifest.chunk_run_builder import ChunkRunBuilder
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+def build_decimal_runs(chunk_timeline: ChunkTimeline, timescale: int) -> list:
+    """ Runs of the chunk durations in seconds converted with Decimal, rounded start times are kept by correcting the previous chunk """
+    runs, repeat, time_start, time_start_round = [], 1, 0, 0
+    for index, chunk in enumerate(chunk_timeline):
+        duration = decimal.Decimal(str(chunk * timescale))
+        if index == 0:
+            runs.append([0, duration, repeat])
+            continue
+        time_start += runs[-1][1]
+        time_start_round += round(runs[-1][1])
+        diff = round(time_start) - time_start_round
+        if diff:
+            if runs[-1][2] > 1:
+                runs[-1][2] -= 1
+                runs.append([None, runs[-1][1] + diff, 1])
+            else:
+                runs[-1][1] += diff
+            time_start_round += diff
+        if runs[-1][1] == duration:
+            repeat += 1
+            runs[-1][2] = repeat
+        else:
+            repeat = 1
+            runs.append([None, duration, repeat])
+    return [(time_start, round(duration), repeat) for time_start, duration, repeat in runs]
+
+
+class TestChunkRunBuilder:
+    @title('Test chunk runs in the ISMC timescale')
+    @description('Runs built in integer arithmetic match the runs built from the durations in seconds with Decimal')
+    def test_chunk_runs_match_decimal_conversion(self):
+        with Allure.Step("Verify runs of the parsed renditions"):
+            media_data = MediaDataParser.get_media_data(Mp4TestFileBuilder.get_fixture_media_datas())
+            for media_track_info in media_data.media_track_info_list:
+                assert ChunkRunBuilder.build(media_track_info.chunk_datas, 10000000) == build_decimal_runs(media_track_info.chunk_datas, 10000000)
+        with Allure.Step("Verify runs of random timelines"):
+            rng = random.Random(16)
+            for _ in range(500):
+                timescale = rng.choice((1, 25, 1000, 24000, 44100, 48000, 90000, 10000000))
+                base_duration = rng.randint(1, 5 * timescale)
+                durations = [rng.choice((base_duration, base_duration, base_duration + 1, base_duration - 1, 2 * timescale, rng.randint(0, 3 * timescale)))
+                             for _ in range(rng.randint(0, 60))]
+                chunk_timeline = ChunkTimeline(timescale, durations)
+                assert ChunkRunBuilder.build(chunk_timeline, 10000000) == build_decimal_runs(chunk_timeline, 10000000)
+
+    @title('Test chunk runs of long durations')
+    @description('Durations beyond 64-bit numerators are summed as Python integers and give the same runs')
+    def test_chunk_runs_long_durations(self):
+        with Allure.Step("Verify runs of 2.0053333s audio chunks"):
+            runs = ChunkRunBuilder.build(ChunkTimeline(48000, [96256] * 4 + [79872]), 10000000)
+            assert runs == [(0, 20053333, 1), (None, 20053334, 1), (None, 20053333, 2), (None, 16640000, 1)]
+        with Allure.Step("Verify runs of very long chunks"):
+            # 10 ** 12 ticks at timescale 3 last 3.3333333333333335e+18 ISMC ticks as float seconds
+            chunk_timeline = ChunkTimeline(3, [10 ** 12, 10 ** 12, 5])
+            runs = ChunkRunBuilder.build(chunk_timeline, 10000000)
+            assert runs == [(0, 3333333333333333000, 2), (None, 16666667, 1)]
+            assert runs == build_decimal_runs(chunk_timeline, 10000000)
+        with Allure.Step("Verify empty timeline"):
+            assert ChunkRunBuilder.build(ChunkTimeline(48000), 10000000) == []
+
+    @title('Test chunk runs of durations ending in half ticks')
+    @description('At timescales 12800 and 20000000 durations end in .5 ticks of the ISMC timescale, their float seconds decide the '
+                 'rounding like in the Decimal conversion')
+    def test_chunk_runs_half_tick_durations(self):
+        with Allure.Step("Verify runs at timescale 12800"):
+            # 34 ticks last 26562.5 ISMC ticks, which float seconds give as 26562.500000000004
+            assert ChunkRunBuilder.build(ChunkTimeline(12800, [34] * 4), 10000000) == [(0, 26563, 1), (None, 26562, 1), (None, 26563, 2)]
+            # 278 ticks last 217187.5 ISMC ticks, which float seconds give as 217187.49999999997
+            assert ChunkRunBuilder.build(ChunkTimeline(12800, [278, 278, 256]), 10000000) == [(0, 217187, 1), (None, 217188, 1), (None, 200000, 1)]
+        with Allure.Step("Verify runs at timescale 20000000"):
+            # 9971 ticks last 4985.5 ISMC ticks, which float seconds give as 4985.499999999999
+            assert ChunkRunBuilder.build(ChunkTimeline(20000000, [9971] * 4), 10000000) == [(0, 4985, 1), (None, 4986, 1), (None, 4985, 2)]
+            assert ChunkRunBuilder.build(ChunkTimeline(20000000, [31905, 31905, 40000000]), 10000000) == [(0, 15953, 1), (None, 15952, 1), (None, 20000000, 1)]
+        with Allure.Step("Verify runs of random timelines match the Decimal conversion"):
+            rng = random.Random(12800)
+            for _ in range(600):
+                timescale = rng.choice((12800, 20000000, 10000000))
+                # Odd tick counts end in .5 ISMC ticks at 12800 and 20000000
+                base_duration = rng.choice((34, 278, 9971, 31905, rng.randint(1, 3 * timescale)))
+                durations = [rng.choice((base_duration, base_duration, base_duration + 1, base_duration - 1, rng.randint(1, 3 * timescale)))
+                             for _ in range(rng.randint(1, 60))]
+                chunk_timeline = ChunkTimeline(timescale, durations)
+                assert ChunkRunBuilder.build(chunk_timeline, 10000000) == build_decimal_runs(chunk_timeline, 10000000)
@@ -0,0 +1,49 @@
+import pickle
+
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.chunk_timeline import ChunkTimeline
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+class TestChunkTimeline:
+    @title('Test chunk timeline encoding')
+    @description('Chunk durations are run-length encoded integer ticks, compared by duration whatever the timescale and transferred as small buffers')
+    def test_chunk_timeline_encoding(self):
+        with Allure.Step("Build timeline"):
+            chunk_timeline = ChunkTimeline(48000, [96256, 96256, 96256, 96256, 48000, 96256, 96256])
+        with Allure.Step("Verify runs and durations"):
+            assert chunk_timeline.get_runs() == [(96256, 4), (48000, 1), (96256, 2)]
+            assert len(chunk_timeline) == 7
+            assert list(chunk_timeline.get_tick_durations()) == [96256, 96256, 96256, 96256, 48000, 96256, 96256]
+            assert list(chunk_timeline) == [96256 / 48000] * 4 + [1.0] + [96256 / 48000] * 2
+            assert chunk_timeline.get_total_duration_in_seconds() == 625536 / 48000
+        with Allure.Step("Verify equality"):
+            same_timeline_in_other_timescale = ChunkTimeline(480000, [duration * 10 for duration in chunk_timeline.get_tick_durations()])
+            assert chunk_timeline == same_timeline_in_other_timescale
+            assert hash(chunk_timeline) == hash(same_timeline_in_other_timescale)
+            assert chunk_timeline != ChunkTimeline(48000, [96256, 96256, 96256, 96256, 48000, 96256, 96257])
+            assert chunk_timeline != ChunkTimeline(48000, [96256, 96256, 96256, 96256, 48000, 96256])
+            assert ChunkTimeline(1000) == ChunkTimeline(10000000)
+        with Allure.Step("Verify appended chunks reset the cached hash"):
+            appended_timeline = ChunkTimeline(48000, [96256, 96256, 96256, 96256, 48000, 96256])
+            assert hash(appended_timeline) != hash(chunk_timeline)
+            appended_timeline.append(96256)
+            assert appended_timeline == chunk_timeline and hash(appended_timeline) == hash(chunk_timeline)
+        with Allure.Step("Verify pickling"):
+            assert pickle.loads(pickle.dumps(chunk_timeline)) == chunk_timeline
+            long_timeline = ChunkTimeline(10000000, [20000000] * 2999 + [6826667])
+            assert len(pickle.dumps(long_timeline)) < len(pickle.dumps(list(long_timeline))) / 4
+
+    @title('Test chunk timelines of parsed renditions')
+    @description('Parsed renditions keep their chunks in integer ticks of the track timescale')
+    def test_parsed_chunk_timeline(self):
+        with Allure.Step("Parse rendition"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms('0400.ismv')
+            track_info = MediaDataParser.parse_media_data('0400.ismv', {'moov': moov, 'moofs': moofs}).media_track_info_list[0]
+        with Allure.Step("Verify timeline"):
+            assert isinstance(track_info.chunk_datas, ChunkTimeline)
+            assert track_info.chunk_datas.timescale == 10000000
+            assert len(track_info.chunk_datas) == track_info.chunks == len(moofs)
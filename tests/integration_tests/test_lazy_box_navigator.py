@@ -0,0 +1,55 @@
+from allure_commons._allure import title, description
+from tools.pymp4.src.pymp4.parser import MP4
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box_navigator import LazyBoxNavigator
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+def strip_positions(value):
+    if isinstance(value, dict):
+        return {key: strip_positions(item) for key, item in value.items() if key not in ('offset', 'end')}
+    if isinstance(value, list):
+        return [strip_positions(item) for item in value]
+    return value
+
+
+def assert_same_boxes(parsed_boxes, lazy_boxes):
+    assert [box.type for box in parsed_boxes] == [box.type for box in lazy_boxes]
+    for parsed_box, lazy_box in zip(parsed_boxes, lazy_boxes):
+        if lazy_box.is_container():
+            assert_same_boxes(parsed_box.children, lazy_box.children)
+        else:
+            assert strip_positions(parsed_box) == strip_positions(lazy_box.decode())
+
+
+class TestLazyBoxNavigator:
+    @title('Test lazy box navigator against full pymp4 parsing')
+    @description('Boxes indexed by the navigator have the same layout and decode to the same values as the full MP4.parse of the moov and moofs')
+    def test_lazy_box_navigator_matches_full_parse(self):
+        with Allure.Step("Load moov and moof atoms of all renditions"):
+            media_datas = Mp4TestFileBuilder.get_fixture_media_datas()
+        for media_name, media_data in media_datas.items():
+            with Allure.Step(f"Compare boxes of {media_name}"):
+                for atom in [media_data['moov']] + media_data['moofs'][:2]:
+                    assert_same_boxes(MP4.parse(atom), LazyBoxNavigator(atom).boxes)
+
+    @title('Test lazy box navigator path lookup')
+    @description('Boxes are found by path, audio sample entry boxes are listed in stbl and 64-bit box sizes are indexed')
+    def test_lazy_box_navigator_find(self):
+        with Allure.Step("Index fixture moov"):
+            moov, _ = Mp4TestFileBuilder.get_fixture_atoms('0128.isma')
+            navigator = LazyBoxNavigator(memoryview(moov))
+        with Allure.Step("Find boxes by path"):
+            stbl_atom = navigator.find('moov/trak/mdia/minf/stbl')
+            assert [box.type for box in stbl_atom.children] == [b'stsd', b'esds', b'stts', b'stsc', b'stsz', b'stco']
+            assert navigator.find('stsd/entries', stbl_atom) is None
+            assert navigator.find('stsd', stbl_atom).entries[0].format == b'mp4a'
+            assert navigator.find('moov/mvex/trex').track_ID == navigator.find('moov/trak/tkhd').track_ID
+            assert len(navigator.find_all('moov/trak')) == 1
+            assert navigator.find('moov/udta/meta') is None
+        with Allure.Step("Index boxes with 64-bit and open-ended sizes"):
+            data = Mp4TestFileBuilder.build_box('free') + Mp4TestFileBuilder.build_box('mdat', bytes(32), large_size=True) + b'\x00\x00\x00\x00skip' + bytes(10)
+            boxes = LazyBoxNavigator(data).boxes
+            assert [(box.type, box.offset, box.size, box.header_size) for box in boxes] == [(b'free', 0, 8, 8), (b'mdat', 8, 48, 16), (b'skip', 56, 18, 8)]
+            assert bytes(boxes[1].get_payload()) == bytes(32)
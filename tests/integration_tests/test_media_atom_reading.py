@@ -0,0 +1,164 @@
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.local_file_client.local_file_service_client import LocalFileServiceClient
+from external_asset_ism_ismc_generation_tool.media_data_parser.azure_media_data_parser import AzureMediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.local_media_data_parser import LocalMediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.mfra_index_reader import MfraIndexReader
+from external_asset_ism_ismc_generation_tool.media_data_parser.range_read_planner import RangeReadPlanner
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder, InMemoryBlobServiceClient
+
+
+class TestMediaAtomReading:
+    @title('Test atom discovery of a fragmented file with coalesced range reads')
+    @description('moov and all moofs are read from a fragmented file in two range requests')
+    def test_azure_media_data_parser_fragmented_file(self):
+        with Allure.Step("Prepare fragmented file"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            client = InMemoryBlobServiceClient({'audio.isma': Mp4TestFileBuilder.build_fragmented_file(moov, moofs)})
+        with Allure.Step("Read moov and moofs"):
+            media_data = AzureMediaDataParser.get_media_data(client, 'audio.isma')
+        with Allure.Step("Verify atoms and request count"):
+            assert media_data['moov'] == moov
+            assert media_data['moofs'] == moofs
+            assert client.request_count <= 2
+
+    @title('Test atom discovery of a file with moov at the end')
+    @description('moov placed after a large mdat is found through the tail window without walking the file')
+    def test_azure_media_data_parser_moov_at_end(self):
+        with Allure.Step("Prepare file with moov after mdat"):
+            moov = Mp4TestFileBuilder.build_box('moov', Mp4TestFileBuilder.build_box('mvhd', bytes(100)))
+            client = InMemoryBlobServiceClient({'video.mp4': Mp4TestFileBuilder.build_moov_at_end_file(moov, mdat_size=5 * RangeReadPlanner.HEAD_WINDOW_SIZE)})
+        with Allure.Step("Read moov"):
+            media_data = AzureMediaDataParser.get_media_data(client, 'video.mp4')
+        with Allure.Step("Verify atoms and request count"):
+            assert media_data['moov'] == moov
+            assert media_data['moofs'] == []
+            assert client.request_count == 2
+
+    @title('Test atom discovery with 64-bit atom sizes')
+    @description('mdat atoms with largesize headers are skipped correctly')
+    def test_azure_media_data_parser_large_size_atoms(self):
+        with Allure.Step("Prepare fragmented file with largesize mdat atoms"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            client = InMemoryBlobServiceClient({'audio.isma': Mp4TestFileBuilder.build_fragmented_file(moov, moofs, large_size_mdat=True)})
+        with Allure.Step("Read moov and moofs"):
+            media_data = AzureMediaDataParser.get_media_data(client, 'audio.isma')
+        with Allure.Step("Verify atoms"):
+            assert media_data['moov'] == moov
+            assert len(media_data['moofs']) == len(moofs)
+
+    @title('Test range read planner serves covered reads from memory')
+    @description('Reads inside the head window do not issue further requests, reads past it only request the missing part')
+    def test_range_read_planner_coverage(self):
+        with Allure.Step("Prepare planner"):
+            data = bytes(range(256)) * 64
+            requests = []
+
+            def read_range(offset, length):
+                requests.append((offset, length))
+                end = len(data) if length is None else offset + length
+                return data[offset:end], len(data)
+
+            read_planner = RangeReadPlanner(head_window_size=1024, tail_window_size=1024, read_ahead_size=512)
+
+            def read(offset, length=None):
+                return RangeReadPlanner.run(read_planner.read(offset, length), read_range)
+        with Allure.Step("Verify reads"):
+            assert read(0, 8) == data[:8]
+            assert read(1000, 8) == data[1000:1008]
+            assert len(requests) == 1
+            assert read(1020, 100) == data[1020:1120]
+            assert requests[-1] == (1024, 512)
+            assert read(len(data) - 10, 10) == data[-10:]
+            assert requests[-1] == (len(data) - 1024, 1024)
+            assert read(3000) == data[3000:]
+            assert read(len(data) + 10, 8) == b''
+            assert read_planner.request_count == len(requests) == 4
+
+    @title('Test moof scanning skips mdat payload')
+    @description('Without a usable mfra index moofs are read one by one and mdat boxes are skipped by offset')
+    def test_azure_media_data_parser_skips_mdat_payload(self):
+        with Allure.Step("Prepare fragmented file with large mdat boxes and no mfra"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            mdat_size = 4 * RangeReadPlanner.HEAD_WINDOW_SIZE
+            file_data = Mp4TestFileBuilder.build_fragmented_file(moov, moofs, mdat_size=mdat_size, with_mfra=False)
+            client = InMemoryBlobServiceClient({'audio.isma': file_data})
+        with Allure.Step("Read moov and moofs"):
+            media_data = AzureMediaDataParser.get_media_data(client, 'audio.isma')
+        with Allure.Step("Verify atoms and downloaded bytes"):
+            assert media_data['moov'] == moov
+            assert media_data['moofs'] == moofs
+            assert client.bytes_read < len(file_data) / 10
+
+    @title('Test moof reading through the mfra index')
+    @description('moof offsets from the tfra box are prefetched, an incomplete index falls back to the linear scan')
+    def test_azure_media_data_parser_mfra_index(self):
+        with Allure.Step("Prepare fragmented files with complete and incomplete mfra index"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            mdat_size = 4 * RangeReadPlanner.HEAD_WINDOW_SIZE
+            client = InMemoryBlobServiceClient({
+                'indexed.isma': Mp4TestFileBuilder.build_fragmented_file(moov, moofs, mdat_size=mdat_size),
+                'partially_indexed.isma': Mp4TestFileBuilder.build_fragmented_file(moov, moofs, mdat_size=mdat_size, indexed_moofs=[0, 2, 3]),
+            })
+        with Allure.Step("Verify atoms"):
+            for blob_name in ['indexed.isma', 'partially_indexed.isma']:
+                media_data = AzureMediaDataParser.get_media_data(client, blob_name)
+                assert media_data['moov'] == moov
+                assert media_data['moofs'] == moofs
+
+    @title('Test mfra index reader')
+    @description('Per-track fragment times and moof offsets are read from the tfra boxes of the mfra')
+    def test_mfra_index_reader(self):
+        with Allure.Step("Prepare fragmented file"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            file_data = Mp4TestFileBuilder.build_fragmented_file(moov, moofs, mdat_size=100)
+        with Allure.Step("Read mfra index"):
+            read_planner = RangeReadPlanner(head_window_size=1024, tail_window_size=1024)
+            fragment_index = RangeReadPlanner.run(MfraIndexReader.read_index(read_planner, 'audio.isma'),
+                                                  lambda offset, length: (file_data[offset:None if length is None else offset + length], len(file_data)))
+        with Allure.Step("Verify mfra index"):
+            assert list(fragment_index.track_entries) == [1]
+            assert [entry.time for entry in fragment_index.track_entries[1]] == [index * 20000000 for index in range(len(moofs))]
+            assert [file_data[offset + 4:offset + 8] for offset in fragment_index.moof_offsets] == [b'moof'] * len(moofs)
+            assert file_data[fragment_index.mfra_offset + 4:fragment_index.mfra_offset + 8] == b'mfra'
+            assert read_planner.request_count == 2
+
+    @title('Test atom discovery of local files')
+    @description('LocalMediaDataParser reads moov and moofs through the same locator as the Azure parser')
+    def test_local_media_data_parser(self, tmp_path):
+        with Allure.Step("Prepare local fragmented files"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            (tmp_path / 'indexed.isma').write_bytes(Mp4TestFileBuilder.build_fragmented_file(moov, moofs))
+            (tmp_path / 'not_indexed.isma').write_bytes(Mp4TestFileBuilder.build_fragmented_file(moov, moofs, with_mfra=False))
+            local_file_service_client = LocalFileServiceClient({'local_directory': str(tmp_path)})
+        with Allure.Step("Verify atoms"):
+            for file_name in ['indexed.isma', 'not_indexed.isma']:
+                media_data = LocalMediaDataParser.get_media_data(local_file_service_client, file_name)
+                assert media_data['moov'] == moov
+                assert media_data['moofs'] == moofs
+
+    @title('Test memory-mapped local file reader')
+    @description('LocalFileReader serves zero-copy slices of one mapping and parsed atoms outlive the closed mapping')
+    def test_local_file_reader(self, tmp_path):
+        with Allure.Step("Prepare local files"):
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms()
+            file_data = Mp4TestFileBuilder.build_fragmented_file(moov, moofs, large_size_mdat=True)
+            (tmp_path / 'large_size.isma').write_bytes(file_data)
+            (tmp_path / 'empty.isma').write_bytes(b'')
+            local_file_service_client = LocalFileServiceClient({'local_directory': str(tmp_path)})
+        with Allure.Step("Verify slices of the mapping"):
+            with local_file_service_client.open_file('large_size.isma') as file_reader:
+                assert file_reader.size == len(file_data)
+                assert isinstance(file_reader.read(4, 4), memoryview)
+                assert bytes(file_reader.read(4, 4)) == file_data[4:8]
+                assert bytes(file_reader.read(len(file_data) - 8)) == file_data[-8:]
+        with Allure.Step("Verify atoms are copied out of the mapping"):
+            media_data = LocalMediaDataParser.get_media_data(local_file_service_client, 'large_size.isma')
+            assert media_data['moov'] == moov
+            assert media_data['moofs'] == moofs
+            assert all(isinstance(moof, bytes) for moof in media_data['moofs'])
+        with Allure.Step("Verify empty file"):
+            with local_file_service_client.open_file('empty.isma') as file_reader:
+                assert file_reader.size == 0
+                assert bytes(file_reader.read(0, 8)) == b''
@@ -0,0 +1,83 @@
+import struct
+
+import pytest
+from allure_commons._allure import title, description
+from tools.pymp4.src.pymp4.parser import MP4
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.media_box_extractor import MediaBoxExtractor
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.moof_fragment_decoder import MoofFragmentDecoder
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+def build_moof(tfhd_flags: int, tfhd_fields: bytes, tfdt_version: int, trun_flags: int, trun_fields: bytes, samples: list) -> bytes:
+    tfhd = Mp4TestFileBuilder.build_box('tfhd', struct.pack('>II', tfhd_flags, 2) + tfhd_fields)
+    tfdt = Mp4TestFileBuilder.build_box('tfdt', struct.pack('>BxxxQ' if tfdt_version else '>BxxxI', tfdt_version, 90000))
+    trun_samples = b''.join(struct.pack(f'>{len(sample)}I', *sample) for sample in samples)
+    trun = Mp4TestFileBuilder.build_box('trun', struct.pack('>II', trun_flags, len(samples)) + trun_fields + trun_samples)
+    return Mp4TestFileBuilder.build_box('moof', Mp4TestFileBuilder.build_box('mfhd', struct.pack('>II', 0, 1)) + Mp4TestFileBuilder.build_box('traf', tfhd + tfdt + trun))
+
+
+class TestMoofFragmentDecoder:
+    @title('Test moof fragment decoding against pymp4')
+    @description('Durations and sizes summed from the trun bytes match the sample info of the moofs parsed by pymp4')
+    def test_moof_fragment_decoder_matches_pymp4(self):
+        with Allure.Step("Load moofs of all renditions"):
+            media_datas = Mp4TestFileBuilder.get_fixture_media_datas()
+        for media_name, media_data in media_datas.items():
+            with Allure.Step(f"Compare fragments of {media_name}"):
+                for moof in media_data['moofs']:
+                    moof_atom = MediaBoxExtractor.get_mp4_box(MP4.parse(moof), 'moof')
+                    traf_atoms = MediaBoxExtractor.get_all_mp4_sub_boxes(moof_atom, 'traf')
+                    track_fragments = MoofFragmentDecoder.decode(moof)
+                    assert len(track_fragments) == len(traf_atoms)
+                    for track_fragment, traf_atom in zip(track_fragments, traf_atoms):
+                        tfhd_atom = MediaBoxExtractor.get_mp4_sub_box(traf_atom, 'tfhd')
+                        trun_atom = MediaBoxExtractor.get_mp4_sub_box(traf_atom, 'trun')
+                        assert track_fragment.track_id == tfhd_atom.track_ID
+                        assert track_fragment.sample_count == trun_atom.sample_count
+                        assert track_fragment.default_sample_duration == tfhd_atom.default_sample_duration
+                        assert track_fragment.sample_duration_sum == sum(sample.sample_duration for sample in trun_atom.sample_info)
+                        assert track_fragment.sample_size_sum == sum(sample.sample_size for sample in trun_atom.sample_info)
+
+    @title('Test moof fragment decoding of optional fields')
+    @description('tfhd defaults, 64-bit tfdt and optional trun fields are decoded, truncated trun boxes are rejected')
+    def test_moof_fragment_decoder_optional_fields(self):
+        with Allure.Step("Decode moof with tfhd defaults and sample sizes and composition offsets"):
+            moof = build_moof(0x01 | 0x08 | 0x10, struct.pack('>QII', 1000, 3003, 512), 1, 0x01 | 0x04 | 0x200 | 0x800, struct.pack('>iI', 120, 0),
+                              [(100, 0), (200, 3003), (300, 6006)])
+            track_fragment = MoofFragmentDecoder.decode(moof)[0]
+            assert (track_fragment.track_id, track_fragment.sample_count, track_fragment.base_media_decode_time) == (2, 3, 90000)
+            assert (track_fragment.default_sample_duration, track_fragment.default_sample_size) == (3003, 512)
+            assert (track_fragment.sample_duration_sum, track_fragment.sample_size_sum) == (None, 600)
+        with Allure.Step("Decode moof with all per-sample fields"):
+            moof = build_moof(0, b'', 0, 0x100 | 0x200 | 0x400 | 0x800, b'', [(1001, 10, 0, 0), (1001, 20, 0, 0), (2002, 30, 0, 0)])
+            track_fragment = MoofFragmentDecoder.decode(moof)[0]
+            assert (track_fragment.base_media_decode_time, track_fragment.sample_duration_sum, track_fragment.sample_size_sum) == (90000, 4004, 60)
+            assert MP4.parse(moof)[0].children[1].children[2].sample_info[2].sample_duration == 2002
+        with Allure.Step("Reject truncated trun"):
+            moof = build_moof(0, b'', 0, 0x100, b'', [(1001,), (1001,)])
+            # trun declares 3 samples, only 2 are stored
+            sample_count_offset = moof.index(b'trun') + 8
+            truncated_moof = moof[:sample_count_offset] + struct.pack('>I', 3) + moof[sample_count_offset + 4:]
+            with pytest.raises(ValueError):
+                MoofFragmentDecoder.decode(truncated_moof)
+
+    @title('Test fragments of a multi-track file')
+    @description('Every moof of a multi-track file is decoded once and the fragments of each track use the timescale of that track')
+    def test_multi_track_fragments(self):
+        with Allure.Step("Combine an audio and a video rendition with different timescales into one file"):
+            audio_moov, audio_moofs = Mp4TestFileBuilder.get_fixture_atoms('0128.isma')
+            video_moov, video_moofs = Mp4TestFileBuilder.renumber_track(*Mp4TestFileBuilder.get_fixture_atoms('0400.ismv'), track_id=2, timescale=5000000)
+            multi_track_moov = Mp4TestFileBuilder.build_multi_track_moov([audio_moov, video_moov])
+        with Allure.Step("Parse the combined file and every rendition alone"):
+            multi_track_infos = MediaDataParser.parse_media_data('multi.ismv', {'moov': multi_track_moov, 'moofs': audio_moofs + video_moofs}).media_track_info_list
+            audio_track_info = MediaDataParser.parse_media_data('multi.ismv', {'moov': audio_moov, 'moofs': audio_moofs}).media_track_info_list[0]
+            video_track_info = MediaDataParser.parse_media_data('multi.ismv', {'moov': video_moov, 'moofs': video_moofs}).media_track_info_list[0]
+        with Allure.Step("Verify tracks"):
+            assert [track_info.track_id for track_info in multi_track_infos] == [1, 2]
+            assert [track_info.chunks for track_info in multi_track_infos] == [len(audio_moofs), len(video_moofs)]
+            for track_info, single_track_info in zip(multi_track_infos, [audio_track_info, video_track_info]):
+                assert track_info.chunk_datas == single_track_info.chunk_datas
+                assert track_info.bit_rate == single_track_info.bit_rate
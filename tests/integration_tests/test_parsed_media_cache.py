@@ -0,0 +1,90 @@
+import sqlite3
+import time
+
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.blob_data_handler.storage_data_handler import StorageDataHandler
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_track_info import MediaTrackInfo
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.mss_client_manifest.ismc_generator import IsmcGenerator
+from external_asset_ism_ismc_generation_tool.storage_backend.in_memory_storage_backend import InMemoryStorageBackend
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+class CountingStorageBackend(InMemoryStorageBackend):
+    def __init__(self, objects: dict):
+        super().__init__(objects)
+        self.read_names = set()
+
+    def read_range(self, name, offset=None, length=None):
+        self.read_names.add(name)
+        return super().read_range(name, offset, length)
+
+
+class TestParsedMediaCache:
+    @staticmethod
+    def __generate_ismc(storage_backend: InMemoryStorageBackend, media_cache: ParsedMediaCache) -> str:
+        blob_media_data = StorageDataHandler.get_data_from_storage(storage_backend, media_cache=media_cache)
+        media_data = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas, media_cache=media_cache)
+        return IsmcGenerator.generate(duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list, text_data_info_list=[])
+
+    @title('Test parsed media cache skips unchanged renditions')
+    @description('Cached renditions are neither read nor parsed while their version and size are unchanged')
+    def test_parsed_media_cache_hits(self, tmp_path):
+        with Allure.Step("Prepare storage and cache"):
+            objects = Mp4TestFileBuilder.get_fixture_files()
+            media_cache = ParsedMediaCache(str(tmp_path / 'cache.sqlite'))
+        with Allure.Step("Generate the manifest without and with cache"):
+            uncached_ismc = self.__generate_ismc(InMemoryStorageBackend(objects), None)
+            first_ismc = self.__generate_ismc(InMemoryStorageBackend(objects), media_cache)
+            storage_backend = CountingStorageBackend(objects)
+            cached_ismc = self.__generate_ismc(storage_backend, media_cache)
+        with Allure.Step("Verify cached renditions are not read"):
+            assert uncached_ismc == first_ismc == cached_ismc
+            assert storage_backend.read_names == set()
+            assert media_cache.hit_count == len(objects)
+        with Allure.Step("Verify changed rendition is read again"):
+            changed_name = sorted(objects)[0]
+            moov, moofs = Mp4TestFileBuilder.get_fixture_atoms(changed_name)
+            storage_backend = CountingStorageBackend(dict(objects, **{changed_name: Mp4TestFileBuilder.build_fragmented_file(moov, moofs, mdat_size=2048)}))
+            assert self.__generate_ismc(storage_backend, media_cache) == uncached_ismc
+            assert storage_backend.read_names == {changed_name}
+            media_cache.close()
+        with Allure.Step("Verify renditions are cached per segmentation policy"):
+            media_cache = ParsedMediaCache(str(tmp_path / 'cache.sqlite'), segmentation_policy=SegmentationPolicy(6))
+            storage_backend = CountingStorageBackend(objects)
+            self.__generate_ismc(storage_backend, media_cache)
+            assert media_cache.hit_count == 0
+            assert storage_backend.read_names == set(objects)
+            media_cache.close()
+
+    @title('Test parsed media cache eviction')
+    @description('Records are evicted by age and least recent use above the maximum size, and no_cache disables the cache')
+    def test_parsed_media_cache_eviction(self, tmp_path):
+        with Allure.Step("Fill the cache"):
+            cache_path = str(tmp_path / 'cache.sqlite')
+            media_cache = ParsedMediaCache.from_settings({'cache_path': cache_path, 'cache_max_size_mb': 1})
+            cache_keys = [media_cache.get_cache_key('memory', f'{index}.mp4', 'v1', 100) for index in range(3)]
+            for cache_key in cache_keys:
+                track = MediaTrackInfo(TrackType.VIDEO, '1000', 1, 1, 'avc1', [[index, 1] for index in range(40000)], cache_key.name)
+                media_cache.put(cache_key, MediaData(10, [track]))
+        with Allure.Step("Verify eviction by size"):
+            media_cache.evict()
+            # Each record takes about 360 KB, so only the two most recently used ones fit into 1 MB
+            assert [media_cache.get(cache_key) is not None for cache_key in cache_keys] == [False, True, True]
+            assert media_cache.get(media_cache.get_cache_key('memory', '2.mp4', 'v2', 100)) is None
+            assert media_cache.get_cache_key('memory', '2.mp4', None, 100) is None
+        with Allure.Step("Verify eviction by age"):
+            media_cache.close()
+            with sqlite3.connect(cache_path) as connection:
+                connection.execute("UPDATE parsed_media SET last_access = ?", (time.time() - 31 * 24 * 60 * 60,))
+            media_cache = ParsedMediaCache(cache_path)
+            assert media_cache.get(cache_keys[2]) is None
+            media_cache.close()
+        with Allure.Step("Verify no_cache"):
+            assert ParsedMediaCache.from_settings({'no_cache': True, 'cache_path': cache_path}) is None
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+from allure_commons._allure import title, description
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from external_asset_ism_ismc_generation_tool.storage_backend.s3_storage_backend import S3StorageBackend
+from tests.test_utils.common.allure_helper import Allure
+
+
+class TestS3StorageBackend:
+    __DATA = b'0123456789'
+
+    @staticmethod
+    def __get_storage_backend() -> S3StorageBackend:
+        return S3StorageBackend({'s3_bucket': 'bucket', 's3_prefix': 'asset', 'aws_region': 'us-east-1',
+                                 'aws_access_key_id': 'test', 'aws_secret_access_key': 'test'})
+
+    @staticmethod
+    def __get_object_response(data: bytes, content_range: str = None) -> dict:
+        response = {'Body': StreamingBody(io.BytesIO(data), len(data)), 'ContentLength': len(data)}
+        if content_range:
+            response['ContentRange'] = content_range
+        return response
+
+    @title('Test S3 storage backend listing')
+    @description('Objects of every page under the prefix are listed with their names relative to it, objects of sub-folders are skipped')
+    def test_s3_storage_backend_list_pagination(self):
+        with Allure.Step("Stub two pages of objects"):
+            storage_backend = TestS3StorageBackend.__get_storage_backend()
+            with Stubber(storage_backend.s3_client) as stubber:
+                stubber.add_response('list_objects_v2',
+                                     {'IsTruncated': True, 'NextContinuationToken': 'page-2', 'KeyCount': 2,
+                                      'Contents': [{'Key': 'asset/video.mp4', 'Size': 10, 'ETag': '"1"'},
+                                                   {'Key': 'asset/old/video.mp4', 'Size': 20, 'ETag': '"2"'}]},
+                                     {'Bucket': 'bucket', 'Prefix': 'asset/'})
+                stubber.add_response('list_objects_v2',
+                                     {'IsTruncated': False, 'KeyCount': 1,
+                                      'Contents': [{'Key': 'asset/subtitles_ENG.vtt', 'Size': 30, 'ETag': '"3"'}]},
+                                     {'Bucket': 'bucket', 'Prefix': 'asset/', 'ContinuationToken': 'page-2'})
+                with Allure.Step("List objects"):
+                    items = storage_backend.list()
+                stubber.assert_no_pending_responses()
+        with Allure.Step("Verify objects"):
+            assert [(item.name, item.size, item.version) for item in items] == [('video.mp4', 10, '"1"'), ('subtitles_ENG.vtt', 30, '"3"')]
+
+    @title('Test S3 storage backend ranged reads')
+    @description('Ranges are read with the object size of their Content-Range, a range starting at or past the end of the object gives no data and the object size')
+    def test_s3_storage_backend_read_range(self):
+        storage_backend = TestS3StorageBackend.__get_storage_backend()
+        with Stubber(storage_backend.s3_client) as stubber:
+            with Allure.Step("Stub whole, ranged and open ended reads"):
+                key = {'Bucket': 'bucket', 'Key': 'asset/video.mp4'}
+                stubber.add_response('get_object', TestS3StorageBackend.__get_object_response(self.__DATA), key)
+                stubber.add_response('get_object', TestS3StorageBackend.__get_object_response(self.__DATA[2:6], 'bytes 2-5/10'),
+                                     {**key, 'Range': 'bytes=2-5'})
+                stubber.add_response('get_object', TestS3StorageBackend.__get_object_response(self.__DATA[8:], 'bytes 8-9/10'),
+                                     {**key, 'Range': 'bytes=8-'})
+            with Allure.Step("Stub reads at and past the end of the object"):
+                stubber.add_client_error('get_object', service_error_code='InvalidRange', service_message='The requested range is not satisfiable',
+                                         http_status_code=416, service_error_meta={'ActualObjectSize': '10'},
+                                         expected_params={**key, 'Range': 'bytes=10-13'})
+                stubber.add_client_error('get_object', service_error_code='InvalidRange', service_message='The requested range is not satisfiable',
+                                         http_status_code=416, response_meta={'HTTPHeaders': {'content-range': 'bytes */10'}},
+                                         expected_params={**key, 'Range': 'bytes=12-'})
+                stubber.add_client_error('get_object', service_error_code='InvalidRange', service_message='The requested range is not satisfiable',
+                                         http_status_code=416, expected_params={**key, 'Range': 'bytes=20-29'})
+                stubber.add_response('head_object', {'ContentLength': 10}, key)
+                stubber.add_client_error('get_object', service_error_code='NoSuchKey', http_status_code=404,
+                                         expected_params={'Bucket': 'bucket', 'Key': 'asset/missing.mp4', 'Range': 'bytes=0-3'})
+            with Allure.Step("Read ranges"):
+                assert storage_backend.read_range('video.mp4') == (self.__DATA, 10)
+                assert storage_backend.read_range('video.mp4', 2, 4) == (b'2345', 10)
+                assert storage_backend.read_range('video.mp4', 8) == (b'89', 10)
+                assert storage_backend.read_range('video.mp4', 10, 4) == (b'', 10)
+                assert storage_backend.read_range('video.mp4', 12) == (b'', 10)
+                assert storage_backend.read_range('video.mp4', 20, 10) == (b'', 10)
+                assert storage_backend.read_range('video.mp4', 0, 0) == (b'', None)
+                with pytest.raises(ClientError):
+                    storage_backend.read_range('missing.mp4', 0, 4)
+            stubber.assert_no_pending_responses()
+
+    @title('Test S3 storage backend exists and write')
+    @description('Missing objects are reported as not existing, other errors are raised, existing objects are not overwritten if asked')
+    def test_s3_storage_backend_exists(self):
+        storage_backend = TestS3StorageBackend.__get_storage_backend()
+        with Stubber(storage_backend.s3_client) as stubber:
+            with Allure.Step("Stub existing, missing and forbidden objects"):
+                stubber.add_response('head_object', {'ContentLength': 10}, {'Bucket': 'bucket', 'Key': 'asset/video.mp4'})
+                stubber.add_client_error('head_object', service_error_code='404', http_status_code=404,
+                                         expected_params={'Bucket': 'bucket', 'Key': 'asset/missing.mp4'})
+                stubber.add_client_error('head_object', service_error_code='403', http_status_code=403,
+                                         expected_params={'Bucket': 'bucket', 'Key': 'asset/forbidden.mp4'})
+                stubber.add_response('head_object', {'ContentLength': 10}, {'Bucket': 'bucket', 'Key': 'asset/video.ism'})
+            with Allure.Step("Check objects"):
+                assert storage_backend.exists('video.mp4')
+                assert not storage_backend.exists('missing.mp4')
+                with pytest.raises(ClientError):
+                    storage_backend.exists('forbidden.mp4')
+                with pytest.raises(ValueError):
+                    storage_backend.write('video.ism', b'manifest', overwrite=False)
+            stubber.assert_no_pending_responses()
@@ -0,0 +1,115 @@
+import random
+import struct
+
+import numpy as np
+import pytest
+from allure_commons._allure import title, description
+from tools.pymp4.src.pymp4.parser import Box
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.stss_parser import STSSParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.stsz_parser import STSZParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.atom_parser.stts_parser import STTSParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box_navigator import LazyBoxNavigator
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.track_type import TrackType
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+def build_full_box(box_type: str, *values: int) -> bytes:
+    return Mp4TestFileBuilder.build_box(box_type, b'\x00\x00\x00\x00' + struct.pack(f'>{len(values)}I', *values))
+
+
+def parse_both(box_data: bytes) -> tuple:
+    """ Returns the box decoded by pymp4 and the same box indexed by the lazy navigator """
+    return Box.parse(box_data), LazyBoxNavigator(box_data).boxes[0]
+
+
+class TestSampleTableDecoding:
+    @title('Test sample tables decoded from raw bytes')
+    @description('stsz, stts and stss tables read from the raw box payload match the values of the boxes decoded by pymp4')
+    def test_sample_tables_match_pymp4(self):
+        with Allure.Step("Build sample tables"):
+            rng = random.Random(7)
+            sizes = [rng.randint(100, 90000) for _ in range(3000)]
+            stts_entries = [(rng.randint(1, 300), rng.choice((1000, 1001, 2002))) for _ in range(40)]
+            sample_count = sum(count for count, _ in stts_entries)
+            key_frames = sorted(rng.sample(range(1, sample_count + 1), 120))
+            stsz = parse_both(build_full_box('stsz', 0, len(sizes), *sizes))
+            constant_stsz = parse_both(build_full_box('stsz', 1024, 500))
+            stts = parse_both(build_full_box('stts', len(stts_entries), *[value for entry in stts_entries for value in entry]))
+            stss = parse_both(build_full_box('stss', len(key_frames), *key_frames))
+        with Allure.Step("Verify sample sizes"):
+            for stsz_atom in stsz:
+                assert STSZParser(stsz_atom).get_track_size() == sum(sizes)
+                assert STSZParser(stsz_atom).get_entry_sizes().tolist() == sizes
+            for stsz_atom in constant_stsz:
+                assert STSZParser(stsz_atom).get_track_size() == 1024 * 500
+        with Allure.Step("Verify sample timing and key frames"):
+            for stts_atom, stss_atom in zip(stts, stss):
+                stts_parser = STTSParser(stts_atom)
+                key_frames_numbers = STSSParser(stss_atom).get_key_frames_numbers_from_stss()
+                assert key_frames_numbers.tolist() == key_frames
+                assert stts_parser.get_sample_count() == sample_count
+                decode_times = stts_parser.get_sample_decode_times()
+                assert len(decode_times) == sample_count + 1
+                assert decode_times[-1] == sum(count * delta for count, delta in stts_entries)
+                assert stts_parser.get_chunk_durations_from_stts(TrackType.VIDEO, 24000, key_frames_numbers) == \
+                    STTSParser(stts[0]).get_chunk_durations_from_stts(TrackType.VIDEO, 24000, STSSParser(stss[0]).get_key_frames_numbers_from_stss())
+        with Allure.Step("Verify missing stss atom"):
+            assert STSSParser(None).get_key_frames_numbers_from_stss() is None
+
+    @title('Test chunking of sample tables')
+    @description('Chunks cut on the cumulative decode times match a per-sample walk for any segment duration, key frames and edge cases')
+    def test_chunk_durations_match_per_sample_walk(self):
+        def walk_samples(stts_entries, track_type, timescale, key_frames, segment_duration):
+            chunk_durations, chunk_duration, sample_number = [], 0, 1
+            for sample_count, sample_delta in stts_entries:
+                for _ in range(sample_count):
+                    if track_type == TrackType.VIDEO and chunk_duration >= segment_duration * timescale and sample_number in key_frames:
+                        chunk_durations.append(chunk_duration / timescale)
+                        chunk_duration = 0
+                    elif chunk_duration > segment_duration * timescale:
+                        chunk_durations.append(chunk_duration / timescale)
+                        chunk_duration = 0
+                    chunk_duration += sample_delta
+                    sample_number += 1
+            chunk_durations.append(chunk_duration / timescale)
+            return chunk_durations
+
+        rng = random.Random(11)
+        for _ in range(300):
+            with Allure.Step("Build random sample table"):
+                stts_entries = [(rng.randint(0, 60), rng.choice((0, 1, 500, 1000, 1001))) for _ in range(rng.randint(0, 8))]
+                sample_count = sum(count for count, _ in stts_entries)
+                key_frames = [rng.randint(0, sample_count + 1) for _ in range(rng.randint(0, 12))]
+                timescale = rng.choice((1, 1000, 24000))
+                segment_duration = rng.choice((0.001, 0.5, 2, 6))
+                stts_parser = STTSParser(LazyBoxNavigator(build_full_box('stts', len(stts_entries), *[value for entry in stts_entries for value in entry])).boxes[0])
+            with Allure.Step("Verify chunks"):
+                for track_type in (TrackType.VIDEO, TrackType.AUDIO):
+                    assert list(stts_parser.get_chunk_durations_from_stts(track_type, timescale, np.array(key_frames, dtype=np.int64), SegmentationPolicy(segment_duration))) == \
+                        walk_samples(stts_entries, track_type, timescale, set(key_frames), segment_duration)
+
+    @title('Test segmentation policy of sample tables')
+    @description('Chunks follow the target, maximum and minimum durations and the key frame alignment of the segmentation policy')
+    def test_segmentation_policy(self):
+        with Allure.Step("Build 10s of 0.1s samples with a key frame every 3s"):
+            stts_parser = STTSParser(LazyBoxNavigator(build_full_box('stts', 1, 100, 1)).boxes[0])
+            key_frames_numbers = np.array([1, 31, 61, 91], dtype=np.int64)
+
+            def get_chunks(track_type: TrackType, segmentation_policy: SegmentationPolicy) -> list:
+                return list(stts_parser.get_chunk_durations_from_stts(track_type, 10, key_frames_numbers, segmentation_policy))
+        with Allure.Step("Verify chunks"):
+            assert get_chunks(TrackType.VIDEO, SegmentationPolicy()) == [2.1, 2.1, 2.1, 2.1, 1.6]
+            assert get_chunks(TrackType.VIDEO, SegmentationPolicy(max_chunk_duration=4)) == [3.0, 3.0, 3.0, 1.0]
+            assert get_chunks(TrackType.VIDEO, SegmentationPolicy(max_chunk_duration=4, min_chunk_duration=1.5)) == [3.0, 3.0, 4.0]
+            assert get_chunks(TrackType.VIDEO, SegmentationPolicy(max_chunk_duration=4, align_to_key_frames=False)) == [2.1, 2.1, 2.1, 2.1, 1.6]
+            assert get_chunks(TrackType.AUDIO, SegmentationPolicy(6, max_chunk_duration=8)) == [6.1, 3.9]
+        with Allure.Step("Verify policy settings"):
+            segmentation_policy = SegmentationPolicy.from_settings({'segment_duration': 6, 'no_key_frame_alignment': True, 'max_chunk_duration': 9.5})
+            assert (segmentation_policy.target_duration, segmentation_policy.align_to_key_frames, segmentation_policy.max_chunk_duration) == (6.0, False, 9.5)
+            assert SegmentationPolicy.from_settings({}).get_key() == SegmentationPolicy().get_key() != segmentation_policy.get_key()
+            for settings in ({'segment_duration': 0}, {'segment_duration': '2'}, {'min_chunk_duration': 3}, {'max_chunk_duration': 1}):
+                with pytest.raises(ValueError):
+                    SegmentationPolicy.from_settings(settings)
@@ -0,0 +1,79 @@
+import pickle
+
+import pytest
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.media_data_parser import media_data_parser
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data_record import MediaDataRecord
+from external_asset_ism_ismc_generation_tool.media_data_parser.shared_media_buffer import SharedMediaBuffer
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+def get_media_datas() -> dict:
+    return Mp4TestFileBuilder.get_fixture_media_datas()
+
+
+class TestSharedMediaBuffer:
+    @title('Test atoms in shared memory')
+    @description('Atoms of all renditions are read back from the shared block by their layouts and parsed like the original atoms')
+    def test_shared_media_buffer(self):
+        with Allure.Step("Share atoms of all renditions"):
+            media_datas = get_media_datas()
+            shared_media_buffer = SharedMediaBuffer(media_datas)
+        with Allure.Step("Verify atoms and parsed renditions"):
+            with shared_media_buffer:
+                for blob_name, media_data in media_datas.items():
+                    shared_memory, shared_media_data = SharedMediaBuffer.attach(shared_media_buffer.name, shared_media_buffer.layouts[blob_name])
+                    assert bytes(shared_media_data['moov']) == media_data['moov']
+                    assert [bytes(moof) for moof in shared_media_data['moofs']] == media_data['moofs']
+                    SharedMediaBuffer.detach(shared_memory, shared_media_data)
+                    record = MediaDataParser.parse_shared_media_data(blob_name, shared_media_buffer.name, shared_media_buffer.layouts[blob_name])
+                    parsed_media_data = MediaDataParser.parse_media_data(blob_name, media_data)
+                    assert record.media_duration == parsed_media_data.media_duration
+                    assert [track.__dict__ for track in record.to_media_data().media_track_info_list] == \
+                        [track.__dict__ for track in parsed_media_data.media_track_info_list]
+        with Allure.Step("Verify shared block is removed"):
+            with pytest.raises(FileNotFoundError):
+                SharedMediaBuffer.attach(shared_media_buffer.name, shared_media_buffer.layouts['0128.isma'])
+
+    @title('Test compact records of parsed renditions')
+    @description('Records of the worker processes are smaller than the pickled MediaData and give the same tracks')
+    def test_media_data_record(self):
+        with Allure.Step("Parse renditions in worker processes and in this process"):
+            media_data = MediaDataParser.get_media_data(get_media_datas())
+            multiprocess_media_data = MediaDataParser.get_media_data(get_media_datas(), is_multithreading=True)
+        with Allure.Step("Verify tracks"):
+            assert multiprocess_media_data.media_duration == media_data.media_duration
+            assert [track.__dict__ for track in multiprocess_media_data.media_track_info_list] == [track.__dict__ for track in media_data.media_track_info_list]
+        with Allure.Step("Verify record size"):
+            parsed_media_data = MediaDataParser.parse_media_data('0400.ismv', get_media_datas()['0400.ismv'])
+            record = MediaDataRecord.from_media_data(parsed_media_data)
+            assert len(pickle.dumps(record)) * 3 < len(pickle.dumps(parsed_media_data))
+
+    @title('Test atoms shared per rendition')
+    @description('Every rendition parsed in a worker process is copied to its own shared block and its atoms are released, '
+                 'no block is created when the renditions are parsed in this process')
+    def test_shared_media_buffer_per_rendition(self, monkeypatch):
+        with Allure.Step("Record the shared blocks"):
+            shared_blob_names = []
+
+            class RecordingSharedMediaBuffer(SharedMediaBuffer):
+                def __init__(self, media_datas: dict):
+                    shared_blob_names.append(list(media_datas))
+                    super().__init__(media_datas)
+
+            monkeypatch.setattr(media_data_parser, 'SharedMediaBuffer', RecordingSharedMediaBuffer)
+        with Allure.Step("Parse renditions in this process"):
+            media_datas = get_media_datas()
+            media_data = MediaDataParser.get_media_data(media_datas)
+            assert not shared_blob_names
+            assert all('moov' in rendition for rendition in media_datas.values())
+        with Allure.Step("Parse renditions in worker processes"):
+            media_datas = get_media_datas()
+            multiprocess_media_data = MediaDataParser.get_media_data(media_datas, is_multithreading=True)
+        with Allure.Step("Verify blocks, released atoms and tracks"):
+            assert sorted(shared_blob_names) == sorted([blob_name] for blob_name in media_datas)
+            assert not any('moov' in rendition or 'moofs' in rendition for rendition in media_datas.values())
+            assert [track.__dict__ for track in multiprocess_media_data.media_track_info_list] == [track.__dict__ for track in media_data.media_track_info_list]
@@ -0,0 +1,213 @@
+import pytest
+from allure_commons._allure import title, description
+from azure.core.exceptions import ResourceExistsError
+
+from external_asset_ism_ismc_generation_tool.azure_client.azure_blob_service_client import AzureBlobServiceClient
+from external_asset_ism_ismc_generation_tool.blob_data_handler.media_parse_pipeline import MediaParsePipeline
+from external_asset_ism_ismc_generation_tool.blob_data_handler.storage_data_handler import StorageDataHandler
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data import MediaData
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.media_data_record import MediaDataRecord
+from external_asset_ism_ismc_generation_tool.media_data_parser.model.segmentation_policy import SegmentationPolicy
+from external_asset_ism_ismc_generation_tool.media_data_parser.parsed_media_cache import ParsedMediaCache
+from external_asset_ism_ismc_generation_tool.mss_client_manifest.ismc_generator import IsmcGenerator
+from external_asset_ism_ismc_generation_tool.mss_server_manifest.ism_generator import IsmGenerator
+from external_asset_ism_ismc_generation_tool.local_file_client.local_file_service_client import LocalFileServiceClient
+from external_asset_ism_ismc_generation_tool.storage_backend.azure_storage_backend import AzureStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.in_memory_storage_backend import InMemoryStorageBackend
+from external_asset_ism_ismc_generation_tool.storage_backend.local_storage_backend import LocalStorageBackend
+from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_conversion_pool import VttConversionPool
+from external_asset_ism_ismc_generation_tool.text_data_parser.vtt_to_cmft_converter import VttToCmftConverter
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.common.common import Common
+from tests.test_utils.fake_blob_server.fake_blob_server import FakeBlobServer
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+from main import write_manifest
+
+
+class TestStorageBackends:
+    @staticmethod
+    def __get_asset_files() -> dict:
+        files = Mp4TestFileBuilder.get_fixture_files()
+        with open(Common.get_data_file_path('asset-test-vtt-syntax_ENG.vtt'), 'rb') as vtt_file:
+            files['asset-test-vtt-syntax_ENG.vtt'] = vtt_file.read()
+        return files
+
+    @title('Test storage data handler on in-memory and local backends')
+    @description('The same asset gives the same atoms and text data whatever the storage backend is')
+    def test_storage_data_handler_backends(self, tmp_path):
+        with Allure.Step("Prepare in-memory and local storages"):
+            files = self.__get_asset_files()
+            for name, data in files.items():
+                (tmp_path / name).write_bytes(data)
+            in_memory_storage_backend = InMemoryStorageBackend(files)
+            local_storage_backend = LocalStorageBackend(LocalFileServiceClient({'local_directory': str(tmp_path), 'is_multithreading': True}))
+        with Allure.Step("Get data from both storages"):
+            in_memory_blob_media_data = StorageDataHandler.get_data_from_storage(in_memory_storage_backend)
+            local_blob_media_data = StorageDataHandler.get_data_from_storage(local_storage_backend)
+        with Allure.Step("Verify blob media data"):
+            # Listing order and completion order of threads decide which rendition names the manifest
+            media_keys = {name.rsplit('.', 1)[0] for name in files if not name.endswith('.vtt')}
+            assert in_memory_blob_media_data.manifest_name in media_keys and local_blob_media_data.manifest_name in media_keys
+            assert in_memory_blob_media_data.media_datas.keys() == {name for name in files if not name.endswith('.vtt')}
+            assert in_memory_blob_media_data.media_datas == local_blob_media_data.media_datas
+            assert [text_data_info.to_dict() for text_data_info in in_memory_blob_media_data.text_data_info_list] == \
+                   [text_data_info.to_dict() for text_data_info in local_blob_media_data.text_data_info_list]
+            assert in_memory_blob_media_data.text_data_info_list[0].language == 'eng'
+
+    @title('Test pipelined download and parsing')
+    @description('Renditions parsed as soon as they are downloaded give the same media data as renditions parsed after all downloads')
+    def test_pipelined_storage_data_handler(self):
+        with Allure.Step("Get data from the storage in two phases and in pipelined mode"):
+            files = self.__get_asset_files()
+            blob_media_data = StorageDataHandler.get_data_from_storage(InMemoryStorageBackend(files))
+            pipelined_blob_media_data = StorageDataHandler.get_data_from_storage(InMemoryStorageBackend(files), {'is_pipelined': True, 'max_pending_parses': 1})
+        with Allure.Step("Verify renditions are parsed by the pipeline"):
+            assert pipelined_blob_media_data.media_datas.keys() == blob_media_data.media_datas.keys()
+            assert all(isinstance(media_data, MediaData) for media_data in pipelined_blob_media_data.media_datas.values())
+            assert len(pipelined_blob_media_data.text_data_info_list) == len(blob_media_data.text_data_info_list) == 1
+        with Allure.Step("Verify media data"):
+            media_data = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas)
+            pipelined_media_data = MediaDataParser.get_media_data(pipelined_blob_media_data.media_datas, pipelined_blob_media_data.media_index_datas)
+            assert pipelined_media_data.media_duration == media_data.media_duration
+            assert [track.__dict__ for track in pipelined_media_data.media_track_info_list] == [track.__dict__ for track in media_data.media_track_info_list]
+        with Allure.Step("Verify renditions are sent to the workers through shared memory"):
+            blob_name, atoms = next(iter(blob_media_data.media_datas.items()))
+            media_parse_pipeline = MediaParsePipeline(SegmentationPolicy(), 1)
+            try:
+                media_parse_pipeline.acquire()
+                task = media_parse_pipeline.submit(blob_name, atoms)
+                assert isinstance(task.result(), MediaDataRecord)
+                parsed_media_data = media_parse_pipeline.get_media_data(task)
+            finally:
+                media_parse_pipeline.shutdown()
+            expected_media_data = MediaDataParser.parse_media_data(blob_name, atoms)
+            assert [track.__dict__ for track in parsed_media_data.media_track_info_list] == [track.__dict__ for track in expected_media_data.media_track_info_list]
+
+    @title('Test bounded memory mode of the storage data handler')
+    @description('Renditions parsed by the download threads keep only their tracks, which are stored to the cache and match the two-phase tracks')
+    def test_bounded_memory_storage_data_handler(self, tmp_path):
+        with Allure.Step("Get data from the storage in two phases and in bounded memory mode"):
+            files = self.__get_asset_files()
+            media_cache = ParsedMediaCache(str(tmp_path / 'parsed_media_cache.sqlite'))
+            storage_backend = InMemoryStorageBackend(files, is_multithreading=True)
+            blob_media_data = StorageDataHandler.get_data_from_storage(storage_backend)
+            bounded_blob_media_data = StorageDataHandler.get_data_from_storage(storage_backend, {'is_bounded_memory': True}, media_cache)
+        with Allure.Step("Verify only tracks are kept and cached"):
+            assert bounded_blob_media_data.media_datas.keys() == blob_media_data.media_datas.keys()
+            assert all(isinstance(media_data, MediaData) for media_data in bounded_blob_media_data.media_datas.values())
+            cached_blob_media_data = StorageDataHandler.get_data_from_storage(InMemoryStorageBackend(files), None, media_cache)
+            assert all(isinstance(media_data, MediaData) for media_data in cached_blob_media_data.media_datas.values())
+            media_cache.close()
+        with Allure.Step("Verify media data"):
+            media_data = MediaDataParser.get_media_data(blob_media_data.media_datas, blob_media_data.media_index_datas)
+            bounded_media_data = MediaDataParser.get_media_data(bounded_blob_media_data.media_datas, bounded_blob_media_data.media_index_datas)
+            assert bounded_media_data.media_duration == media_data.media_duration
+            assert [track.__dict__ for track in bounded_media_data.media_track_info_list] == [track.__dict__ for track in media_data.media_track_info_list]
+
+    @title('Test VTT to CMFT conversion on a local directory')
+    @description('VttToCmftConverter writes the CMFT through the storage backend, so local and in-memory storages get the same file')
+    def test_vtt_to_cmft_conversion_backends(self, tmp_path):
+        with Allure.Step("Prepare in-memory and local storages"):
+            with open(Common.get_data_file_path('asset-test-vtt-syntax_ENG.vtt'), 'rb') as vtt_file:
+                vtt_data = vtt_file.read()
+            (tmp_path / 'asset-test-vtt-syntax_ENG.vtt').write_bytes(vtt_data)
+            in_memory_storage_backend = InMemoryStorageBackend({'asset-test-vtt-syntax_ENG.vtt': vtt_data})
+            local_storage_backend = LocalStorageBackend(LocalFileServiceClient({'local_directory': str(tmp_path)}))
+        with Allure.Step("Convert VTT files"):
+            in_memory_summary = VttToCmftConverter.convert_vtt_files_in_container(in_memory_storage_backend)
+            local_summary = VttToCmftConverter.convert_vtt_files_in_container(local_storage_backend)
+        with Allure.Step("Verify CMFT files"):
+            assert in_memory_summary.successful == local_summary.successful == 1
+            cmft_data = in_memory_storage_backend.objects['asset-test-vtt-syntax_ENG.cmft']
+            assert cmft_data[4:8] == b'ftyp'
+            assert (tmp_path / 'asset-test-vtt-syntax_ENG.cmft').read_bytes() == cmft_data
+
+    @title('Test streaming VTT to CMFT conversion')
+    @description('CMFT files written fragment by fragment to in-memory, local and Azure storages are the same as the packaged ones')
+    def test_streaming_vtt_to_cmft_conversion_backends(self, tmp_path):
+        with Allure.Step("Prepare in-memory, local and Azure storages"):
+            with open(Common.get_data_file_path('asset-test-vtt-syntax_ENG.vtt'), 'rb') as vtt_file:
+                vtt_data = vtt_file.read()
+            (tmp_path / 'asset-test-vtt-syntax_ENG.vtt').write_bytes(vtt_data)
+            in_memory_storage_backend = InMemoryStorageBackend({'asset-test-vtt-syntax_ENG.vtt': vtt_data})
+            local_storage_backend = LocalStorageBackend(LocalFileServiceClient({'local_directory': str(tmp_path)}))
+        with Allure.Step("Convert VTT files with and without streaming"):
+            in_memory_summary = VttToCmftConverter.convert_vtt_files_in_container(in_memory_storage_backend)
+            cmft_data = in_memory_storage_backend.objects['asset-test-vtt-syntax_ENG.cmft']
+            streaming_summary = VttToCmftConverter.convert_vtt_files_in_container(in_memory_storage_backend, is_streaming=True)
+            local_summary = VttToCmftConverter.convert_vtt_files_in_container(local_storage_backend, is_streaming=True)
+            with FakeBlobServer('asset', {'asset-test-vtt-syntax_ENG.vtt': vtt_data}) as fake_blob_server:
+                azure_storage_backend = AzureStorageBackend(AzureBlobServiceClient(fake_blob_server.get_settings()))
+                azure_summary = VttToCmftConverter.convert_vtt_files_in_container(azure_storage_backend, is_streaming=True)
+                azure_cmft_data = fake_blob_server.blobs.get('asset-test-vtt-syntax_ENG.cmft')
+                staged_blocks = fake_blob_server.staged_blocks
+        with Allure.Step("Verify CMFT files"):
+            assert in_memory_summary.successful == streaming_summary.successful == local_summary.successful == azure_summary.successful == 1
+            assert in_memory_storage_backend.objects['asset-test-vtt-syntax_ENG.cmft'] == cmft_data
+            assert (tmp_path / 'asset-test-vtt-syntax_ENG.cmft').read_bytes() == cmft_data
+            assert not (tmp_path / 'asset-test-vtt-syntax_ENG.cmft.part').exists()
+            assert azure_cmft_data == cmft_data
+            assert not staged_blocks
+
+    @title('Test streamed manifests on in-memory, local and Azure backends')
+    @description('Manifests streamed to the storages while they are generated are the same as the generated strings, an existing manifest is kept')
+    def test_streamed_manifests_backends(self, tmp_path, monkeypatch):
+        with Allure.Step("Prepare media data and storages"):
+            media_datas = Mp4TestFileBuilder.get_fixture_media_datas()
+            media_data: MediaData = MediaDataParser.get_media_data(media_datas)
+            audios = IsmGenerator.get_audios(media_track_infos=media_data.media_track_info_list)
+            videos = IsmGenerator.get_videos(media_track_infos=media_data.media_track_info_list)
+            write_ism = lambda sink: IsmGenerator.write(sink, 'asset', audios=audios, videos=videos)
+            write_ismc = lambda sink: IsmcGenerator.write(sink, duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list)
+            ism_data = IsmGenerator.generate('asset', audios=audios, videos=videos).encode('utf-8')
+            ismc_data = IsmcGenerator.generate(duration=media_data.media_duration, media_track_infos=media_data.media_track_info_list).encode('utf-8')
+            (tmp_path / 'storage').mkdir()
+            (tmp_path / 'copy').mkdir()
+            # Local copies are written to the working directory
+            monkeypatch.chdir(tmp_path / 'copy')
+            in_memory_storage_backend = InMemoryStorageBackend({})
+            local_storage_backend = LocalStorageBackend(LocalFileServiceClient({'local_directory': str(tmp_path / 'storage')}))
+        with Allure.Step("Stream manifests to the storages"):
+            for storage_backend in [in_memory_storage_backend, local_storage_backend]:
+                write_manifest(storage_backend, 'asset.ism', write_ism)
+                write_manifest(storage_backend, 'asset.ismc', write_ismc)
+            with FakeBlobServer('asset', {'asset.ism': b'existing manifest'}) as fake_blob_server:
+                azure_storage_backend = AzureStorageBackend(AzureBlobServiceClient(fake_blob_server.get_settings()))
+                write_manifest(azure_storage_backend, 'asset.ismc', write_ismc, local_copy=True)
+                with pytest.raises(ResourceExistsError):
+                    write_manifest(azure_storage_backend, 'asset.ism', write_ism)
+                azure_blobs = dict(fake_blob_server.blobs)
+        with Allure.Step("Verify manifests"):
+            assert in_memory_storage_backend.objects == {'asset.ism': ism_data, 'asset.ismc': ismc_data}
+            assert (tmp_path / 'storage' / 'asset.ism').read_bytes() == ism_data
+            assert (tmp_path / 'storage' / 'asset.ismc').read_bytes() == ismc_data
+            assert not list((tmp_path / 'storage').glob('*.part'))
+            assert azure_blobs['asset.ismc'] == ismc_data
+            assert (tmp_path / 'copy' / 'asset.ismc').read_bytes() == ismc_data
+            assert azure_blobs['asset.ism'] == b'existing manifest'
+
+    @title('Test parallel VTT to CMFT conversion')
+    @description('VTT files converted in worker processes give the same CMFT files and summary as the conversion one by one, a broken file fails alone')
+    def test_parallel_vtt_to_cmft_conversion(self):
+        with Allure.Step("Prepare in-memory storages with several VTT files"):
+            with open(Common.get_data_file_path('asset-test-vtt-syntax_ENG.vtt'), 'rb') as vtt_file:
+                vtt_data = vtt_file.read()
+            files = {f'asset-test-vtt-syntax_{language}.vtt': vtt_data for language in ['ENG', 'FRA', 'DEU', 'SPA']}
+            files['asset-test-vtt-syntax_ITA.vtt'] = b'not a WebVTT file'
+            serial_storage_backend = InMemoryStorageBackend(files)
+            parallel_storage_backend = InMemoryStorageBackend(files)
+        with Allure.Step("Convert VTT files one by one and in a conversion pool"):
+            serial_summary = VttToCmftConverter.convert_vtt_files_in_container(serial_storage_backend)
+            conversion_pool = VttConversionPool.from_settings({'is_multithreading': True, 'max_conversion_workers': 2})
+            try:
+                parallel_summary = VttToCmftConverter.convert_vtt_files_in_container(parallel_storage_backend, conversion_pool=conversion_pool)
+            finally:
+                conversion_pool.shutdown()
+        with Allure.Step("Verify CMFT files and summaries"):
+            assert parallel_summary.total == 5
+            assert parallel_summary.successful == 4
+            assert [result.filename for result in parallel_summary.results] == list(files)
+            assert parallel_summary.results == serial_summary.results
+            assert parallel_storage_backend.objects == serial_storage_backend.objects
+            assert 'asset-test-vtt-syntax_ITA.cmft' not in parallel_storage_backend.objects
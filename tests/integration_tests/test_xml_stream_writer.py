@@ -0,0 +1,88 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+from allure_commons._allure import title, description
+
+from external_asset_ism_ismc_generation_tool.common.xml_stream_writer import XmlStreamWriter
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_data_parser import MediaDataParser
+from external_asset_ism_ismc_generation_tool.mss_client_manifest.ismc_generator import IsmcGenerator
+from external_asset_ism_ismc_generation_tool.mss_client_manifest.models.smooth_streaming_media import SmoothStreamingMedia
+from external_asset_ism_ismc_generation_tool.mss_server_manifest.ism_generator import IsmGenerator
+from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.body import Body
+from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.head import Head
+from external_asset_ism_ismc_generation_tool.mss_server_manifest.models.smil import Smil
+from tests.test_utils.common.allure_helper import Allure
+from tests.test_utils.media.mp4_test_file_builder import Mp4TestFileBuilder
+
+
+def serialize_tree(root: ET.Element) -> str:
+    ET.indent(root)
+    return ET.tostring(root, encoding="utf-8", method="xml", xml_declaration=True).decode("utf-8")
+
+
+class TestXmlStreamWriter:
+    @title('Test streamed manifests')
+    @description('Manifests written to a sink are the same as the indented element trees of their models')
+    def test_streamed_manifests_match_element_trees(self):
+        with Allure.Step("Parse renditions"):
+            media_data = MediaDataParser.get_media_data(Mp4TestFileBuilder.get_fixture_media_datas())
+            media_track_infos = media_data.media_track_info_list
+        with Allure.Step("Verify client manifest"):
+            ismc = IsmcGenerator.generate(duration=media_data.media_duration, media_track_infos=media_track_infos)
+            assert ismc == serialize_tree(ET.fromstring(ismc.encode("utf-8")))
+            smooth_streaming_media = SmoothStreamingMedia(duration='10')
+            assert XmlStreamWriterTestHelper.write(smooth_streaming_media) == serialize_tree(smooth_streaming_media.to_xml())
+        with Allure.Step("Verify server manifest"):
+            ism_document = Smil()
+            assert XmlStreamWriterTestHelper.write(ism_document) == serialize_tree(ism_document.to_xml())
+            ism_document.head = Head()
+            ism_document.head.add_meta("clientManifestRelativePath", "asset.ismc")
+            ism_document.body = Body()
+            assert XmlStreamWriterTestHelper.write(ism_document) == serialize_tree(ism_document.to_xml())
+            for audio in IsmGenerator.get_audios(media_track_infos):
+                ism_document.body.add_audio(audio)
+            for video in IsmGenerator.get_videos(media_track_infos):
+                ism_document.body.add_video(video)
+            assert XmlStreamWriterTestHelper.write(ism_document) == serialize_tree(ism_document.to_xml())
+
+    @title('Test XML stream writer')
+    @description('Nested, empty and escaped elements are written as ElementTree serializes the indented tree')
+    def test_xml_stream_writer(self):
+        with Allure.Step("Write document"):
+            sink = io.StringIO()
+            writer = XmlStreamWriter(sink)
+            writer.write_declaration()
+            writer.start_element(ET.Element("root", {"b": "1", "a": "x & \"y\" <z>\n\t"}))
+            writer.start_element(ET.Element("empty"))
+            writer.end_element()
+            subtree = ET.Element("subtree")
+            ET.SubElement(ET.SubElement(subtree, "child", {"n": "ü"}), "leaf").text = "text"
+            writer.write_element(subtree)
+            writer.start_element(ET.Element("list"))
+            for index in range(3):
+                writer.write_empty_element("c", [("d", str(index)), ("r", "1")])
+            writer.end_element()
+            writer.end_element()
+        with Allure.Step("Verify document"):
+            root = ET.Element("root", {"b": "1", "a": "x & \"y\" <z>\n\t"})
+            ET.SubElement(root, "empty")
+            subtree = ET.SubElement(root, "subtree")
+            ET.SubElement(ET.SubElement(subtree, "child", {"n": "ü"}), "leaf").text = "text"
+            element_list = ET.SubElement(root, "list")
+            for index in range(3):
+                ET.SubElement(element_list, "c", {"d": str(index), "r": "1"})
+            assert sink.getvalue() == serialize_tree(root)
+        with Allure.Step("Reject started element with children"):
+            with pytest.raises(ValueError):
+                XmlStreamWriter(io.StringIO()).start_element(subtree)
+
+
+class XmlStreamWriterTestHelper:
+    @staticmethod
+    def write(model) -> str:
+        sink = io.StringIO()
+        writer = XmlStreamWriter(sink)
+        writer.write_declaration()
+        model.write_xml(writer)
+        return sink.getvalue()
@@ -6,6 +6,8 @@ import sys
 import pytest
 from unittest.mock import Mock, patch
 
+from azure.core import MatchConditions
+
 # Add parent directory to path to import main
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -88,15 +90,16 @@ class TestGenerateManifestsLocal:
         mock_local_handler, 
         mock_media_parser,
         mock_ism_gen,
-        mock_ismc_gen
+        mock_ismc_gen,
+        tmp_path
     ):
         """Test manifest generation in local mode"""
         # Setup
-        settings = {'local_directory': '/test/path'}
+        settings = {'local_directory': str(tmp_path)}
         
         # Mock LocalFileServiceClient
         mock_client_instance = Mock()
-        mock_client_instance.local_directory = '/test/path'
+        mock_client_instance.local_directory = str(tmp_path)
         mock_client_instance.write_file = Mock()
         mock_local_client.return_value = mock_client_instance
         
@@ -118,8 +121,8 @@ class TestGenerateManifestsLocal:
         mock_ism_gen.get_audios.return_value = []
         mock_ism_gen.get_videos.return_value = []
         mock_ism_gen.get_text_streams.return_value = []
-        mock_ism_gen.generate.return_value = '<ism>xml content</ism>'
-        mock_ismc_gen.generate.return_value = '<ismc>xml content</ismc>'
+        mock_ism_gen.write.side_effect = lambda sink, *args, **kwargs: sink.write('<ism>xml content</ism>')
+        mock_ismc_gen.write.side_effect = lambda sink, *args, **kwargs: sink.write('<ismc>xml content</ismc>')
         
         # Execute
         result = generate_manifests_local_use(settings)
@@ -128,7 +131,10 @@ class TestGenerateManifestsLocal:
         assert result.manifest_name == 'test_manifest'
         assert result.ism_created is True
         assert result.ismc_created is True
-        assert mock_client_instance.write_file.call_count == 2
+        # Manifests are streamed to the files in the local directory
+        assert (tmp_path / 'test_manifest.ism').read_text(encoding='utf-8') == '<ism>xml content</ism>'
+        assert (tmp_path / 'test_manifest.ismc').read_text(encoding='utf-8') == '<ismc>xml content</ismc>'
+        assert not list(tmp_path.glob('*.part'))
 
 
 class TestGenerateManifestsAzure:
@@ -155,7 +161,6 @@ class TestGenerateManifestsAzure:
         mock_client_instance = Mock()
         mock_client_instance.container_client.container_name = 'test-container'
         mock_client_instance.blob_exists.return_value = False
-        mock_client_instance.upload_blob_to_container = Mock()
         mock_azure_client.return_value = mock_client_instance
         
         # Mock BlobMediaData
@@ -176,8 +181,8 @@ class TestGenerateManifestsAzure:
         mock_ism_gen.get_audios.return_value = []
         mock_ism_gen.get_videos.return_value = []
         mock_ism_gen.get_text_streams.return_value = []
-        mock_ism_gen.generate.return_value = '<ism>xml content</ism>'
-        mock_ismc_gen.generate.return_value = '<ismc>xml content</ismc>'
+        mock_ism_gen.write.side_effect = lambda sink, *args, **kwargs: sink.write('<ism>xml content</ism>')
+        mock_ismc_gen.write.side_effect = lambda sink, *args, **kwargs: sink.write('<ismc>xml content</ismc>')
         
         # Execute
         result = generate_manifests_azure_use(settings)
@@ -186,7 +191,11 @@ class TestGenerateManifestsAzure:
         assert result.manifest_name == 'test_manifest'
         assert result.ism_created is True
         assert result.ismc_created is True
-        assert mock_client_instance.upload_blob_to_container.call_count == 2
+        # Manifests are staged as blocks and committed without overwriting existing blobs
+        blob_client = mock_client_instance.get_blob_client.return_value
+        assert [c.args[1] for c in blob_client.stage_block.call_args_list] == [b'<ism>xml content</ism>', b'<ismc>xml content</ismc>']
+        assert blob_client.commit_block_list.call_count == 2
+        assert all(c.kwargs.get('match_condition') == MatchConditions.IfMissing for c in blob_client.commit_block_list.call_args_list)
     
     @patch('main.IsmcGenerator')
     @patch('main.IsmGenerator')
@@ -209,7 +218,6 @@ class TestGenerateManifestsAzure:
         mock_client_instance = Mock()
         mock_client_instance.container_client.container_name = 'test-container'
         mock_client_instance.blob_exists.return_value = True  # Files exist
-        mock_client_instance.upload_blob_to_container = Mock()
         mock_azure_client.return_value = mock_client_instance
         
         # Mock BlobMediaData
@@ -230,8 +238,8 @@ class TestGenerateManifestsAzure:
         mock_ism_gen.get_audios.return_value = []
         mock_ism_gen.get_videos.return_value = []
         mock_ism_gen.get_text_streams.return_value = []
-        mock_ism_gen.generate.return_value = '<ism>xml content</ism>'
-        mock_ismc_gen.generate.return_value = '<ismc>xml content</ismc>'
+        mock_ism_gen.write.side_effect = lambda sink, *args, **kwargs: sink.write('<ism>xml content</ism>')
+        mock_ismc_gen.write.side_effect = lambda sink, *args, **kwargs: sink.write('<ismc>xml content</ismc>')
         
         # Execute
         result = generate_manifests_azure_use(settings)
@@ -240,10 +248,9 @@ class TestGenerateManifestsAzure:
         assert result.ism_created is True
         assert result.ismc_created is True
         
-        # Check that upload was called with '_new' suffix
-        upload_calls = mock_client_instance.upload_blob_to_container.call_args_list
-        assert 'test_manifest_new.ism' in upload_calls[0][0]
-        assert 'test_manifest_new.ismc' in upload_calls[1][0]
+        # Check that the manifests were uploaded with '_new' suffix
+        upload_names = [c.args[0] for c in mock_client_instance.get_blob_client.call_args_list]
+        assert upload_names == ['test_manifest_new.ism', 'test_manifest_new.ismc']
 
 
 if __name__ == '__main__':
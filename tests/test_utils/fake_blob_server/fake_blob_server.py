@@ -0,0 +1,145 @@
+import base64
+import re
+import threading
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, unquote
+from xml.sax.saxutils import escape
+
+
+class FakeBlobServer:
+    """
+    In-process HTTP server emulating the subset of the Azure Blob REST API used by the tool:
+    list blobs, ranged Get Blob, Get Blob Properties, Put Blob and Put Block / Put Block List.
+    Authorization headers are not verified.
+    """
+    ACCOUNT_NAME = 'devstoreaccount1'
+    ACCOUNT_KEY = base64.b64encode(b'fake-blob-server-account-key').decode()
+    _LAST_MODIFIED = formatdate(0, usegmt=True)
+
+    def __init__(self, container_name: str, blobs: Optional[Dict[str, bytes]] = None):
+        self.container_name = container_name
+        self.blobs: Dict[str, bytes] = dict(blobs or {})
+        self.staged_blocks: Dict[str, Dict[str, bytes]] = {}
+        self.requests: List[tuple] = []
+        self.__lock = threading.Lock()
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), self.__build_handler())
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    @property
+    def connection_string(self) -> str:
+        host, port = self.__server.server_address
+        return f"DefaultEndpointsProtocol=http;AccountName={self.ACCOUNT_NAME};AccountKey={self.ACCOUNT_KEY};" \
+               f"BlobEndpoint=http://{host}:{port}/{self.ACCOUNT_NAME};"
+
+    def get_settings(self, **settings) -> dict:
+        return {'connection_string': self.connection_string, 'container_name': self.container_name, 'is_multithreading': False, **settings}
+
+    def count_requests(self, method: str, blob_name: Optional[str] = None) -> int:
+        return len([request for request in self.requests if request[0] == method and (blob_name is None or request[1] == blob_name)])
+
+    def __enter__(self):
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    @staticmethod
+    def __etag(data: bytes) -> str:
+        return f'"0x{len(data):08X}{zlib.crc32(data):08X}"'
+
+    def __list_blobs_xml(self) -> bytes:
+        blobs_xml = ''.join(
+            f"<Blob><Name>{escape(name)}</Name><Properties>"
+            f"<Last-Modified>{self._LAST_MODIFIED}</Last-Modified><Etag>{self.__etag(data)}</Etag>"
+            f"<Content-Length>{len(data)}</Content-Length><Content-Type>application/octet-stream</Content-Type>"
+            f"<BlobType>BlockBlob</BlobType></Properties></Blob>"
+            for name, data in sorted(self.blobs.items()))
+        return (f'<?xml version="1.0" encoding="utf-8"?><EnumerationResults ContainerName="{self.container_name}">'
+                f'<Blobs>{blobs_xml}</Blobs><NextMarker /></EnumerationResults>').encode()
+
+    def __build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def __parse(self):
+                url = urlparse(self.path)
+                parts = url.path.lstrip('/').split('/', 2)
+                blob_name = unquote(parts[2]) if len(parts) > 2 else None
+                return blob_name, {key: values[0] for key, values in parse_qs(url.query).items()}
+
+            def __send(self, status: int, body: bytes = b'', headers: Optional[dict] = None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('x-ms-version', '2020-06-12')
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            def __blob_headers(self, data: bytes) -> dict:
+                return {'ETag': server._FakeBlobServer__etag(data), 'Last-Modified': server._LAST_MODIFIED,
+                        'x-ms-blob-type': 'BlockBlob', 'Content-Type': 'application/octet-stream'}
+
+            def do_GET(self):
+                blob_name, query = self.__parse()
+                server.requests.append(('GET', blob_name, self.headers.get('x-ms-range') or self.headers.get('Range')))
+                if blob_name is None and query.get('comp') == 'list':
+                    return self.__send(200, server._FakeBlobServer__list_blobs_xml(), {'Content-Type': 'application/xml'})
+                data = server.blobs.get(blob_name)
+                if data is None:
+                    return self.__send(404, b'', {'x-ms-error-code': 'BlobNotFound'})
+                range_header = self.headers.get('x-ms-range') or self.headers.get('Range')
+                if not range_header:
+                    return self.__send(200, data, self.__blob_headers(data))
+                start, end = re.match(r'bytes=(\d+)-(\d*)', range_header).groups()
+                start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+                if start >= len(data):
+                    return self.__send(416, b'', {'x-ms-error-code': 'InvalidRange', 'Content-Range': f'bytes */{len(data)}'})
+                headers = self.__blob_headers(data)
+                headers['Content-Range'] = f'bytes {start}-{end}/{len(data)}'
+                return self.__send(206, data[start:end + 1], headers)
+
+            def do_HEAD(self):
+                blob_name, _ = self.__parse()
+                server.requests.append(('HEAD', blob_name, None))
+                data = server.blobs.get(blob_name)
+                if data is None:
+                    return self.__send(404, b'', {'x-ms-error-code': 'BlobNotFound'})
+                self.send_response(200)
+                for key, value in self.__blob_headers(data).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+
+            def do_PUT(self):
+                blob_name, query = self.__parse()
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                server.requests.append(('PUT', blob_name, query.get('comp')))
+                with server._FakeBlobServer__lock:
+                    if query.get('comp') != 'block' and self.headers.get('If-None-Match') == '*' and blob_name in server.blobs:
+                        return self.__send(409, b'', {'x-ms-error-code': 'BlobAlreadyExists'})
+                    if query.get('comp') == 'block':
+                        server.staged_blocks.setdefault(blob_name, {})[query['blockid']] = body
+                    elif query.get('comp') == 'blocklist':
+                        block_ids = re.findall(r'<(?:Latest|Uncommitted|Committed)>([^<]*)</', body.decode())
+                        staged = server.staged_blocks.pop(blob_name, {})
+                        server.blobs[blob_name] = b''.join(staged[block_id] for block_id in block_ids)
+                    else:
+                        server.blobs[blob_name] = body
+                data = server.blobs.get(blob_name, b'')
+                self.__send(201, b'', {'ETag': server._FakeBlobServer__etag(data), 'Last-Modified': server._LAST_MODIFIED,
+                                       'x-ms-request-server-encrypted': 'false'})
+
+        return Handler
@@ -0,0 +1,117 @@
+import struct
+from typing import Dict, List, Optional, Tuple, Union
+
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box import LazyBox
+from external_asset_ism_ismc_generation_tool.media_data_parser.media_box_extractor.lazy_box_navigator import LazyBoxNavigator
+from tests.test_utils.common.common import Common
+
+
+class Mp4TestFileBuilder:
+    """ Assembles complete mp4 files from the moov/moof atoms stored in the test data json files. """
+
+    @staticmethod
+    def build_box(box_type: str, payload: bytes = b'', large_size: bool = False) -> bytes:
+        if large_size:
+            return struct.pack('>I4sQ', 1, box_type.encode(), 16 + len(payload)) + payload
+        return struct.pack('>I4s', 8 + len(payload), box_type.encode()) + payload
+
+    @staticmethod
+    def build_fragmented_file(moov: bytes, moofs: List[bytes], mdat_size: int = 1024, large_size_mdat: bool = False, with_mfra: bool = True,
+                              indexed_moofs: Optional[List[int]] = None) -> bytes:
+        """
+        :param indexed_moofs: indexes of the moofs listed in the tfra box of the mfra, all moofs by default
+        """
+        data = Mp4TestFileBuilder.build_box('ftyp', b'isml\x00\x00\x00\x01piffiso2') + moov
+        moof_offsets = []
+        for moof in moofs:
+            moof_offsets.append(len(data))
+            data += moof + Mp4TestFileBuilder.build_box('mdat', bytes(mdat_size), large_size=large_size_mdat)
+        if with_mfra:
+            indexed_moofs = range(len(moofs)) if indexed_moofs is None else indexed_moofs
+            tfra_entries = b''.join(struct.pack('>QQBBB', index * 20000000, moof_offsets[index], 1, 1, 1) for index in indexed_moofs)
+            tfra = Mp4TestFileBuilder.build_box('tfra', struct.pack('>BxxxIII', 1, 1, 0, len(indexed_moofs)) + tfra_entries)
+            mfra_size = 8 + len(tfra) + 16
+            data += Mp4TestFileBuilder.build_box('mfra', tfra + Mp4TestFileBuilder.build_box('mfro', struct.pack('>II', 0, mfra_size)))
+        return data
+
+    @staticmethod
+    def build_moov_at_end_file(moov: bytes, mdat_size: int) -> bytes:
+        return Mp4TestFileBuilder.build_box('ftyp', b'isom\x00\x00\x02\x00isomiso2') \
+            + Mp4TestFileBuilder.build_box('free') \
+            + Mp4TestFileBuilder.build_box('mdat', bytes(mdat_size)) \
+            + moov
+
+    @staticmethod
+    def get_fixture_media_datas() -> Dict[str, Dict[str, Union[bytes, List[bytes]]]]:
+        """ Atoms of the renditions of test_timescale_0_data.json by rendition name, read again on every call """
+        return Common.get_test_data_from_json(Common.get_data_file_path('test_timescale_0_data.json'))['media_datas']
+
+    @staticmethod
+    def get_fixture_files() -> Dict[str, bytes]:
+        """ Complete mp4 files of the renditions of test_timescale_0_data.json by rendition name """
+        return {name: Mp4TestFileBuilder.build_fragmented_file(atoms['moov'], atoms['moofs']) for name, atoms in Mp4TestFileBuilder.get_fixture_media_datas().items()}
+
+    @staticmethod
+    def get_fixture_atoms(media_name: str = '0128.isma') -> Tuple[bytes, List[bytes]]:
+        media_datas = Mp4TestFileBuilder.get_fixture_media_datas()
+        return media_datas[media_name]['moov'], media_datas[media_name]['moofs']
+
+    @staticmethod
+    def renumber_track(moov: bytes, moofs: List[bytes], track_id: int, timescale: Optional[int] = None) -> Tuple[bytes, List[bytes]]:
+        """ Sets the track ID in tkhd, trex and tfhd atoms of a single-track rendition and optionally the timescale in mdhd """
+        moov = bytearray(moov)
+        navigator = LazyBoxNavigator(bytes(moov))
+        tkhd_atom = navigator.find('moov/trak/tkhd')
+        Mp4TestFileBuilder.__patch_uint32(moov, tkhd_atom, 20 if tkhd_atom.get_payload()[0] == 1 else 12, track_id)
+        Mp4TestFileBuilder.__patch_uint32(moov, navigator.find('moov/mvex/trex'), 4, track_id)
+        if timescale is not None:
+            mdhd_atom = navigator.find('moov/trak/mdia/mdhd')
+            Mp4TestFileBuilder.__patch_uint32(moov, mdhd_atom, 20 if mdhd_atom.get_payload()[0] == 1 else 12, timescale)
+        renumbered_moofs = []
+        for moof in moofs:
+            moof = bytearray(moof)
+            Mp4TestFileBuilder.__patch_uint32(moof, LazyBoxNavigator(bytes(moof)).find('moof/traf/tfhd'), 4, track_id)
+            renumbered_moofs.append(bytes(moof))
+        return bytes(moov), renumbered_moofs
+
+    @staticmethod
+    def build_multi_track_moov(moovs: List[bytes]) -> bytes:
+        """ Combines the mvhd of the first moov with the trak and trex atoms of all single-track moovs """
+        navigators = [LazyBoxNavigator(moov) for moov in moovs]
+        mvhd = Mp4TestFileBuilder.__get_atom_bytes(moovs[0], navigators[0].find('moov/mvhd'))
+        traks = b''.join(Mp4TestFileBuilder.__get_atom_bytes(moov, navigator.find('moov/trak')) for moov, navigator in zip(moovs, navigators))
+        trexs = b''.join(Mp4TestFileBuilder.__get_atom_bytes(moov, navigator.find('moov/mvex/trex')) for moov, navigator in zip(moovs, navigators))
+        return Mp4TestFileBuilder.build_box('moov', mvhd + traks + Mp4TestFileBuilder.build_box('mvex', trexs))
+
+    @staticmethod
+    def __get_atom_bytes(data: bytes, atom: LazyBox) -> bytes:
+        return data[atom.offset:atom.offset + atom.size]
+
+    @staticmethod
+    def __patch_uint32(data: bytearray, atom: LazyBox, payload_offset: int, value: int):
+        offset = atom.offset + atom.header_size + payload_offset
+        data[offset:offset + 4] = struct.pack('>I', value)
+
+
+class InMemoryBlobServiceClient:
+    """ Minimal stand-in for AzureBlobServiceClient serving range reads of in-memory blobs and counting requests. """
+
+    def __init__(self, blobs: dict):
+        self.blobs = blobs
+        self.container_name = 'in-memory'
+        self.is_multithreading = False
+        self.request_count = 0
+        self.bytes_read = 0
+
+    def download_part_of_blob(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None) -> bytes:
+        return self.download_part_of_blob_with_size(blob_name, offset, length)[0]
+
+    def download_part_of_blob_with_size(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Tuple[bytes, int]:
+        self.request_count += 1
+        data = self.blobs[blob_name]
+        offset = offset or 0
+        if offset >= len(data):
+            raise ValueError(f"The range specified is invalid for the current size of the resource: {offset}")
+        end = len(data) if length is None else offset + length
+        self.bytes_read += len(data[offset:end])
+        return data[offset:end], len(data)